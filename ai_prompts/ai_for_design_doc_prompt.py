@@ -1,4 +1,4 @@
-import json
+from ai_uitls import prompt_budget_utility
 
 def ask_ai_for_design_doc(input_json: dict):
     prompt = f"""
@@ -40,6 +40,49 @@ def ask_ai_for_design_doc(input_json: dict):
 
     Here is the system JSON:
 
-    {json.dumps(input_json, indent=2)}
+    {prompt_budget_utility.serialize_architecture(input_json)}
     """
-    return prompt
\ No newline at end of file
+    return prompt
+
+# (title, what the section must contain) in document order
+DESIGN_DOC_SECTIONS = [
+    ("System Overview",
+     "- One paragraph summary of the system based on the JSON"),
+    ("High-Level Architecture",
+     "- List all actors, services, and databases with brief descriptions\n"
+     "       - Provide a bullet list of interactions\n"
+     "       - Provide detailed information about interactions\n"
+     "       - Explain the High-Level Architecture"),
+    ("Component Responsibilities",
+     "- Present a table with: Component | Type | Responsibility"),
+    ("Data Flow & Security Considerations",
+     "- Stepwise detailed description of data flow\n"
+     "       - Security, authentication, and scaling considerations"),
+    ("Future Enhancements",
+     "- Suggest 2-3 improvements for scalability, maintainability, or monitoring"),
+]
+
+
+def ask_ai_for_design_doc_section(number: int, title: str, instructions: str, input_json: dict):
+    prompt = f"""
+    You are an highly experienced enterprise software architect and technical writer. You have vast knowledge on HLD patterns.
+
+    You are writing ONE section of a **professional System Design Document** for the system described by the JSON below.
+    Other sections are written separately, so cover only this section:
+
+    {number}. **{title}**
+       {instructions}
+
+    **Output Rules:**
+    - Respond in **Markdown only**
+    - Do not repeat the section heading; start directly with the content
+    - Use only ### or deeper for any sub-headings
+    - Be **concise but professional**
+    - No commentary outside the section
+    - **Do not start with any sentences like "Here is..." or "The section is..."**
+
+    Here is the system JSON:
+
+    {prompt_budget_utility.serialize_architecture(input_json)}
+    """
+    return prompt
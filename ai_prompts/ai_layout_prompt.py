@@ -1,5 +1,7 @@
 import json
 
+from ai_uitls import prompt_budget_utility
+
 
 def get_ai_layout_prompt(input_json):
     prompt = f"""
@@ -12,7 +14,7 @@ def get_ai_layout_prompt(input_json):
                 - "events": interactions between actors, services, and databases
 
                 Here is the architecture JSON:
-                {json.dumps(input_json, indent=2)}
+                {prompt_budget_utility.serialize_architecture(input_json)}
 
                 Your task:
                 Generate a **production-ready HLD JSON** for a C4-style Container Diagram, reflecting a professional microservices architecture with inter-service interactions like this reference pattern:
@@ -78,3 +80,36 @@ def get_ai_layout_prompt(input_json):
                 11. Output **only valid JSON**, no commentary or markdown
                 """
     return prompt
+
+
+def get_edge_label_prompt(edges, events):
+    prompt = f"""
+                You are a senior software architect and C4 diagram expert.
+
+                Below are the edges of a container diagram and the interactions they were derived from.
+                Choose the most accurate label for every edge based on the interaction descriptions.
+
+                Edges:
+                {json.dumps(edges, separators=(",", ":"))}
+
+                Interactions:
+                {json.dumps(events, separators=(",", ":"))}
+
+                Return JSON with this structure:
+
+                {{
+                  "edges": [
+                    {{
+                      "from": "string - source node name, unchanged",
+                      "to": "string - target node name, unchanged",
+                      "label": "REST API | gRPC Call | Message Queue | DB Query | Event Stream"
+                    }}
+                  ]
+                }}
+
+                Rules:
+                1. Keep "from" and "to" exactly as given; do not add or remove edges
+                2. Use only the listed labels
+                3. Output **only valid JSON**, no commentary or markdown
+                """
+    return prompt
@@ -1,16 +1,88 @@
-from groq import Groq
+import types
+
+from ai_uitls import llm_client, metrics_utility, prompt_budget_utility, response_cache
 
 MODEL_NAME = "llama3-8b-8192"  # Groq LLaMA model
 
-client = Groq()
+# Optional semaphore shared by several processes (batch mode) capping in-flight LLM requests
+request_slots = None
+
+
+def set_request_slots(slots):
+    global request_slots
+    request_slots = slots
+
+
+class _RequestSlot:
+    def __enter__(self):
+        if request_slots is not None:
+            request_slots.acquire()
+
+    def __exit__(self, *exc):
+        if request_slots is not None:
+            request_slots.release()
+
+
+def _messages(prompt, system_role):
+    return [
+        {"role": "system", "content": system_role},
+        {"role": "user", "content": prompt}
+    ]
+
 
 def ai_response(prompt, system_role):
-    response = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[
-            {"role": "system", "content": system_role},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0
-    )
+    metrics_utility.increment("llm.calls")
+    cached = response_cache.get(MODEL_NAME, system_role, prompt)
+    if cached is not None:
+        metrics_utility.increment("llm.cache_hits")
+        prompt_budget_utility.log_usage(prompt, cached)
+        return cached
+    with _RequestSlot(), metrics_utility.stage_timer("llm.ai_response"):
+        response = llm_client.get_client().create(
+            model=MODEL_NAME,
+            messages=_messages(prompt, system_role),
+            temperature=0
+        )
+    prompt_budget_utility.log_usage(prompt, response)
+    metrics_utility.record_usage(response)
+    response_cache.put(MODEL_NAME, system_role, prompt, response)
     return response
+
+
+def ai_response_stream(prompt, system_role):
+    """
+    Yield the completion text piece by piece as the model generates it.
+    Only a stream that finishes normally is cached; a cached hit yields once.
+    The recorded call time includes the time the consumer spends between pieces.
+    """
+    metrics_utility.increment("llm.calls")
+    cached = response_cache.get(MODEL_NAME, system_role, prompt)
+    if cached is not None:
+        metrics_utility.increment("llm.cache_hits")
+        yield cached.choices[0].message.content
+        return
+    with _RequestSlot(), metrics_utility.stage_timer("llm.ai_response_stream"):
+        stream = llm_client.get_client().create(
+            model=MODEL_NAME,
+            messages=_messages(prompt, system_role),
+            temperature=0,
+            stream=True
+        )
+        parts = []
+        finish_reason = None
+        usage = None
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = getattr(choice.delta, "content", None)
+            if delta:
+                parts.append(delta)
+                yield delta
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+    prompt_budget_utility.log_usage(prompt, types.SimpleNamespace(usage=usage), "LLM stream")
+    metrics_utility.record_usage(types.SimpleNamespace(usage=usage))
+    if finish_reason == "stop":
+        response_cache.put_content(MODEL_NAME, system_role, prompt, "".join(parts), finish_reason, usage)
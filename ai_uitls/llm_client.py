@@ -0,0 +1,592 @@
+import asyncio
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+import types
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit
+
+from ai_uitls import metrics_utility
+from ai_uitls.rate_limit_utility import RateLimiter, retry_after_seconds
+from ai_uitls.token_utility import estimate_tokens
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+LLM_BACKEND = "http"  # "http": pooled OpenAI-compatible endpoint, "groq": the groq SDK
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+REQUESTS_PER_MINUTE = 30  # Groq llama3-8b-8192 limits
+TOKENS_PER_MINUTE = 30000
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+REQUEST_TIMEOUT_SECONDS = 60  # per HTTP attempt
+CALL_DEADLINE_SECONDS = 180  # whole call, including throttling and retries
+POOL_SIZE = 16  # keep-alive connections shared by the sync and async clients
+COMPLETION_TOKEN_ESTIMATE = 1024
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"APITimeoutError", "APIConnectionError"}  # groq SDK transport errors
+HEDGE_REQUESTS = True  # re-send a call still unanswered at the running p95 latency; the first reply wins
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20  # latencies observed before the first hedge
+HEDGE_WINDOW = 200  # recent latencies the percentile is taken over
+HEDGE_MAX_RATIO = 0.1  # hedges as a share of all calls, bounding the extra load
+
+
+class LLMHTTPError(Exception):
+    """
+    Non-2xx reply from an HTTP backend; shaped like the groq SDK errors
+    (status_code, response.headers) so retry helpers treat both alike.
+    """
+
+    def __init__(self, status_code: int, body: bytes, headers: dict):
+        super().__init__(f"HTTP {status_code}: {body[:200].decode('utf-8', 'replace')}")
+        self.status_code = status_code
+        self.response = types.SimpleNamespace(headers=headers)
+
+
+class RequestCancelled(Exception):
+    """
+    A backend call whose CancelToken was cancelled, e.g. the losing side of a hedge.
+    """
+
+
+class CancelToken:
+    """
+    Lets one thread abort another's in-flight backend call. Backends register an abort
+    callback for the span they block in; cancel() runs the callbacks under the lock that
+    unregisters them, so a connection already handed back to the pool is never touched.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for callback in self._callbacks:
+                callback()
+            self._callbacks.clear()
+
+    @contextmanager
+    def watch(self, callback):
+        with self._lock:
+            if self.cancelled:
+                raise RequestCancelled("LLM call cancelled")
+            self._callbacks.append(callback)
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+
+def abort_on_cancel(cancel: CancelToken, conn):
+    """
+    Context in which cancelling `cancel` shuts `conn`'s socket down, unblocking its reader.
+    """
+    if cancel is None:
+        return nullcontext()
+
+    def abort():
+        if conn.sock is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    return cancel.watch(abort)
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent call latencies; percentile() is None until `min_samples` are in.
+    """
+
+    def __init__(self, window: int = HEDGE_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float):
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def is_retryable_error(error: Exception) -> bool:
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS:
+        return True
+    if isinstance(error, (TimeoutError, ConnectionError, socket.timeout, http.client.HTTPException)):
+        return True
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def to_namespace(value):
+    """
+    JSON reply → attribute access, matching the groq SDK response objects.
+    """
+    if isinstance(value, dict):
+        return types.SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP(S) connections to one host.
+    """
+
+    def __init__(self, base_url: str, max_size: int = POOL_SIZE):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.connections_opened = 0
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def _connect(self, timeout: float):
+        with self._lock:
+            self.connections_opened += 1
+        if self.https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+    def request(self, method: str, path: str, body: bytes, headers: dict, timeout: float,
+                cancel: CancelToken = None):
+        """
+        Send a request and return (connection, response); the caller must `release` both.
+        A reused connection the server already closed is retried once on a fresh one.
+        Cancelling `cancel` while waiting for the response aborts the connection.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No free connection in the pool before the deadline")
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        try:
+            while True:
+                if conn is None:
+                    conn = self._connect(timeout)
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                try:
+                    with abort_on_cancel(cancel, conn):
+                        conn.request(method, self.base_path + path, body=body, headers=headers)
+                        return conn, conn.getresponse()
+                except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                    conn.close()
+                    if not reused:
+                        raise
+                    conn, reused = None, False
+        except BaseException:
+            if conn is not None:
+                conn.close()
+            self._slots.release()
+            raise
+
+    def release(self, conn, response):
+        if response.isclosed() and not response.will_close:
+            with self._lock:
+                self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+
+class HttpBackend:
+    """
+    OpenAI-compatible chat completions over the pooled connections (Groq or a local stub).
+    """
+
+    def __init__(self, base_url: str = GROQ_BASE_URL, api_key: str = None, pool_size: int = POOL_SIZE):
+        self.api_key = api_key if api_key is not None else os.environ.get("GROQ_API_KEY", "")
+        self.pool = ConnectionPool(base_url, pool_size)
+
+    def _send(self, payload: dict, timeout: float, cancel: CancelToken = None):
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        body = json.dumps(payload).encode("utf-8")
+        conn, response = self.pool.request("POST", "/chat/completions", body, headers, timeout, cancel)
+        if response.status >= 400:
+            data = response.read()
+            self.pool.release(conn, response)
+            raise LLMHTTPError(response.status, data, {k.lower(): v for k, v in response.getheaders()})
+        return conn, response
+
+    def complete(self, payload: dict, timeout: float, cancel: CancelToken = None):
+        conn, response = self._send(payload, timeout, cancel)
+        try:
+            with abort_on_cancel(cancel, conn):
+                data = response.read()
+        finally:
+            self.pool.release(conn, response)
+        return to_namespace(json.loads(data))
+
+    def stream(self, payload: dict, timeout: float, cancel: CancelToken = None):
+        """
+        Start a streamed completion; errors in the status line raise here, then
+        the returned iterator yields chunk objects parsed from the SSE events.
+        """
+        conn, response = self._send(dict(payload, stream=True), timeout, cancel)
+        return self._iter_events(conn, response, cancel)
+
+    def _iter_events(self, conn, response, cancel: CancelToken = None):
+        try:
+            with abort_on_cancel(cancel, conn):
+                yield from self._events(response)
+            response.read()
+        finally:
+            self.pool.release(conn, response)
+
+    @staticmethod
+    def _events(response):
+        for line in response:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            yield to_namespace(json.loads(data))
+
+
+class GroqBackend:
+    """
+    The groq SDK client (its own retries disabled; LLMClient handles them). Its calls
+    cannot be aborted from another thread: a cancelled hedge runs to completion unread.
+    """
+
+    def __init__(self):
+        from groq import Groq
+        self.client = Groq(max_retries=0)
+
+    def complete(self, payload: dict, timeout: float, cancel: CancelToken = None):
+        return self.client.chat.completions.create(**payload, timeout=timeout)
+
+    def stream(self, payload: dict, timeout: float, cancel: CancelToken = None):
+        return iter(self.client.chat.completions.create(**payload, stream=True, timeout=timeout))
+
+
+def make_backend(name: str = LLM_BACKEND):
+    if name == "groq":
+        return GroqBackend()
+    if name == "http":
+        return HttpBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+
+def _close_stream(future):
+    """
+    Done-callback closing the stream a cancelled hedge still managed to start.
+    """
+    if not future.cancelled() and future.exception() is None:
+        close = getattr(future.result()[1], "close", None)
+        if close is not None:
+            close()
+
+
+def _resume_stream(first, chunks):
+    """
+    A stream whose first chunk was already read, as one iterator again.
+    """
+    try:
+        if first is not None:
+            yield first
+        yield from chunks
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class LLMClient:
+    """
+    Synchronous chat-completions client: token-bucket throttling against the
+    model's RPM/TPM limits, jittered exponential backoff honoring Retry-After,
+    and a deadline covering the whole call. With `hedge`, an attempt still
+    unanswered at the running p95 latency is sent again; the first reply wins
+    and the other request is cancelled.
+    """
+
+    def __init__(self, backend, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_retries=MAX_RETRIES, request_timeout=REQUEST_TIMEOUT_SECONDS, deadline=CALL_DEADLINE_SECONDS,
+                 backoff_base=BACKOFF_BASE_SECONDS, hedge=HEDGE_REQUESTS):
+        self.backend = backend
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.retries = 0
+        self.hedge = hedge
+        # Reply latency for plain calls, first-chunk latency for streams
+        self.latency = {"complete": LatencyTracker(), "stream": LatencyTracker()}
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._executor = None  # runs both sides of a hedge, created on the first one
+        self._lock = threading.Lock()
+
+    def _prepare(self, model, messages, temperature, max_tokens):
+        payload = {"model": model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        return payload, tokens + (max_tokens or COMPLETION_TOKEN_ESTIMATE)
+
+    def _backoff(self, error: Exception, attempt: int, deadline_at: float) -> float:
+        """
+        Seconds to wait before the next attempt; re-raises `error` when out of retries or time.
+        """
+        if not is_retryable_error(error) or attempt == self.max_retries:
+            raise error
+        delay = retry_after_seconds(error, attempt, self.backoff_base)
+        if time.monotonic() + delay >= deadline_at:
+            raise error
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def _attempt(self, payload: dict, timeout: float, stream: bool, cancel: CancelToken = None):
+        """
+        One backend call. A stream counts as answered once its first chunk is in:
+        returns (first chunk, rest of the stream).
+        """
+        if not stream:
+            return self.backend.complete(payload, timeout, cancel)
+        chunks = self.backend.stream(payload, timeout, cancel)
+        return next(chunks, None), chunks
+
+    def _hedge_delay(self, tracker: LatencyTracker, timeout: float):
+        """
+        Seconds to wait for a reply before hedging; None when this call is not hedged.
+        """
+        with self._lock:
+            self.calls += 1
+            if not self.hedge or self.hedged >= HEDGE_MAX_RATIO * self.calls:
+                return None
+        delay = tracker.percentile(HEDGE_PERCENTILE)
+        return delay if delay is not None and delay < timeout else None
+
+    def _take_hedge(self, tokens: int) -> bool:
+        """
+        Count a hedge if the rate-limit budget has room for it right now; a hedge never waits.
+        """
+        if self.limiter.reserve(tokens) > 0.0:
+            return False
+        with self._lock:
+            self.hedged += 1
+        metrics_utility.increment("llm.hedged_requests")
+        return True
+
+    def _hedge_won(self):
+        with self._lock:
+            self.hedge_wins += 1
+        metrics_utility.increment("llm.hedge_wins")
+
+    def _call(self, payload: dict, timeout: float, stream: bool, tokens: int):
+        """
+        One attempt, hedged once it outlives the running p95 latency.
+        """
+        tracker = self.latency["stream" if stream else "complete"]
+        delay = self._hedge_delay(tracker, timeout)
+        start = time.monotonic()
+        if delay is None:
+            result = self._attempt(payload, timeout, stream)
+        else:
+            result = self._hedged(payload, timeout, stream, tokens, delay)
+        tracker.record(time.monotonic() - start)
+        return result
+
+    def _hedged(self, payload: dict, timeout: float, stream: bool, tokens: int, delay: float):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=2 * POOL_SIZE, thread_name_prefix="llm-hedge")
+        calls = {}
+
+        def launch(seconds):
+            cancel = CancelToken()
+            future = self._executor.submit(self._attempt, payload, seconds, stream, cancel)
+            calls[future] = cancel
+            return future
+
+        first = launch(timeout)
+        hedge = None
+        try:
+            done, pending = wait([first], timeout=delay)
+            if not done and self._take_hedge(tokens):
+                hedge = launch(max(timeout - delay, 0.001))
+                pending.add(hedge)
+            error = None
+            while True:
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self._hedge_won()
+                        return future.result()
+                    error = error or future.exception()
+                if not pending:
+                    raise error
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        finally:
+            for future, cancel in calls.items():
+                if not future.done():
+                    future.cancel()
+                    cancel.cancel()
+                    if stream:
+                        future.add_done_callback(_close_stream)
+
+    def create(self, model, messages, temperature=0, max_tokens=None, stream=False, deadline=None):
+        """
+        One chat completion (or a chunk iterator with `stream`), retried within `deadline` seconds.
+        """
+        payload, tokens = self._prepare(model, messages, temperature, max_tokens)
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("LLM call deadline exceeded")
+            self.limiter.acquire(tokens, timeout=remaining)
+            timeout = max(min(self.request_timeout, deadline_at - time.monotonic()), 0.001)
+            try:
+                result = self._call(payload, timeout, stream, tokens)
+            except Exception as e:
+                time.sleep(self._backoff(e, attempt, deadline_at))
+                continue
+            return _resume_stream(*result) if stream else result
+
+
+class AsyncLLMClient:
+    """
+    asyncio variant sharing the sync client's backend (and its connection pool),
+    rate-limit budget and hedging state. Throttling and backoff waits are cancellable
+    awaits; a cancelled call aborts its HTTP request through a CancelToken.
+    """
+
+    def __init__(self, client: LLMClient, max_workers: int = POOL_SIZE):
+        self.client = client
+        # Blocking HTTP calls run here, sized to the connection pool rather than the default executor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    async def create(self, model, messages, temperature=0, max_tokens=None, deadline=None):
+        client = self.client
+        payload, tokens = client._prepare(model, messages, temperature, max_tokens)
+        deadline_at = time.monotonic() + (deadline or client.deadline)
+        for attempt in range(client.max_retries + 1):
+            while True:
+                wait = client.limiter.reserve(tokens)
+                if wait == 0.0:
+                    break
+                if time.monotonic() + wait > deadline_at:
+                    raise TimeoutError("Rate limit budget not available before the deadline")
+                await asyncio.sleep(wait)
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("LLM call deadline exceeded")
+            timeout = min(client.request_timeout, remaining)
+            try:
+                return await asyncio.wait_for(self._call(payload, timeout, tokens), remaining)
+            except asyncio.TimeoutError as e:
+                error = TimeoutError(str(e) or "LLM call deadline exceeded")
+            except Exception as e:
+                error = e
+            await asyncio.sleep(client._backoff(error, attempt, deadline_at))
+
+    async def _call(self, payload: dict, timeout: float, tokens: int):
+        """
+        LLMClient._call on the event loop: the hedge is a second executor call, and the
+        loser (or every call, when the await is cancelled) is aborted by its CancelToken.
+        """
+        client = self.client
+        tracker = client.latency["complete"]
+        delay = client._hedge_delay(tracker, timeout)
+        loop = asyncio.get_running_loop()
+        calls = {}
+
+        def launch(seconds):
+            cancel = CancelToken()
+            future = loop.run_in_executor(self._executor, client._attempt, payload, seconds, False, cancel)
+            calls[future] = cancel
+            return future
+
+        start = time.monotonic()
+        hedge = None
+        try:
+            done, pending = await asyncio.wait({launch(timeout)}, timeout=delay)
+            if not done and client._take_hedge(tokens):
+                hedge = launch(max(timeout - delay, 0.001))
+                pending.add(hedge)
+            error = None
+            while True:
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            client._hedge_won()
+                        tracker.record(time.monotonic() - start)
+                        return future.result()
+                    error = error or future.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for future, cancel in calls.items():
+                if not future.done():
+                    cancel.cancel()
+                    future.cancel()
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """
+    Process-wide client, created on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient(make_backend())
+    return _client
+
+
+def get_async_client() -> AsyncLLMClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncLLMClient(get_client())
+    return _async_client
+
+
+def set_backend(backend, **client_options) -> LLMClient:
+    """
+    Swap in another backend (e.g. HttpBackend pointed at a local stub server).
+    """
+    global _client, _async_client
+    with _client_lock:
+        _client = LLMClient(backend, **client_options)
+        _async_client = None
+    return _client
@@ -0,0 +1,216 @@
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+METRICS_FILE = "run_metrics.json"
+PROMETHEUS_FILE = "run_metrics.prom"
+PROFILE_REPORT_FILE = "profile_report.txt"
+PROMETHEUS_PREFIX = "tech_design_bot"
+PROFILE_TOP_FUNCTIONS = 25
+
+# Per-process run metrics; every pipeline stage and worker thread records into the same registry
+_lock = threading.Lock()
+timers = {}  # name -> [seconds, ...]
+counters = {}  # name -> number
+profiles = {}  # profiled block name -> pstats.Stats
+profiling = False
+
+
+def reset():
+    global profiling
+    with _lock:
+        timers.clear()
+        counters.clear()
+        profiles.clear()
+        profiling = False
+
+
+def enable_profiling(enabled: bool = True):
+    global profiling
+    profiling = enabled
+
+
+def record_time(name: str, seconds: float):
+    with _lock:
+        timers.setdefault(name, []).append(seconds)
+
+
+def increment(name: str, amount=1):
+    with _lock:
+        counters[name] = counters.get(name, 0) + amount
+
+
+@contextmanager
+def stage_timer(name: str):
+    """
+    Time the enclosed block under `name` (recorded even if the block raises).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(name, time.perf_counter() - start)
+
+
+@contextmanager
+def profile_run(name: str = "run"):
+    """
+    With profiling enabled, run the enclosed block under cProfile in every thread and keep
+    the merged stats for the hotspot report. Stages overlap and their work runs on pool
+    threads, so this profiles a whole run; per-stage numbers are stage_timer wall-clock only.
+    """
+    if not profiling:
+        yield
+        return
+    import cProfile  # profiler modules load only for --profile runs
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler owns the interpreter (Python 3.12+ allows only one)
+        yield
+        return
+    # Before 3.12 cProfile hooks only the calling thread, so each thread started inside
+    # the block gets its own profiler; from 3.12 it runs on sys.monitoring and sees them all
+    thread_profilers = []
+    per_thread = sys.version_info < (3, 12)
+
+    def profile_thread(*_):
+        thread_profiler = cProfile.Profile()
+        with _lock:
+            thread_profilers.append(thread_profiler)
+        thread_profiler.enable()  # replaces this hook in the new thread
+
+    if per_thread:
+        threading.setprofile(profile_thread)
+    try:
+        yield
+    finally:
+        if per_thread:
+            threading.setprofile(None)
+        profiler.disable()
+        stats = pstats.Stats(profiler)
+        with _lock:
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+            profiles[name] = stats
+
+
+def record_usage(response, label: str = "llm"):
+    """
+    Add a response's `usage` token counts (prompt/completion/total) to the run counters.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, field, None)
+        if value is None and isinstance(usage, dict):
+            value = usage.get(field)
+        if value:
+            increment(f"{label}.{field}", value)
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def snapshot() -> dict:
+    """
+    Timer summaries, raw counters and derived rates for the current run.
+    """
+    with _lock:
+        timer_items = {name: list(values) for name, values in timers.items()}
+        counter_items = dict(counters)
+    summary = {
+        name: {
+            "count": len(values),
+            "total_seconds": round(sum(values), 4),
+            "mean_seconds": round(sum(values) / len(values), 4),
+            "p95_seconds": round(_percentile(values, 0.95), 4),
+            "max_seconds": round(max(values), 4),
+        }
+        for name, values in sorted(timer_items.items())
+    }
+
+    rates = {}
+    repaired = counter_items.get("json.repaired", 0)
+    failed = counter_items.get("json.failed", 0)
+    if repaired + failed:
+        rates["json_repair_success_rate"] = round(repaired / (repaired + failed), 4)
+    parsed = counter_items.get("json.parsed", 0) + repaired
+    if parsed + failed:
+        rates["json_parse_success_rate"] = round(parsed / (parsed + failed), 4)
+    calls = counter_items.get("llm.calls", 0)
+    if calls:
+        rates["llm_cache_hit_rate"] = round(counter_items.get("llm.cache_hits", 0) / calls, 4)
+    return {"timers": summary, "counters": dict(sorted(counter_items.items())), "rates": rates}
+
+
+def write_metrics_json(metrics_file: str = METRICS_FILE, extra: dict = None) -> str:
+    metrics = snapshot()
+    metrics.update(extra or {})
+    tmp_file = metrics_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    os.replace(tmp_file, metrics_file)
+    print(f"📊 Run metrics saved: {metrics_file}")
+    return metrics_file
+
+
+def _metric_name(name: str) -> str:
+    return PROMETHEUS_PREFIX + "_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text(metrics: dict = None) -> str:
+    """
+    The run metrics in the Prometheus text exposition format (for node_exporter's textfile collector).
+    """
+    metrics = metrics or snapshot()
+    lines = [f"# TYPE {PROMETHEUS_PREFIX}_duration_seconds summary"]
+    for name, timer in metrics["timers"].items():
+        labels = f'{{name="{name}"}}'
+        lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds_sum{labels} {timer['total_seconds']}")
+        lines.append(f"{PROMETHEUS_PREFIX}_duration_seconds_count{labels} {timer['count']}")
+    for name, value in metrics["counters"].items():
+        lines.append(f"# TYPE {_metric_name(name)}_total counter")
+        lines.append(f"{_metric_name(name)}_total {value}")
+    for name, value in metrics["rates"].items():
+        lines.append(f"# TYPE {_metric_name(name)} gauge")
+        lines.append(f"{_metric_name(name)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(prometheus_file: str = PROMETHEUS_FILE) -> str:
+    tmp_file = prometheus_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_file, prometheus_file)
+    print(f"📊 Prometheus metrics saved: {prometheus_file}")
+    return prometheus_file
+
+
+def write_profile_report(report_file: str = PROFILE_REPORT_FILE, top: int = PROFILE_TOP_FUNCTIONS) -> str:
+    """
+    Hotspot report: the `top` functions by cumulative time for every profiled block (see profile_run).
+    """
+    with _lock:
+        stage_stats = dict(profiles)
+    with open(report_file, "w", encoding="utf-8") as f:
+        for name, stats in stage_stats.items():
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(top)
+            f.write(f"{'=' * 20} profile: {name} {'=' * 20}\n{out.getvalue()}\n")
+    print(f"📊 Profile report saved: {report_file}")
+    return report_file
@@ -0,0 +1,162 @@
+import json
+
+from ai_uitls.token_utility import estimate_tokens
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+CONTEXT_WINDOW_TOKENS = 8192  # llama3-8b-8192
+LAYOUT_COMPLETION_TOKENS = 2500  # room left for the layout JSON reply
+DESIGN_DOC_COMPLETION_TOKENS = 3000  # room left for the Markdown document
+EDGE_LABEL_COMPLETION_TOKENS = 2000  # room left for the relabelled edges
+LOG_TOKEN_USAGE = True
+
+# Short keys for the architecture JSON embedded in prompts
+COMPACT_KEYS = {
+    "actors": ("A", {"name": "n", "type": "t"}),
+    "microservices": ("S", {"name": "n", "db": "db", "exposes": "ex", "consumes": "co",
+                            "scaling": "sc", "criticality": "cr"}),
+    "databases": ("D", {"name": "n", "type": "t", "used_by": "u"}),
+    "events": ("E", {"from": "f", "to": "t", "type": "y", "description": "d"}),
+}
+COMPACT_LEGEND = (
+    "Architecture JSON uses short keys: A=actors{n=name,t=type}; "
+    "S=microservices{n=name,db,ex=exposes,co=consumes,sc=scaling,cr=criticality}; "
+    "D=databases{n=name,t=type,u=used_by}; E=events{f=from,t=to,y=type,d=description}. "
+    "Missing keys mean null/empty. Use the full names (not the short keys) in your output."
+)
+
+
+def compact_architecture(architecture: dict) -> dict:
+    """
+    Same content with short keys and null/empty values dropped.
+    """
+    compact = {}
+    for section, (short_section, keys) in COMPACT_KEYS.items():
+        items = []
+        for item in architecture.get(section) or []:
+            if not isinstance(item, dict):
+                items.append(item)
+                continue
+            items.append({keys.get(k, k): v for k, v in item.items() if v not in (None, "", [], {})})
+        if items:
+            compact[short_section] = items
+    return compact
+
+
+def serialize_architecture(architecture: dict) -> str:
+    """
+    Legend plus compact JSON, ready to embed in a prompt.
+    """
+    return COMPACT_LEGEND + "\n" + json.dumps(compact_architecture(architecture), separators=(",", ":"))
+
+
+def prompt_budget(completion_tokens: int) -> int:
+    return CONTEXT_WINDOW_TOKENS - completion_tokens
+
+
+def fits(prompt: str, completion_tokens: int) -> bool:
+    return estimate_tokens(prompt) <= prompt_budget(completion_tokens)
+
+
+def plan_prompts(architecture: dict, build_prompt, completion_tokens: int, split) -> list:
+    """
+    One prompt if it fits the context window, otherwise one per sub-architecture, as cut
+    by `split(architecture, max_tokens)` (e.g. architecture_model.split_architecture).
+    Every part's prompt is checked again and split further if the per-node estimate
+    undershot; only a part that cannot be split (a single node) may stay over budget.
+    Returns [(sub_architecture, prompt)].
+    """
+    prompt = build_prompt(architecture)
+    budget = prompt_budget(completion_tokens)
+    prompt_tokens = estimate_tokens(prompt)
+    if prompt_tokens <= budget:
+        return [(architecture, prompt)]
+
+    overhead = prompt_tokens - estimate_tokens(serialize_architecture(architecture))
+    parts = split(architecture, max(budget - overhead, 256))
+    print(f"⚠️ Prompt ~{prompt_tokens} tokens exceeds the {budget}-token budget, "
+          f"splitting into {len(parts)} sub-graph calls")
+    if len(parts) == 1:
+        return [(parts[0], build_prompt(parts[0]))]
+    plans = []
+    for part in parts:
+        plans += plan_prompts(part, build_prompt, completion_tokens, split)
+    return plans
+
+
+def split_events(architecture: dict, build_prompt, completion_tokens: int) -> list:
+    """
+    Every node of `architecture` in each part, with its events spread over as many prompts
+    as needed to fit: for a hub whose own events exceed the budget, where splitting by node
+    cannot help. Returns [(sub_architecture, prompt)].
+    """
+    nodes = {key: items for key, items in architecture.items() if key != "events"}
+    available = prompt_budget(completion_tokens) - estimate_tokens(build_prompt(nodes))
+    batches, batch, batch_tokens = [], [], 0
+    for event in architecture.get("events") or []:
+        tokens = estimate_tokens(json.dumps(event, separators=(",", ":")))  # long keys: an overestimate
+        if batch and batch_tokens + tokens > available:
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(event)
+        batch_tokens += tokens
+    batches.append(batch)
+    return [({**nodes, "events": batch}, build_prompt({**nodes, "events": batch})) for batch in batches]
+
+
+def plan_edge_batches(edges: list, events: list, build_prompt, completion_tokens: int) -> list:
+    """
+    Edges in batches, each sent with the events between its edges' endpoints, so that
+    `build_prompt(edges, events)` fits the budget and the edges echoed back fit the
+    reply. An edge whose own events overflow keeps as many as fit.
+    Returns [(edges, prompt)].
+    """
+    by_pair = {}
+    for event in events or []:
+        if isinstance(event, dict):
+            by_pair.setdefault((event.get("from"), event.get("to")), []).append(event)
+    cost = lambda items: estimate_tokens(json.dumps(items, separators=(",", ":")))
+    available = prompt_budget(completion_tokens) - estimate_tokens(build_prompt([], []))
+
+    batches = []
+    batch, batch_events, prompt_tokens, reply_tokens = [], [], 0, 0
+    for edge in edges:
+        edge_tokens = cost([edge])
+        edge_events = []
+        events_tokens = 0
+        for event in by_pair.get((edge.get("from"), edge.get("to")), []):
+            event_tokens = cost([event])
+            if edge_tokens + events_tokens + event_tokens > available:
+                break
+            edge_events.append(event)
+            events_tokens += event_tokens
+        if batch and (prompt_tokens + edge_tokens + events_tokens > available
+                      or reply_tokens + edge_tokens > completion_tokens):
+            batches.append((batch, batch_events))
+            batch, batch_events, prompt_tokens, reply_tokens = [], [], 0, 0
+        batch.append(edge)
+        batch_events += edge_events
+        prompt_tokens += edge_tokens + events_tokens
+        reply_tokens += edge_tokens
+    if batch:
+        batches.append((batch, batch_events))
+    if len(batches) > 1:
+        print(f"⚠️ {len(edges)} edges exceed one prompt, labelling them in {len(batches)} calls")
+    return [(batch, build_prompt(batch, batch_events)) for batch, batch_events in batches]
+
+
+def log_usage(prompt: str, response, label: str = "LLM call"):
+    """
+    Print estimated vs actual prompt tokens and completion tokens for one call.
+    """
+    if not LOG_TOKEN_USAGE:
+        return
+    usage = getattr(response, "usage", None)
+    cached = " (cached)" if getattr(response, "cached", False) else ""
+    if usage is None:
+        print(f"🔢 {label}{cached}: prompt ~{estimate_tokens(prompt)} tokens (estimated)")
+        return
+    print(f"🔢 {label}{cached}: prompt {getattr(usage, 'prompt_tokens', '?')} tokens "
+          f"(estimated {estimate_tokens(prompt)}), completion {getattr(usage, 'completion_tokens', '?')} tokens")
@@ -0,0 +1,84 @@
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for a requests-per-minute and tokens-per-minute budget.
+    A single instance is shared by all worker threads issuing LLM calls.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                self.requests_per_minute,
+                self._request_allowance + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                self.tokens_per_minute,
+                self._token_allowance + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Take one request of `tokens` estimated tokens from the budget if it fits now
+        and return 0.0; otherwise take nothing and return the seconds to wait.
+        """
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        with self._lock:
+            self._refill()
+            wait = 0.0
+            if self.requests_per_minute and self._request_allowance < 1:
+                wait = max(wait, (1 - self._request_allowance) * 60.0 / self.requests_per_minute)
+            if self.tokens_per_minute and self._token_allowance < tokens:
+                wait = max(wait, (tokens - self._token_allowance) * 60.0 / self.tokens_per_minute)
+            if wait == 0.0:
+                if self.requests_per_minute:
+                    self._request_allowance -= 1
+                if self.tokens_per_minute:
+                    self._token_allowance -= tokens
+            return wait
+
+    def acquire(self, tokens: int = 0, timeout: float = None):
+        """
+        Block until one request of `tokens` estimated tokens fits in the budget.
+        Raises TimeoutError if that would take longer than `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.reserve(tokens)
+            if wait == 0.0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TimeoutError("Rate limit budget not available before the deadline")
+            time.sleep(wait)
+
+
+def retry_after_seconds(error: Exception, attempt: int, base_delay: float = 1.0) -> float:
+    """
+    Seconds to wait before retrying: the server's Retry-After header when present,
+    otherwise jittered exponential backoff.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    return base_delay * (2 ** attempt) * (0.5 + random.random() / 2)
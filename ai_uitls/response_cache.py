@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import types
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+CACHE_ENABLED = True
+CACHE_DIR = ".llm_cache"
+CACHE_FILE = "responses.sqlite3"
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # evict least recently used entries above this size
+CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600  # drop entries older than 30 days
+EVICTION_BATCH = 256  # least recently used entries read per step while over CACHE_MAX_BYTES
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0, "evictions": 0}  # this process only; totals live in the DB
+
+
+def cache_key(model: str, system_role: str, prompt: str) -> str:
+    """
+    Content address of one LLM call.
+    """
+    payload = json.dumps([model, system_role, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connection() -> sqlite3.Connection:
+    """
+    One connection per thread; WAL mode lets several processes read and write safely.
+    """
+    path = os.path.join(CACHE_DIR, CACHE_FILE)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) == path:
+        return conn
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            content TEXT NOT NULL,
+            finish_reason TEXT,
+            usage TEXT,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_access REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses (created)")
+    conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    # Running total of responses.size, kept by triggers so eviction never has to SUM the table
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_size "
+                     "(id INTEGER PRIMARY KEY CHECK (id = 1), bytes INTEGER NOT NULL)")
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses
+            BEGIN UPDATE cache_size SET bytes = bytes + NEW.size WHERE id = 1; END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses
+            BEGIN UPDATE cache_size SET bytes = bytes - OLD.size WHERE id = 1; END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses
+            BEGIN UPDATE cache_size SET bytes = bytes + NEW.size - OLD.size WHERE id = 1; END
+        """)
+        conn.execute("INSERT OR IGNORE INTO cache_size (id, bytes) SELECT 1, COALESCE(SUM(size), 0) FROM responses")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    _local.conn = conn
+    _local.path = path
+    return conn
+
+
+def _count(conn: sqlite3.Connection, name: str, amount: int = 1):
+    with _stats_lock:
+        stats[name] += amount
+    conn.execute(
+        "INSERT INTO counters (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+        (name, amount)
+    )
+
+
+def _to_response(content: str, finish_reason: str, usage: str):
+    """
+    Rebuild an object shaped like a Groq chat completion from a cache row.
+    """
+    usage_values = json.loads(usage) if usage else {}
+    return types.SimpleNamespace(
+        choices=[types.SimpleNamespace(
+            message=types.SimpleNamespace(content=content),
+            finish_reason=finish_reason
+        )],
+        usage=types.SimpleNamespace(**usage_values) if usage_values else None,
+        cached=True
+    )
+
+
+def get(model: str, system_role: str, prompt: str):
+    """
+    Cached response for this call, or None on a miss.
+    """
+    if not CACHE_ENABLED:
+        return None
+    conn = _connection()
+    key = cache_key(model, system_role, prompt)
+    now = time.time()
+    row = conn.execute(
+        "SELECT content, finish_reason, usage, created FROM responses WHERE key = ?", (key,)
+    ).fetchone()
+    if row is None or now - row[3] > CACHE_MAX_AGE_SECONDS:
+        _count(conn, "misses")
+        return None
+    conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+    _count(conn, "hits")
+    return _to_response(row[0], row[1], row[2])
+
+
+def put(model: str, system_role: str, prompt: str, response):
+    """
+    Store a completed response and evict by age and total size.
+    """
+    choice = response.choices[0]
+    put_content(model, system_role, prompt, choice.message.content or "",
+                getattr(choice, "finish_reason", None), getattr(response, "usage", None))
+
+
+def put_content(model: str, system_role: str, prompt: str, content: str, finish_reason: str = None, usage=None):
+    """
+    Store response text assembled elsewhere (e.g. from a stream).
+    """
+    if not CACHE_ENABLED:
+        return
+    usage_json = None
+    if usage is not None:
+        usage_json = json.dumps({
+            name: getattr(usage, name, None)
+            for name in ("prompt_tokens", "completion_tokens", "total_tokens")
+        })
+    now = time.time()
+    conn = _connection()
+    # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete skips the size triggers
+    conn.execute(
+        "INSERT INTO responses (key, model, content, finish_reason, usage, size, created, last_access) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET model = excluded.model, content = excluded.content, "
+        "finish_reason = excluded.finish_reason, usage = excluded.usage, size = excluded.size, "
+        "created = excluded.created, last_access = excluded.last_access",
+        (cache_key(model, system_role, prompt), model, content, finish_reason,
+         usage_json, len(content.encode("utf-8")), now, now)
+    )
+    evict(conn)
+
+
+def discard(model: str, system_role: str, prompt: str):
+    """
+    Drop one cached response (e.g. a reply that turned out unparseable), so the next
+    identical call goes to the model instead of replaying it.
+    """
+    if not CACHE_ENABLED:
+        return
+    _connection().execute("DELETE FROM responses WHERE key = ?", (cache_key(model, system_role, prompt),))
+
+
+def evict(conn: sqlite3.Connection = None):
+    """
+    Drop expired entries, then least recently used ones until under CACHE_MAX_BYTES.
+    The check reads the running size total and the oldest entry (both O(1)), so a put
+    that leaves nothing to evict never takes the write lock.
+    """
+    conn = conn or _connection()
+    expired_before = time.time() - CACHE_MAX_AGE_SECONDS
+    total, oldest = conn.execute(
+        "SELECT (SELECT bytes FROM cache_size), (SELECT MIN(created) FROM responses)").fetchone()
+    if total <= CACHE_MAX_BYTES and (oldest is None or oldest >= expired_before):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        removed = conn.execute("DELETE FROM responses WHERE created < ?", (expired_before,)).rowcount
+        total = conn.execute("SELECT bytes FROM cache_size").fetchone()[0]
+        while total > CACHE_MAX_BYTES:
+            batch = conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT ?", (EVICTION_BATCH,)).fetchall()
+            if not batch:
+                break
+            for key, size in batch:
+                if total <= CACHE_MAX_BYTES:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        if removed:
+            _count(conn, "evictions", removed)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def cache_stats() -> dict:
+    """
+    Hit/miss/eviction counters for this process and across all runs sharing the cache.
+    """
+    totals = {}
+    if CACHE_ENABLED:
+        conn = _connection()
+        totals = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM responses), (SELECT bytes FROM cache_size)").fetchone()
+        totals.update({"entries": entries, "bytes": size})
+    with _stats_lock:
+        return {"process": dict(stats), "total": totals}
@@ -0,0 +1,10 @@
+CHARS_PER_TOKEN = 4  # rough average for English text with the llama3 tokenizer
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate used for rate-limit budgeting (no tokenizer dependency).
+    """
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -0,0 +1,149 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+BRD_EXTENSIONS = (".txt", ".text", ".md", ".markdown", ".pdf", ".docx")  # what ingest_handler reads
+BATCH_OUTPUT_DIR = "batch_output"
+SUMMARY_FILE = "batch_summary.json"
+CORPUS_ARCHITECTURE_FILE = "corpus_architecture.json"
+MAX_WORKERS = 4  # BRDs processed at once
+MAX_LLM_REQUESTS = 8  # in-flight LLM requests across all workers
+
+
+def find_brds(source: str) -> list:
+    """
+    BRD files in a directory, or matching a glob pattern.
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(BRD_EXTENSIONS))
+
+
+def job_output_dirs(brd_files: list, output_root: str) -> dict:
+    """
+    One output folder per BRD, named after the file (suffixed when names collide).
+    """
+    dirs = {}
+    used = set()
+    for brd_file in brd_files:
+        stem = os.path.splitext(os.path.basename(brd_file))[0]
+        name = stem
+        suffix = 2
+        while name in used:
+            name = f"{stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        dirs[brd_file] = os.path.join(output_root, name)
+    return dirs
+
+
+def init_worker(request_slots):
+    from ai_uitls import ai_repsonse_utility
+    ai_repsonse_utility.set_request_slots(request_slots)
+
+
+def run_job(brd_file: str, output_dir: str, resume: bool = False) -> dict:
+    """
+    Run one BRD in a worker process; never raises, failures go into the report.
+    """
+    import tech_design_bot
+
+    start = time.perf_counter()
+    report = {"brd": brd_file, "output_dir": output_dir, "status": "ok", "timings": {}, "error": None}
+    try:
+        _, report["timings"] = tech_design_bot.run_design_pipeline(brd_file, output_dir, resume=resume)
+    except Exception as e:
+        report["status"] = "failed"
+        report["error"] = f"{type(e).__name__}: {e}"
+        report["traceback"] = traceback.format_exc()
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def merge_corpus(brd_files: list, output_dirs: dict, output_root: str, max_workers: int = MAX_WORKERS) -> str:
+    """
+    Merge every job's per-chunk extractions into one corpus architecture with a
+    process-pool tree reduction. Ranks are (BRD position, chunk index), so the result
+    does not depend on which jobs finished first.
+    """
+    from handler_pack import architecture_model, json_file_handler, merge_handler
+
+    manifest_files = [os.path.join(output_dirs[brd_file], json_file_handler.EXTRACTION_MANIFEST_FILE)
+                      for brd_file in brd_files]
+    architecture = architecture_model.build_model(
+        merge_handler.merge_manifests(manifest_files, max_workers).architecture()).to_json()
+    corpus_file = os.path.join(output_root, CORPUS_ARCHITECTURE_FILE)
+    with open(corpus_file, "w", encoding="utf-8") as f:
+        json.dump(architecture, f, indent=2)
+    print(f"✅ Corpus architecture merged from {len(brd_files)} BRDs: {corpus_file}")
+    return corpus_file
+
+
+def run_batch(source: str, output_root: str = BATCH_OUTPUT_DIR, max_workers: int = MAX_WORKERS,
+              max_llm_requests: int = MAX_LLM_REQUESTS, resume: bool = False, corpus: bool = False) -> dict:
+    brd_files = find_brds(source)
+    if not brd_files:
+        raise SystemExit(f"No BRD files ({', '.join(BRD_EXTENSIONS)}) found for: {source}")
+    print(f"✅ Found {len(brd_files)} BRDs, running {max_workers} at a time")
+    os.makedirs(output_root, exist_ok=True)
+    output_dirs = job_output_dirs(brd_files, output_root)
+
+    start = time.perf_counter()
+    reports = []
+    with multiprocessing.Manager() as manager:
+        request_slots = manager.BoundedSemaphore(max_llm_requests)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                 initargs=(request_slots,)) as executor:
+            futures = [executor.submit(run_job, brd_file, output_dirs[brd_file], resume) for brd_file in brd_files]
+            for future in as_completed(futures):
+                report = future.result()
+                reports.append(report)
+                mark = "✅" if report["status"] == "ok" else "❌"
+                print(f"{mark} {report['brd']} ({report['seconds']:.1f}s)")
+
+    reports.sort(key=lambda r: r["brd"])
+    summary = {
+        "source": source,
+        "documents": len(reports),
+        "succeeded": sum(1 for r in reports if r["status"] == "ok"),
+        "failed": sum(1 for r in reports if r["status"] != "ok"),
+        "seconds": round(time.perf_counter() - start, 3),
+        "jobs": reports,
+    }
+    if corpus:
+        summary["corpus_architecture"] = merge_corpus(brd_files, output_dirs, output_root, max_workers)
+    summary_file = os.path.join(output_root, SUMMARY_FILE)
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"✅ Batch finished: {summary['succeeded']} ok, {summary['failed']} failed. Report: {summary_file}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate design documents for a directory or glob of BRDs.")
+    parser.add_argument("source", help="directory of BRDs or a glob such as 'brds/**/*.txt'")
+    parser.add_argument("--output-dir", default=BATCH_OUTPUT_DIR, help="root folder for per-BRD outputs")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="BRDs processed concurrently")
+    parser.add_argument("--max-llm-requests", type=int, default=MAX_LLM_REQUESTS,
+                        help="global cap on in-flight LLM requests across all workers")
+    parser.add_argument("--corpus", action="store_true",
+                        help=f"also merge all BRDs into one {CORPUS_ARCHITECTURE_FILE}")
+    parser.add_argument("--resume", action="store_true", help="continue interrupted jobs from their checkpoint journals")
+    args = parser.parse_args()
+    summary = run_batch(args.source, args.output_dir, args.workers, args.max_llm_requests, args.resume, args.corpus)
+    raise SystemExit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
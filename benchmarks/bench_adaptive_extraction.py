@@ -0,0 +1,137 @@
+"""
+Adaptive extraction against long-tailed latency and truncated replies.
+
+Hedging: LLMClient calls against a stub server where a few requests stall, with and
+without hedging at the running p95 (latency percentiles, extra requests sent).
+
+Chunk sizing: streamed extraction of a synthetic BRD whose replies grow with the chunk
+and are cut off at a completion limit, with and without ChunkSizeController re-splitting
+(share of the BRD's service calls that survive into merged_architecture.json).
+
+    python -m benchmarks.bench_adaptive_extraction
+"""
+import asyncio
+import contextlib
+import io
+import json
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_uitls import llm_client
+from benchmarks import brd_generator, fake_llm_backend
+from benchmarks.stub_llm_server import StubLLMServer
+
+REQUESTS = 400
+CONCURRENCY = 8
+LATENCY = 0.02
+STALL_RATE = 0.03
+STALL_LATENCY = 1.0
+MODEL = "stub-model"
+
+BRD_WORDS = 60_000
+REPLY_CHAR_LIMIT = 4096  # ~1024 completion tokens
+SERVICE_CALL = re.compile(r"The (\w+) Service [^.]*? and calls the (\w+) Service over ([\w ]+?)\.")
+
+
+def messages(i: int):
+    return [{"role": "system", "content": "You output JSON only."},
+            {"role": "user", "content": f"Extract chunk {i}"}]
+
+
+def percentiles(latencies: list) -> str:
+    latencies = sorted(latencies)
+    pick = lambda fraction: latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+    return f"{pick(0.5):7.1f} {pick(0.95):7.1f} {pick(0.99):8.1f} {latencies[-1] * 1000:8.1f}"
+
+
+def run_sync(client, stream: bool) -> list:
+    def call(i):
+        start = time.perf_counter()
+        if stream:
+            for _ in client.create(MODEL, messages(i), stream=True):
+                pass
+        else:
+            client.create(MODEL, messages(i))
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        return list(executor.map(call, range(REQUESTS)))
+
+
+async def run_async(client) -> list:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def call(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await client.create(MODEL, messages(i))
+            return time.perf_counter() - start
+
+    return list(await asyncio.gather(*(call(i) for i in range(REQUESTS))))
+
+
+def bench_hedging():
+    print(f"{'client':>16} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>8} {'max ms':>8} "
+          f"{'sent':>6} {'hedges':>7} {'won':>5}")
+    for name, stream, is_async in (("sync", False, False), ("sync stream", True, False), ("async", False, True)):
+        for hedge in (False, True):
+            with StubLLMServer(latency=LATENCY, stall_rate=STALL_RATE, stall_latency=STALL_LATENCY) as server:
+                client = llm_client.LLMClient(llm_client.HttpBackend(server.base_url, api_key="stub"),
+                                              requests_per_minute=None, tokens_per_minute=None, hedge=hedge)
+                if is_async:
+                    latencies = asyncio.run(run_async(llm_client.AsyncLLMClient(client)))
+                else:
+                    latencies = run_sync(client, stream)
+                label = f"{name} {'hedged' if hedge else 'plain'}"
+                print(f"{label:>16} {percentiles(latencies)} {server.requests:>6} {client.hedged:>7} "
+                      f"{client.hedge_wins:>5}")
+
+
+def full_extraction(prompt: str) -> str:
+    """
+    Every service call the chunk states, so the reply grows with the chunk like a real model's.
+    """
+    calls = list(dict.fromkeys(SERVICE_CALL.findall(prompt)))
+    services = list(dict.fromkeys(name for src, dst, _ in calls for name in (src, dst)))
+    return json.dumps({
+        "actors": [],
+        "microservices": [{"name": f"{name} Service", "db": f"{name}DB"} for name in services],
+        "databases": [{"name": f"{name}DB", "type": "SQL", "used_by": [f"{name} Service"]} for name in services],
+        "events": [{"from": f"{src} Service", "to": f"{dst} Service", "type": protocol,
+                    "description": f"{src} calls {dst} over {protocol}"} for src, dst, protocol in calls],
+    })
+
+
+def capped_extraction(prompt: str) -> str:
+    return full_extraction(prompt)[:REPLY_CHAR_LIMIT]
+
+
+def bench_chunk_sizing():
+    fake = fake_llm_backend.install(fake_llm_backend.FakeLLMBackend(latency=0.0, responder=capped_extraction))
+    from handler_pack import chunk_handler, json_file_handler
+
+    chunks = list(chunk_handler.chunk_text("\n".join(brd_generator.iter_brd_lines(BRD_WORDS))))
+    expected = {(f"{src} Service", f"{dst} Service") for chunk in chunks for src, dst, _ in SERVICE_CALL.findall(chunk)}
+    print(f"\n📄 {BRD_WORDS:,} words, {len(chunks)} chunks, {len(expected)} distinct service calls; "
+          f"replies cut off after {REPLY_CHAR_LIMIT} chars")
+    for adaptive in (False, True):
+        fake.calls = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            architecture = json_file_handler.create_json_file_from_brd(
+                chunks, incremental=False, output_dir=tempfile.mkdtemp(), dedup=False, adaptive=adaptive)
+        elapsed = time.perf_counter() - start
+        found = {(event["from"], event["to"]) for event in architecture["events"]} & expected
+        print(f"   adaptive={str(adaptive):5}  {fake.calls:4} LLM calls  {len(found):5}/{len(expected)} calls "
+              f"recovered ({len(found) / len(expected):6.1%})  {elapsed:6.2f}s")
+
+
+def main():
+    bench_hedging()
+    bench_chunk_sizing()
+
+
+if __name__ == "__main__":
+    main()
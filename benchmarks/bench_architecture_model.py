@@ -0,0 +1,76 @@
+"""
+The indexed ArchitectureModel vs scanning merged_architecture.json lists: cost of building
+and validating the model, then per-query cost of the lookups the handlers make (a node's
+kind, a database's users, a service's callees and neighbourhood).
+
+    python -m benchmarks.bench_architecture_model
+"""
+import json
+import time
+
+from benchmarks import brd_generator, fake_llm_backend
+from handler_pack import architecture_model, merge_handler
+
+BRD_WORDS = (100_000, 1_000_000)
+LINES_PER_CHUNK = 60
+QUERIES = 2000
+
+
+def synthetic_architecture(words: int) -> dict:
+    lines = list(brd_generator.iter_brd_lines(words))
+    extractions = [
+        ((i,), json.loads(fake_llm_backend.procedural_extraction("\n".join(lines[i:i + LINES_PER_CHUNK]))))
+        for i in range(0, len(lines), LINES_PER_CHUNK)
+    ]
+    return merge_handler.tree_merge(extractions, max_workers=1).architecture()
+
+
+def scan_queries(architecture: dict, services: list) -> int:
+    """
+    The lookups answered by rescanning the lists, as the handlers did.
+    """
+    found = 0
+    for name in services:
+        found += any(svc.get("name") == name for svc in architecture["microservices"])
+        db = next((svc.get("db") for svc in architecture["microservices"] if svc.get("name") == name), None)
+        found += len(next((d["used_by"] for d in architecture["databases"] if d["name"] == db), []))
+        found += len({e["to"] for e in architecture["events"] if e["from"] == name})
+    return found
+
+
+def indexed_queries(model, services: list) -> int:
+    found = 0
+    for name in services:
+        found += model.kind(name) == "service"
+        found += len(model.used_by.get(model.db_of.get(name), ()))
+        found += len({event.dst for event in model.out_edges.get(name, ())})
+    return found
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    for words in BRD_WORDS:
+        architecture = synthetic_architecture(words)
+        model, build = timed(architecture_model.from_json, architecture)
+        _, validate = timed(model.validate)
+        print(f"\n📄 {words:,} words: {len(model)} nodes, {len(model.events)} events")
+        print(f"   build {build * 1000:7.2f}ms   validate {validate * 1000:7.2f}ms")
+
+        names = [node.name for node in model.of_kind("service")]
+        services = [names[i % len(names)] for i in range(QUERIES)]
+        scanned, scan = timed(scan_queries, architecture, services)
+        indexed, index = timed(indexed_queries, model, services)
+        assert scanned == indexed
+        print(f"   {QUERIES} lookups: list scans {scan * 1000:8.1f}ms   indexed {index * 1000:6.2f}ms  "
+              f"({scan / index:,.0f}x)")
+        _, seconds = timed(lambda: [model.neighborhood([name], depth=2) for name in services[:200]])
+        print(f"   200 depth-2 neighbourhoods {seconds * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
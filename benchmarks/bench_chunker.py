@@ -0,0 +1,96 @@
+"""
+Memory and chunk-count comparison: word-slicing split_document vs the streaming chunker.
+
+    python -m benchmarks.bench_chunker
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ai_uitls.token_utility import estimate_tokens
+from handler_pack import chunk_handler
+
+SAMPLE_BRD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "business_requirements.txt")
+TARGET_SIZES_MB = (1, 4, 16)
+LEGACY_CHUNK_WORDS = 3000
+CONTEXT_WINDOW = 8192
+PROMPT_TEMPLATE_TOKENS = 450
+COMPLETION_RESERVE_TOKENS = 2048
+
+
+def legacy_split_document(file_path: str, max_words: int = LEGACY_CHUNK_WORDS):
+    """
+    The original tech_design_bot.load_brd + split_document.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    words = text.split()
+    return [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+
+
+def streaming_split_document(file_path: str):
+    count = 0
+    largest = 0
+    for chunk in chunk_handler.stream_file_chunks(file_path):
+        count += 1
+        largest = max(largest, estimate_tokens(chunk))
+    return count, largest
+
+
+def write_brd(size_mb: int) -> str:
+    """
+    Multi-MB BRD made of renumbered copies of the sample document.
+    """
+    with open(SAMPLE_BRD, "r", encoding="utf-8") as f:
+        sample = f.read()
+    path = os.path.join(tempfile.mkdtemp(), f"brd_{size_mb}mb.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        written = 0
+        copy = 0
+        while written < size_mb * 1024 * 1024:
+            copy += 1
+            part = f"\n\n# Module {copy}\n\n" + sample.replace("FinSmart", f"FinSmart{copy}")
+            f.write(part)
+            written += len(part.encode("utf-8"))
+    return path
+
+
+def headroom(chunk_tokens: int) -> int:
+    """
+    Context tokens left after the prompt and a completion reserve (negative = overflow).
+    """
+    return CONTEXT_WINDOW - PROMPT_TEMPLATE_TOKENS - COMPLETION_RESERVE_TOKENS - chunk_tokens
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    print(f"{'size':>6} {'splitter':>10} {'chunks':>7} {'max tokens':>11} {'headroom':>9} "
+          f"{'peak MB':>8} {'seconds':>8}")
+    for size_mb in TARGET_SIZES_MB:
+        path = write_brd(size_mb)
+
+        chunks, elapsed, peak = measure(legacy_split_document, path)
+        token_counts = [estimate_tokens(chunk) for chunk in chunks]
+        print(f"{size_mb:>4}MB {'legacy':>10} {len(chunks):>7} {max(token_counts):>11} "
+              f"{headroom(max(token_counts)):>9} "
+              f"{peak / 2 ** 20:>8.1f} {elapsed:>8.2f}")
+        del chunks
+
+        (count, largest), elapsed, peak = measure(streaming_split_document, path)
+        print(f"{size_mb:>4}MB {'streaming':>10} {count:>7} {largest:>11} {headroom(largest):>9} "
+              f"{peak / 2 ** 20:>8.1f} {elapsed:>8.2f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Concurrent extraction against a local stub LLM server with latency and 429s, which
+llm_client retries (honoring Retry-After) below the handler. Also checks that replies
+with empty sections are not retried, streamed or not.
+
+    python -m benchmarks.bench_concurrent_extraction
+"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from ai_uitls import llm_client, response_cache
+from benchmarks.stub_llm_server import StubLLMServer
+
+CHUNK_COUNT = 32
+LATENCY = 0.1  # seconds per stub LLM call
+RATE_LIMIT_RATE = 0.05  # share of calls answered with HTTP 429
+CONCURRENCY_LEVELS = (1, 2, 4, 8, 16)
+
+
+def run(concurrency: int, chunks, streaming: bool = True):
+    from handler_pack import json_file_handler
+
+    with StubLLMServer(latency=LATENCY, rate_limit_rate=RATE_LIMIT_RATE, seed=concurrency) as server:
+        # No RPM/TPM ceiling here: the concurrency cap is what is being measured
+        client = llm_client.set_backend(llm_client.HttpBackend(server.base_url, api_key="stub"),
+                                        requests_per_minute=None, tokens_per_minute=None)
+        start = time.perf_counter()
+        architecture = json_file_handler.create_json_file_from_brd(
+            chunks, max_concurrency=concurrency, incremental=False, streaming=streaming
+        )
+        return time.perf_counter() - start, architecture, server, client
+
+
+def check_empty_replies(chunks):
+    """
+    A well-formed reply with empty sections settles its chunk: streamed or not, one call per chunk, no retry.
+    """
+    from handler_pack import json_file_handler
+
+    empty = json.dumps({"actors": [], "microservices": [], "databases": [], "events": []})
+    calls = {}
+    for streaming in (False, True):
+        with StubLLMServer(latency=0, responder=lambda prompt: empty) as server:
+            llm_client.set_backend(llm_client.HttpBackend(server.base_url, api_key="stub"),
+                                   requests_per_minute=None, tokens_per_minute=None)
+            with contextlib.redirect_stdout(io.StringIO()):
+                json_file_handler.create_json_file_from_brd(chunks, incremental=False, streaming=streaming)
+            calls[streaming] = server.requests
+    assert calls[False] == calls[True] == len(chunks), calls
+    print(f"\n✅ Empty replies: {len(chunks)} LLM calls for {len(chunks)} chunks, streamed or not")
+
+
+def main():
+    response_cache.CACHE_ENABLED = False  # every run makes the same calls
+    chunks = [f"Chunk {i}: the platform exposes service {i} to partner {i % 5}." for i in range(CHUNK_COUNT)]
+    os.chdir(tempfile.mkdtemp())
+
+    baseline, expected, _, _ = run(1, chunks, streaming=False)
+    print(f"{'concurrency':>12} {'seconds':>9} {'speedup':>8} {'429s':>5} {'retries':>8} identical")
+    for concurrency in CONCURRENCY_LEVELS:
+        elapsed, architecture, server, client = run(concurrency, chunks)
+        print(f"{concurrency:>12} {elapsed:>9.2f} {baseline / elapsed:>8.2f} {server.rate_limited:>5} "
+              f"{client.retries:>8} {architecture == expected}")
+    check_empty_replies(chunks[:3])
+
+
+if __name__ == "__main__":
+    main()
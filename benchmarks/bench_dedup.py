@@ -0,0 +1,60 @@
+"""
+Near-duplicate chunk detection: detection cost vs BRD size (should grow linearly) and
+LLM calls saved on BRDs with repeated boilerplate sections.
+
+    python -m benchmarks.bench_dedup
+"""
+import os
+import tempfile
+import time
+
+from benchmarks import brd_generator, fake_llm_backend
+from handler_pack import chunk_handler, dedup_handler
+
+SIZES = (10_000, 100_000, 1_000_000)
+BOILERPLATE_WORDS = 4000  # several chunks
+BOILERPLATE_EVERY = 4  # a repeated NFR appendix after every 4th section
+
+
+def write_repetitive_brd(path: str, words: int) -> str:
+    """
+    Synthetic BRD where a lightly edited boilerplate NFR appendix recurs between sections.
+    """
+    boilerplate = [line for line in brd_generator.iter_brd_lines(BOILERPLATE_WORDS, seed=99)][4:]
+    with open(path, "w", encoding="utf-8") as f:
+        for line in brd_generator.iter_brd_lines(words):
+            f.write(line + "\n")
+            if line.endswith("Service Requirements") and int(line.split(".")[0]) % BOILERPLATE_EVERY == 0:
+                f.write(f"\nAppendix {line.split('.')[0]}. Non-Functional Requirements (standard)\n\n")
+                for nfr_line in boilerplate:
+                    f.write(nfr_line + "\n")
+                f.write("\n")
+    return path
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    print(f"{'words':>9} {'chunks':>7} {'dups':>6} {'detect':>9} {'per chunk':>10}")
+    for words in SIZES:
+        brd_file = write_repetitive_brd(os.path.join(workdir, f"brd_{words}.txt"), words)
+        chunks = list(chunk_handler.stream_file_chunks(brd_file))
+        start = time.perf_counter()
+        duplicates = dedup_handler.find_near_duplicates(chunks)
+        elapsed = time.perf_counter() - start
+        print(f"{words:>9,} {len(chunks):>7} {len(duplicates):>6} {elapsed:>8.3f}s {elapsed / len(chunks) * 1000:>8.2f}ms")
+
+    # End to end on the 100k-word BRD: model calls with and without dedup
+    fake = fake_llm_backend.install(fake_llm_backend.FakeLLMBackend(latency=0.0, responder=fake_llm_backend.fake_reply))
+    from handler_pack import json_file_handler
+
+    chunks = list(chunk_handler.stream_file_chunks(os.path.join(workdir, "brd_100000.txt")))
+    for dedup in (False, True):
+        fake.calls = 0
+        architecture = json_file_handler.create_json_file_from_brd(
+            chunks, incremental=False, output_dir=tempfile.mkdtemp(), dedup=dedup)
+        print(f"\n📊 dedup={dedup}: {fake.calls} LLM calls for {len(chunks)} chunks, "
+              f"{len(architecture['microservices'])} services, {len(architecture['events'])} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+C4 diagram rendering for growing architectures: the original single-graph DOT build vs
+build_digraph, the partitioning into per-component diagrams plus an overview, and (when
+Graphviz's `dot` is installed) one big render vs parallel partition renders and a
+re-render where nothing changed.
+
+    python -m benchmarks.bench_diagram_render
+"""
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import time
+
+from benchmarks import brd_generator, fake_llm_backend
+from handler_pack import diagram_render_handler, layout_engine, merge_handler
+
+BRD_WORDS = (20_000, 100_000, 400_000, 1_000_000)
+LINES_PER_CHUNK = 60
+BUILD_REPEAT = 5
+
+
+def legacy_build_digraph(layout_json: dict):
+    """
+    The original render_layout_to_png up to the render call: two node scans, labels lowercased per test.
+    """
+    import graphviz
+
+    dot = graphviz.Digraph(format='png')
+    dot.attr(rankdir='TB', splines='ortho', fontname='Helvetica')
+    microservices = [node for node in layout_json.get("nodes", []) if node.get("type", "").lower() == "service"]
+    other_nodes = [node for node in layout_json.get("nodes", []) if node.get("type", "").lower() != "service"]
+    for node in other_nodes:
+        node_name = node.get("name", "").strip()
+        node_type = node.get("type", "").lower()
+        if not node_name or node_name.lower() == "null":
+            continue
+        shape = "ellipse" if node_type == "actor" else "box"
+        style = "filled"
+        if node_type == "db":
+            shape = "cylinder"
+        elif node_type == "external":
+            style = "dashed,filled"
+        dot.node(node_name, shape=shape, style=style, fillcolor=node.get("color", "white"), fontsize="12",
+                 fontcolor="black", width="1.2", height="0.8", pos=f'{node.get("x", 0)},{node.get("y", 0)}!')
+    if microservices:
+        with dot.subgraph(name="cluster_microservices") as c:
+            c.attr(label="Microservices Layer", color="gray", style="dotted", fontsize="14", fontname="Helvetica-Bold")
+            for node in microservices:
+                node_name = node.get("name", "").strip()
+                if not node_name:
+                    continue
+                c.node(node_name, shape="box3d", style="filled", fillcolor=node.get("color", "lightblue"),
+                       fontsize="12", fontcolor="black", width="1.2", height="0.8",
+                       pos=f'{node.get("x", 0)},{node.get("y", 0)}!')
+    for edge in layout_json.get("edges", []):
+        src = edge.get("from")
+        dst = edge.get("to")
+        label = edge.get("label", "").strip()
+        if not src or not dst:
+            continue
+        edge_color = "black"
+        edge_style = "solid"
+        if "db" in label.lower():
+            edge_color = "brown"; edge_style = "dashed"
+        elif "rest" in label.lower() or "api" in label.lower():
+            edge_color = "black"
+        elif "queue" in label.lower() or "event" in label.lower():
+            edge_color = "black"; edge_style = "dashed"
+        elif "grpc" in label.lower():
+            edge_color = "cyan"
+        dot.edge(src, dst, xlabel=label, color=edge_color, fontcolor=edge_color, fontsize="10", style=edge_style,
+                 arrowsize="0.7")
+    return dot
+
+
+def synthetic_layout(words: int) -> dict:
+    lines = list(brd_generator.iter_brd_lines(words))
+    extractions = [
+        ((i,), json.loads(fake_llm_backend.procedural_extraction("\n".join(lines[i:i + LINES_PER_CHUNK]))))
+        for i in range(0, len(lines), LINES_PER_CHUNK)
+    ]
+    return layout_engine.build_local_layout(merge_handler.tree_merge(extractions, max_workers=1).architecture())
+
+
+def best_of(func, repeat: int = BUILD_REPEAT) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    has_dot = shutil.which("dot") is not None
+    if not has_dot:
+        print("⚠️ Graphviz 'dot' executable not found: timing DOT generation and partitioning only")
+    for words in BRD_WORDS:
+        layout_json = synthetic_layout(words)
+        print(f"\n📄 {words:,} words: {len(layout_json['nodes'])} nodes, {len(layout_json['edges'])} edges")
+
+        legacy = best_of(lambda: legacy_build_digraph(layout_json))
+        current = best_of(lambda: diagram_render_handler.build_digraph(layout_json))
+        assert legacy_build_digraph(layout_json).body == diagram_render_handler.build_digraph(layout_json).body
+        print(f"   DOT build   legacy {legacy * 1000:8.2f}ms   build_digraph {current * 1000:8.2f}ms  "
+              f"({legacy / current:.2f}x)")
+
+        seconds = best_of(lambda: diagram_render_handler.partition_layout(layout_json))
+        parts, shared_edges = diagram_render_handler.partition_layout(layout_json)
+        largest = max(len(sub_layout["nodes"]) for _, sub_layout in parts)
+        print(f"   partition   {seconds * 1000:8.2f}ms  {len(parts)} parts (largest {largest} nodes), "
+              f"{len(shared_edges)} edges in the overview")
+
+        if has_dot:
+            workdir = tempfile.mkdtemp(prefix="bench_diagram_")
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    single = best_of(lambda: diagram_render_handler.render_layout(
+                        layout_json, f"{workdir}/single", large_nodes=len(layout_json["nodes"]), formats=("png",)), 1)
+                    first = best_of(lambda: diagram_render_handler.render_layout(
+                        layout_json, f"{workdir}/parts", large_nodes=0), 1)
+                    again = best_of(lambda: diagram_render_handler.render_layout(
+                        layout_json, f"{workdir}/parts", large_nodes=0), 1)
+                print(f"   render      single PNG {single:7.2f}s   partitions PNG+SVG {first:7.2f}s   "
+                      f"unchanged re-run {again:7.3f}s")
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+md_to_docx: the original Markdown → HTML → BeautifulSoup walk vs the streaming DocxWriter,
+on design documents with a large component table.
+
+    python -m benchmarks.bench_docx_render
+"""
+import os
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+from docx import Document
+from markdown import markdown
+
+from handler_pack import docx_render_handler
+
+TABLE_ROWS = (250, 500, 1000)
+
+
+def legacy_md_to_docx(md_file: str) -> str:
+    """
+    The original doc_generation_handler.md_to_docx (diagram embedding left out).
+    """
+    with open(md_file, "r", encoding="utf-8") as f:
+        md_content = f.read()
+    soup = BeautifulSoup(markdown(md_content, extensions=["tables", "fenced_code"]), "html.parser")
+    doc = Document()
+
+    def add_list_items(parent_element, list_type="ul"):
+        for li in parent_element.find_all("li", recursive=False):
+            doc.add_paragraph(li.text, style='List Bullet' if list_type == "ul" else 'List Number')
+            for nested_list in li.find_all(["ul", "ol"], recursive=False):
+                add_list_items(nested_list, list_type=nested_list.name)
+
+    for element in soup.children:
+        if element.name in ["h1", "h2", "h3"]:
+            doc.add_heading(element.text, level=int(element.name[1]))
+        elif element.name == "p":
+            doc.add_paragraph(element.text)
+        elif element.name in ("ul", "ol"):
+            add_list_items(element, element.name)
+        elif element.name == "table":
+            rows = element.find_all("tr")
+            if rows:
+                cols = rows[0].find_all(["td", "th"])
+                table = doc.add_table(rows=len(rows), cols=len(cols))
+                table.style = "Table Grid"
+                for i, row in enumerate(rows):
+                    for j, cell in enumerate(row.find_all(["td", "th"])):
+                        table.rows[i].cells[j].text = cell.text
+
+    docx_file = md_file.replace(".md", ".legacy.docx")
+    doc.save(docx_file)
+    return docx_file
+
+
+def write_design_doc(path: str, table_rows: int):
+    lines = ["# Order Platform – System Design Document", "",
+             "## 1. Overview", "", "The platform is **event driven** and uses `Kafka` for *async* flows.", "",
+             "#### 1.1 Assumptions", "", "- Each service owns its database", "  - no shared schemas", "",
+             "```python", "def handler(event):", "    return event", "```", "",
+             "## 2. Components", "", "| Component | Type | Database | Owner | Description |",
+             "|---|---|---|---|---|"]
+    lines += [f"| Service{i} | Service | Db{i % 40} | Team{i % 12} | Handles **domain {i}** requests |"
+              for i in range(table_rows)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    print(f"{'rows':>6} {'legacy':>9} {'streaming':>10} {'speed-up':>9}")
+    for rows in TABLE_ROWS:
+        md_file = os.path.join(workdir, f"design_{rows}.md")
+        write_design_doc(md_file, rows)
+        legacy_file, legacy = timed(legacy_md_to_docx, md_file)
+        new_file, new = timed(docx_render_handler.md_to_docx, md_file, None, md_file.replace(".md", ".new.docx"))
+
+        old_doc, new_doc = Document(legacy_file), Document(new_file)
+        assert len(new_doc.tables[0].rows) == len(old_doc.tables[0].rows) == rows + 1
+        print(f"{rows:>6} {legacy:>8.2f}s {new:>9.2f}s {legacy / new:>8.1f}x")
+
+    headings = [p.text for p in new_doc.paragraphs if p.style.name.startswith("Heading")]
+    code = [p.text for p in new_doc.paragraphs if p.style.name == "No Spacing"]
+    lost = [p.text for p in old_doc.paragraphs if p.style.name.startswith("Heading")]
+    print(f"\nheadings kept: {len(headings)} (legacy {len(lost)}), code blocks kept: {len(code)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+BRD ingestion: a ~500-page PDF (and the same BRD as DOCX) read the original way, by
+joining every page's text before chunking, vs streamed page by page through
+ingest_handler into the chunker. Reports time to first chunk, total time, peak Python
+memory and how much heading/table structure reaches the chunks. Also times the
+memory-mapped plain-text reader against buffered line iteration.
+
+    python -m benchmarks.bench_ingest [--pages 500]
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import brd_generator
+from handler_pack import chunk_handler, ingest_handler
+
+WORDS_PER_PAGE = 375  # what brd_generator text fills on an A4 page at the report styles
+TEXT_MB = 64
+
+
+def markdown_brd_lines(words: int):
+    """
+    brd_generator lines with its numbered section titles marked as Markdown headings.
+    """
+    for line in brd_generator.iter_brd_lines(words):
+        yield re.sub(r"^(\d+\. .+ Requirements)$", r"## \1", line)
+
+
+def write_pdf(path: str, words: int) -> str:
+    """
+    Render the BRD with the design-doc PDF styles; h2 headings become outline bookmarks.
+    """
+    from reportlab.platypus import SimpleDocTemplate
+
+    from handler_pack import pdf_render_handler
+
+    styles = pdf_render_handler._styles()
+
+    class OutlinedDoc(SimpleDocTemplate):
+        def afterFlowable(self, flowable):
+            style = getattr(flowable, "style", None)
+            if style is not None and style.name == styles["h2"].name:
+                key = f"h{id(flowable)}"
+                self.canv.bookmarkPage(key)
+                self.canv.addOutlineEntry(flowable.getPlainText(), key, level=0)
+
+    margin = pdf_render_handler.PAGE_MARGIN
+    doc = OutlinedDoc(path, pagesize=pdf_render_handler.PAGE_SIZE, leftMargin=margin, rightMargin=margin,
+                      topMargin=margin, bottomMargin=margin)
+    doc.build(list(pdf_render_handler.markdown_flowables(markdown_brd_lines(words), styles, doc.width)))
+    return path
+
+
+def write_docx(path: str, words: int) -> str:
+    from handler_pack import docx_render_handler, markdown_handler
+
+    writer = docx_render_handler.DocxWriter()
+    for block in markdown_handler.iter_markdown_blocks(markdown_brd_lines(words)):
+        writer.add_block(block)
+    writer.doc.save(path)
+    return path
+
+
+def legacy_pdf_chunks(path: str):
+    """
+    The original approach: extract every page, join, then chunk the whole string.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    return chunk_handler.chunk_text(text)
+
+
+def legacy_docx_chunks(path: str):
+    from docx import Document
+
+    text = "\n".join(paragraph.text for paragraph in Document(path).paragraphs)
+    return chunk_handler.chunk_text(text)
+
+
+def consume(func) -> tuple:
+    """
+    (seconds to first chunk, total seconds, chunks) for a callable returning chunks.
+    """
+    start = time.perf_counter()
+    first = None
+    collected = []
+    for chunk in func():
+        if first is None:
+            first = time.perf_counter() - start
+        collected.append(chunk)
+    return first or 0.0, time.perf_counter() - start, collected
+
+
+def peak_mb(func) -> float:
+    tracemalloc.start()
+    try:
+        for _ in func():
+            pass
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def structure(chunks: list) -> str:
+    lines = [line for chunk in chunks for line in chunk.splitlines()]
+    headings = sum(1 for line in lines if line.startswith("#"))
+    table_rows = sum(1 for line in lines if line.startswith("|"))
+    return f"{headings} headings, {table_rows} table rows"
+
+
+def compare(label: str, legacy, streamed, pages: int = None):
+    """
+    `legacy` and `streamed` are zero-argument callables returning chunks.
+    """
+    legacy_first, legacy_total, legacy_chunks = consume(legacy)
+    first, total, chunks = consume(streamed)
+    rate = f"  {pages / total:6.1f} pages/s" if pages else ""
+    print(f"   {label} legacy   first chunk {legacy_first:7.2f}s  total {legacy_total:7.2f}s  "
+          f"peak {peak_mb(legacy):7.1f}MB  {len(legacy_chunks)} chunks, {structure(legacy_chunks)}")
+    print(f"   {label} streamed first chunk {first:7.2f}s  total {total:7.2f}s  "
+          f"peak {peak_mb(streamed):7.1f}MB  {len(chunks)} chunks, {structure(chunks)}{rate}")
+
+
+def compare_text(workdir: str):
+    path = os.path.join(workdir, "brd.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        while f.tell() < TEXT_MB * 2 ** 20:
+            f.writelines(line + "\n" for line in brd_generator.iter_brd_lines(200_000))
+
+    def buffered():
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    def mapped():
+        return sum(1 for _ in ingest_handler.iter_text_lines(path, mmap_min_bytes=0))
+
+    for name, func in (("buffered", buffered), ("mmap", mapped)):
+        start = time.perf_counter()
+        lines = func()
+        print(f"   {TEXT_MB}MB text  {name:8s} {time.perf_counter() - start:6.2f}s  {lines:,} lines")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        words = args.pages * WORDS_PER_PAGE
+        start = time.perf_counter()
+        pdf_file = write_pdf(os.path.join(workdir, "brd.pdf"), words)
+        docx_file = write_docx(os.path.join(workdir, "brd.docx"), words)
+
+        from pypdf import PdfReader
+
+        pages = len(PdfReader(pdf_file).pages)
+        print(f"📄 {words:,} words: {pages} PDF pages ({os.path.getsize(pdf_file) / 2 ** 20:.1f}MB), "
+              f"DOCX {os.path.getsize(docx_file) / 2 ** 20:.1f}MB, generated in {time.perf_counter() - start:.1f}s")
+
+        compare("PDF ", lambda: legacy_pdf_chunks(pdf_file), lambda: chunk_handler.stream_file_chunks(pdf_file),
+                pages)
+        compare("DOCX", lambda: legacy_docx_chunks(docx_file), lambda: chunk_handler.stream_file_chunks(docx_file))
+        compare_text(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Fuzz and benchmark fix_ai_json against corrupted and truncated model outputs.
+
+    python -m benchmarks.bench_json_repair
+"""
+import json
+import random
+import re
+import time
+
+from benchmarks import fake_llm_backend
+
+fake_llm_backend.install(fake_llm_backend.FakeLLMBackend())
+from handler_pack import json_file_handler  # noqa: E402
+
+FUZZ_CASES = 3000
+SIZES_MB = (0.1, 1, 4)
+SEED = 7
+
+
+def legacy_fix_ai_json(raw_output: str):
+    """
+    The original multi-pass regex repair, kept for comparison.
+    """
+    if not raw_output:
+        return None
+    match = re.search(r'(\{.*|\[.*)', raw_output, re.DOTALL)
+    json_str = match.group(0).strip() if match else raw_output.strip()
+    json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
+    json_str = re.sub(r"(?<!\")'([A-Za-z0-9_ ]+)'(?=\s*:)", lambda m: '"' + m.group(1) + '"', json_str)
+    json_str = re.sub(r":\s*'([^']*)'", lambda m: ':"{}"'.format(m.group(1)), json_str)
+    open_curly, close_curly = json_str.count("{"), json_str.count("}")
+    if close_curly < open_curly:
+        json_str += "}" * (open_curly - close_curly)
+    open_square, close_square = json_str.count("["), json_str.count("]")
+    if close_square < open_square:
+        json_str += "]" * (open_square - close_square)
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        return None
+
+
+def sample_output(rng: random.Random, services: int) -> dict:
+    return {
+        "actors": [{"name": f"Actor {i}", "type": "External"} for i in range(max(1, services // 5))],
+        "microservices": [
+            {"name": f"Service {i}", "db": f"DB {{{i}}}", "exposes": ["REST", "Event"],
+             "consumes": ["Queue"], "scaling": "AutoScale", "criticality": rng.choice(["High", "Low"])}
+            for i in range(services)
+        ],
+        "databases": [{"name": f"DB {{{i}}}", "type": "SQL", "used_by": [f"Service {i}"]} for i in range(services)],
+        "events": [
+            {"from": f"Service {i}", "to": f"Service {i + 1}", "type": "REST",
+             "description": f"sends [batch] {{id: {i}}} and it's fine"}
+            for i in range(services)
+        ]
+    }
+
+
+def corrupt(text: str, rng: random.Random) -> str:
+    """
+    Apply the kinds of damage seen in real model outputs.
+    """
+    damage = rng.choice(["prose", "trailing_comma", "single_quotes", "truncate", "fences", "combo"])
+    if damage in ("prose", "combo"):
+        text = "Here is the JSON you asked for:\n" + text + "\nLet me know if you need anything else."
+    if damage in ("fences", "combo"):
+        text = "```json\n" + text + "\n```"
+    if damage in ("trailing_comma", "combo"):
+        text = re.sub(r"(\]|\}|\")(\s*\n\s*)(\]|\})", r"\1,\2\3", text)
+    if damage == "single_quotes":
+        text = text.replace('"', "'").replace("it's", "it is")
+    if damage in ("truncate", "combo"):
+        text = text[:rng.randint(1, len(text))]
+    return text
+
+
+def fuzz(repair, rng: random.Random):
+    """
+    Random damage to valid outputs plus random garbage; repairs must never raise.
+    Returns (recovered share of corrupted outputs, crashes).
+    """
+    recovered = 0
+    crashes = 0
+    for _ in range(FUZZ_CASES):
+        text = json.dumps(sample_output(rng, rng.randint(1, 8)), indent=2)
+        try:
+            if isinstance(repair(corrupt(text, rng)), dict):
+                recovered += 1
+        except Exception:
+            crashes += 1
+        garbage = "".join(rng.choice('{}[]",:\'\\ abc01tn\n') for _ in range(rng.randint(0, 200)))
+        try:
+            repair(garbage)
+        except Exception:
+            crashes += 1
+    return recovered / FUZZ_CASES, crashes
+
+
+def check_lossless(rng: random.Random):
+    """
+    Valid JSON must come back unchanged.
+    """
+    for _ in range(200):
+        data = sample_output(rng, rng.randint(1, 20))
+        for text in (json.dumps(data), json.dumps(data, indent=2)):
+            assert json_file_handler.fix_ai_json(text) == data
+
+
+def main():
+    check_lossless(random.Random(SEED))
+    print(f"{'repair':>8} {'recovered':>10} {'crashes':>8}")
+    for name, repair in (("legacy", legacy_fix_ai_json), ("stack", json_file_handler.fix_ai_json)):
+        recovered, crashes = fuzz(repair, random.Random(SEED))
+        print(f"{name:>8} {recovered:>10.1%} {crashes:>8}")
+
+    print(f"\n{'size':>7} {'input':>10} {'repair':>8} {'MB/s':>8} {'parsed':>7}")
+    rng = random.Random(SEED)
+    for size_mb in SIZES_MB:
+        services = 1
+        text = ""
+        while len(text) < size_mb * 1024 * 1024:
+            services *= 2
+            text = json.dumps(sample_output(rng, services), indent=2)
+        for label, damaged in (("intact", "Sure!\n" + text + "\nDone."),
+                               ("truncated", "Sure!\n" + text[:int(len(text) * 0.97)])):
+            for name, repair in (("legacy", legacy_fix_ai_json), ("stack", json_file_handler.fix_ai_json)):
+                start = time.perf_counter()
+                result = repair(damaged)
+                elapsed = time.perf_counter() - start
+                print(f"{len(damaged) / 2 ** 20:>5.1f}MB {label:>10} {name:>8} "
+                      f"{len(damaged) / 2 ** 20 / elapsed:>8.1f} {isinstance(result, dict)!s:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+LLM client layer against a local stub server: keep-alive pooling, 429 backoff,
+sync vs async throughput.
+
+    python -m benchmarks.bench_llm_client
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_uitls import llm_client
+from benchmarks.stub_llm_server import StubLLMServer
+
+REQUESTS = 200
+CONCURRENCY = 16
+LATENCY = 0.02
+RATE_LIMIT_RATE = 0.05
+MODEL = "stub-model"
+
+
+def messages(i: int):
+    return [{"role": "system", "content": "You output JSON only."},
+            {"role": "user", "content": f"Extract chunk {i}"}]
+
+
+def timed_call(client, i):
+    start = time.perf_counter()
+    client.create(MODEL, messages(i))
+    return time.perf_counter() - start
+
+
+def run_sync(server, pooled: bool):
+    backend = llm_client.HttpBackend(server.base_url, api_key="stub")
+    client = llm_client.LLMClient(backend, requests_per_minute=None, tokens_per_minute=None, backoff_base=0.05)
+    if not pooled:
+        # A fresh pool per call: every request pays for a new TCP connection
+        def call(i):
+            fresh = llm_client.LLMClient(llm_client.HttpBackend(server.base_url, api_key="stub"),
+                                         requests_per_minute=None, tokens_per_minute=None, backoff_base=0.05)
+            return timed_call(fresh, i)
+    else:
+        def call(i):
+            return timed_call(client, i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        latencies = list(executor.map(call, range(REQUESTS)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_async(server):
+    backend = llm_client.HttpBackend(server.base_url, api_key="stub")
+    client = llm_client.AsyncLLMClient(llm_client.LLMClient(
+        backend, requests_per_minute=None, tokens_per_minute=None, backoff_base=0.05))
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def call(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await client.create(MODEL, messages(i))
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(call(i) for i in range(REQUESTS)))
+    return time.perf_counter() - start, latencies
+
+
+def report(name, server, elapsed, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:>14} {REQUESTS / elapsed:>8.1f} {statistics.median(latencies) * 1000:>8.1f} "
+          f"{p95 * 1000:>8.1f} {server.rate_limited:>8} {server.connections:>12}")
+
+
+def main():
+    print(f"{'client':>14} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'429s':>8} {'connections':>12}")
+    for name, runner in (("sync pooled", lambda s: run_sync(s, True)),
+                         ("sync no-pool", lambda s: run_sync(s, False)),
+                         ("async pooled", lambda s: asyncio.run(run_async(s)))):
+        with StubLLMServer(latency=LATENCY, rate_limit_rate=RATE_LIMIT_RATE, retry_after=0.05) as server:
+            report(name, server, *runner(server))
+
+    with StubLLMServer(latency=LATENCY) as server:
+        client = llm_client.LLMClient(llm_client.HttpBackend(server.base_url, api_key="stub"))
+        pieces = [chunk.choices[0].delta.content for chunk in client.create(MODEL, messages(0), stream=True)]
+        print(f"\nstreamed {len(pieces)} pieces, {sum(map(len, pieces))} chars")
+
+    with StubLLMServer(latency=0.5) as server:
+        client = llm_client.LLMClient(llm_client.HttpBackend(server.base_url, api_key="stub"), max_retries=1)
+        start = time.perf_counter()
+        try:
+            client.create(MODEL, messages(0), deadline=0.2)
+        except Exception as e:
+            print(f"deadline 0.2s against 0.5s latency: {type(e).__name__} after {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
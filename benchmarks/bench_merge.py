@@ -0,0 +1,116 @@
+"""
+Merging thousands of chunk extractions: the original dict/list merge loop vs the indexed
+PartialArchitecture, sequentially and as a process-pool tree reduction. Also checks that
+shuffled input and different partitionings give identical output.
+
+    python -m benchmarks.bench_merge
+"""
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import brd_generator, fake_llm_backend
+from handler_pack import merge_handler
+
+DOCUMENTS = 20
+CHUNKS_PER_DOCUMENT = 500
+WORKER_COUNTS = (1, 2, 4)
+
+
+def legacy_merge(extractions: list) -> dict:
+    """
+    The original merge loop of create_json_file_from_brd (list-backed used_by, free-text event keys).
+    """
+    all_actors, all_services, all_databases, all_events = {}, {}, {}, set()
+    for data in extractions:
+        for actor in data.get("actors", []):
+            name = actor.get("name", str(actor)) if isinstance(actor, dict) else str(actor)
+            all_actors[name] = {"name": name, "type": actor.get("type", "External") if isinstance(actor, dict) else "External"}
+        for svc in data.get("microservices", data.get("services", [])):
+            name = svc.get("name")
+            if not name:
+                continue
+            if name not in all_services:
+                all_services[name] = {"name": name, "db": svc.get("db"), "exposes": svc.get("exposes", []),
+                                      "consumes": svc.get("consumes", []), "scaling": svc.get("scaling", "Unknown"),
+                                      "criticality": svc.get("criticality", "Medium")}
+            db_name = svc.get("db")
+            if db_name:
+                if db_name not in all_databases:
+                    all_databases[db_name] = {"name": db_name, "type": "Unknown", "used_by": [name]}
+                elif name not in all_databases[db_name]["used_by"]:
+                    all_databases[db_name]["used_by"].append(name)
+        for inter in data.get("events", data.get("interactions", [])):
+            src, dst = inter.get("from"), inter.get("to")
+            if src and dst:
+                all_events.add((src, dst, inter.get("type", "Unknown"), inter.get("description", "")))
+    return {"actors": list(all_actors.values()), "microservices": list(all_services.values()),
+            "databases": list(all_databases.values()),
+            "events": [{"from": f, "to": t, "type": typ, "description": d} for f, t, typ, d in all_events]}
+
+
+def corpus_extractions() -> list:
+    """
+    (rank prefix, extraction) for DOCUMENTS synthetic BRDs; event wording varies in case and punctuation.
+    """
+    rng = random.Random(7)
+    lines = list(brd_generator.iter_brd_lines(CHUNKS_PER_DOCUMENT * 60))
+    extractions = []
+    for doc in range(DOCUMENTS):
+        for idx in range(CHUNKS_PER_DOCUMENT):
+            start = rng.randrange(0, len(lines) - 60)
+            data = json.loads(fake_llm_backend.procedural_extraction("\n".join(lines[start:start + 60])))
+            for event in data["events"]:
+                if rng.random() < 0.3:
+                    event["description"] = event["description"].upper() + "."
+            extractions.append(((doc, idx), data))
+    return extractions
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def write_manifests(extractions: list, workdir: str) -> list:
+    """
+    One extraction manifest per document, as batch_design_bot leaves them in the job folders.
+    """
+    manifest_files = []
+    for doc in range(DOCUMENTS):
+        path = os.path.join(workdir, f"doc_{doc}.manifest.json")
+        chunks = [{"index": rank[1], "fingerprint": "", "extraction": data} for rank, data in extractions if rank[0] == doc]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"chunks": chunks}, f)
+        manifest_files.append(path)
+    return manifest_files
+
+
+def main():
+    extractions = corpus_extractions()
+    print(f"📄 {len(extractions)} chunk extractions from {DOCUMENTS} documents, {os.cpu_count()} CPUs\n")
+
+    legacy, seconds = timed(legacy_merge, [data for _, data in extractions])
+    print(f"legacy loop            {seconds:7.2f}s  {len(legacy['events']):>6} events")
+    reference, seconds = timed(lambda: merge_handler.tree_merge(extractions, max_workers=1).architecture())
+    print(f"indexed, sequential    {seconds:7.2f}s  {len(reference['events']):>6} events (normalised keys)")
+    assert reference["actors"] == legacy["actors"]  # same order, and the latest type wins as before
+
+    manifest_files = write_manifests(extractions, tempfile.mkdtemp())
+    for workers in WORKER_COUNTS:
+        merged, seconds = timed(lambda: merge_handler.merge_manifests(manifest_files, max_workers=workers).architecture())
+        assert merged == reference
+        print(f"manifests, {workers} workers  {seconds:7.2f}s")
+
+    shuffled = extractions[:]
+    random.Random(1).shuffle(shuffled)
+    for batch_size in (1, 7, 64, 1000):
+        assert merge_handler.tree_merge(shuffled, max_workers=2, batch_size=batch_size).architecture() == reference
+    print("\n✅ Actors match the legacy merge; shuffled input and batch sizes 1/7/64/1000 all give identical output")
+
+
+if __name__ == "__main__":
+    main()
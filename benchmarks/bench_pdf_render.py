@@ -0,0 +1,80 @@
+"""
+PDF throughput: in-process reportlab rendering of a ~50-page design document.
+
+docx2pdf drives Microsoft Word (one process launch per document, Windows/macOS only), so it
+cannot run here; this measures the reportlab backend that replaces it.
+
+    python -m benchmarks.bench_pdf_render
+"""
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from pypdf import PdfReader
+
+from handler_pack import pdf_render_handler
+
+SECTIONS = 72
+DOCUMENTS = 10
+
+
+def write_png(path: str, width: int = 800, height: int = 500):
+    """
+    Plain grey PNG standing in for the C4 diagram.
+    """
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+    raw = b"".join(b"\x00" + b"\xc8" * (width * 3) for _ in range(height))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw)))
+        f.write(chunk(b"IEND", b""))
+
+
+def write_design_doc(path: str):
+    """
+    Synthetic design document shaped like the generated ones: sections, prose, lists, tables, code.
+    """
+    lines = ["# Order Platform – System Design Document", ""]
+    for s in range(1, SECTIONS + 1):
+        lines += [f"## {s}. Service{s} Design", "",
+                  f"The **Service{s}** component owns *order state* for region {s} and talks to "
+                  f"`Service{s + 1}` over REST. " * 4, "",
+                  "### Responsibilities", ""]
+        lines += [f"- Handles responsibility {i} with **validation** and `retry` logic" for i in range(6)]
+        lines += ["", "| Event | Source | Target | Protocol |", "|---|---|---|---|"]
+        lines += [f"| Event{s}_{i} | Service{s} | Service{s + 1} | Kafka |" for i in range(12)]
+        lines += ["", "```json", '{"service": "Service%d", "db": "Db%d"}' % (s, s), "```", "", "---", ""]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    md_file = os.path.join(workdir, "Design_Document.md")
+    png_file = os.path.join(workdir, "c4_ai_full.png")
+    write_design_doc(md_file)
+    write_png(png_file)
+
+    start = time.perf_counter()
+    pdf_file = pdf_render_handler.md_to_pdf(md_file, png_file)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(DOCUMENTS):
+        pdf_render_handler.md_to_pdf(md_file, png_file, os.path.join(workdir, f"doc_{i}.pdf"))
+    elapsed = time.perf_counter() - start
+
+    pages = len(PdfReader(pdf_file).pages)
+    print(f"\n📄 {pages} pages, {os.path.getsize(pdf_file) / 1024:.0f} KB")
+    print(f"first document (cold): {first:.2f}s")
+    print(f"warm: {DOCUMENTS} documents in {elapsed:.2f}s → {DOCUMENTS / elapsed:.2f} docs/s, "
+          f"{pages * DOCUMENTS / elapsed:.0f} pages/s")
+
+
+if __name__ == "__main__":
+    main()
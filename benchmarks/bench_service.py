@@ -0,0 +1,114 @@
+"""
+Job latency of the long-running design service (warm workers, job queue) vs a cold
+interpreter per BRD running the same pipeline, both against a local stub LLM server.
+Each job is submitted after the previous one finished, so the numbers are per-job
+latency, not throughput. Without the Graphviz `dot` executable every job stops at the
+diagram stage, in both modes alike.
+
+    python -m benchmarks.bench_service [--jobs 6] [--words 3000]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import design_service
+from benchmarks import brd_generator, fake_llm_backend
+from benchmarks.stub_llm_server import StubLLMServer
+
+LATENCY = 0.01
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One cold run: a fresh interpreter imports everything and builds its own client and cache.
+# The stub has no Groq rate limits, so neither mode throttles
+COLD_RUN = """
+import sys
+from ai_uitls import llm_client
+llm_client.set_backend(llm_client.HttpBackend(sys.argv[1], api_key="stub"), requests_per_minute=None,
+                       tokens_per_minute=None)
+import tech_design_bot
+try:
+    tech_design_bot.run_design_pipeline(sys.argv[2], sys.argv[3])
+except Exception as e:
+    print(f"failed: {type(e).__name__}", file=sys.stderr)
+    sys.exit(1)
+"""
+
+
+def write_brds(workdir: str, jobs: int, words: int) -> list:
+    paths = []
+    for i in range(jobs):
+        path = os.path.join(workdir, f"brd_{i}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            # A different slice of the generated BRD per job, so no job hits another's cache entries
+            lines = list(brd_generator.iter_brd_lines(words * (i + 1)))
+            f.write("\n".join(lines[len(lines) * i // (i + 1):]))
+        paths.append(path)
+    return paths
+
+
+def run_cold(brds: list, base_url: str, workdir: str) -> tuple:
+    latencies, failed = [], 0
+    env = {**os.environ, "PYTHONPATH": REPO_DIR}
+    for i, brd in enumerate(brds):
+        output_dir = os.path.join(workdir, f"cold_{i}")
+        os.makedirs(output_dir)
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", COLD_RUN, base_url, brd, output_dir], cwd=output_dir,
+                                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - start)
+        failed += result.returncode != 0
+    return latencies, failed
+
+
+def run_warm(brds: list, base_url: str, workdir: str) -> tuple:
+    latencies, failed = [], 0
+    with design_service.DesignService(os.path.join(workdir, "service"), port=0, workers=1, llm_base_url=base_url,
+                                      llm_options={"requests_per_minute": None, "tokens_per_minute": None}) as service:
+        time.sleep(1.0)  # let the worker warm up, as a running service would have
+        for brd in brds:
+            with open(brd, "rb") as f:
+                request = urllib.request.Request(f"{service.url}/jobs?name={os.path.basename(brd)}",
+                                                 data=f.read(), method="POST")
+            start = time.perf_counter()
+            job = json.load(urllib.request.urlopen(request))
+            while job["status"] not in ("done", "failed"):
+                time.sleep(0.01)
+                job = json.load(urllib.request.urlopen(f"{service.url}/jobs/{job['id']}"))
+            latencies.append(time.perf_counter() - start)
+            failed += job["status"] == "failed"
+    return latencies, failed
+
+
+def report(label: str, latencies: list, failed: int):
+    print(f"   {label:22s} median {statistics.median(latencies):6.2f}s  mean {statistics.mean(latencies):6.2f}s  "
+          f"max {max(latencies):6.2f}s  ({failed}/{len(latencies)} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--words", type=int, default=3000, help="words per BRD")
+    args = parser.parse_args()
+
+    if shutil.which("dot") is None:
+        print("⚠️ Graphviz `dot` not found: jobs fail at the diagram stage, DOCX/PDF assembly is not timed")
+    workdir = tempfile.mkdtemp(prefix="bench_service_")
+    try:
+        brds = write_brds(workdir, args.jobs, args.words)
+        with StubLLMServer(latency=LATENCY, responder=fake_llm_backend.fake_reply) as server:
+            print(f"📄 {args.jobs} BRDs of ~{args.words:,} words, stub LLM latency {LATENCY * 1000:.0f}ms")
+            report("cold process per BRD", *run_cold(brds, server.base_url, workdir))
+            report("warm service worker", *run_warm(brds, server.base_url, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cold-start cost of the CLI: for every tech_design_bot subcommand, the import time of
+the modules it loads and which heavy dependencies come with them, each measured in a
+fresh interpreter. With --baseline the same is measured on an older commit (exported
+with git archive), e.g. the one before the subcommand CLI, where every command
+imported the whole document stack.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --baseline HEAD~1
+"""
+import argparse
+import ast
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 7
+HEAVY_MODULES = ("groq", "graphviz", "docx", "docx2pdf", "reportlab", "bs4", "markdown", "asyncio", "sqlite3")
+
+# Modules each subcommand loads on top of tech_design_bot itself
+COMMAND_MODULES = {
+    "import": [],
+    "extract": ["handler_pack.json_file_handler"],
+    "layout": ["handler_pack.image_generation_handler"],
+    "render": ["handler_pack.image_generation_handler", "graphviz"],
+    "doc": ["handler_pack.doc_generation_handler", "handler_pack.docx_render_handler",
+            "handler_pack.pdf_render_handler"],
+}
+COMMAND_MODULES["all"] = sorted({module for modules in COMMAND_MODULES.values() for module in modules})
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+try:
+    import tech_design_bot
+    for module in {modules!r}:
+        __import__(module)
+    error = None
+except Exception as e:  # e.g. the baseline's import-time Groq() without an API key
+    error = f"{{type(e).__name__}}: {{e}}"
+print(repr((time.perf_counter() - start, sorted(m for m in {heavy!r} if m in sys.modules), error)))
+"""
+
+
+def probe(tree: str, modules: list) -> tuple:
+    """
+    Import tech_design_bot + `modules` in a fresh interpreter run from `tree` -> (seconds, heavy modules, error).
+    """
+    code = PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=tree, capture_output=True, text=True, check=True)
+    return ast.literal_eval(out.stdout.strip().splitlines()[-1])
+
+
+def measure_tree(tree: str, runs: int = RUNS) -> dict:
+    results = {}
+    for command, modules in COMMAND_MODULES.items():
+        probe(tree, modules)  # warm the bytecode cache and the OS file cache
+        samples = [probe(tree, modules) for _ in range(runs)]
+        results[command] = (statistics.median(s[0] for s in samples), samples[0][1], samples[0][2])
+    return results
+
+
+def export_tree(ref: str, target: str) -> str:
+    archive = subprocess.run(["git", "archive", ref], cwd=REPO_DIR, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+    return target
+
+
+def print_results(label: str, results: dict, baseline: dict = None):
+    print(f"\n🚀 {label}")
+    for command, (seconds, heavy, error) in results.items():
+        line = f"   {command:<8} {seconds * 1000:8.1f} ms"
+        if baseline:
+            line += f"  ({baseline[command][0] / seconds:5.1f}x faster)"
+        print(line + f"  loads: {', '.join(heavy) or '-'}" + (f"  ❌ {error}" if error else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time per tech_design_bot subcommand.")
+    parser.add_argument("--baseline", help="git ref to compare against")
+    parser.add_argument("--runs", type=int, default=RUNS, help="fresh interpreters per command (median kept)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        tree = tempfile.mkdtemp(prefix="bench_startup_")
+        try:
+            baseline = measure_tree(export_tree(args.baseline, tree), args.runs)
+        finally:
+            shutil.rmtree(tree, ignore_errors=True)
+        print_results(f"baseline {args.baseline}", baseline)
+    print_results("working tree", measure_tree(REPO_DIR, args.runs), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Deterministic synthetic BRDs of any size, shaped like business_requirements.txt:
+numbered sections, prose paragraphs, requirement lists and interface tables.
+
+    python -m benchmarks.brd_generator 100000 brd_100k.txt
+"""
+import random
+import sys
+
+DOMAINS = ("Account", "Payment", "Ledger", "Notification", "Fraud", "Onboarding", "Card", "Loan",
+           "Analytics", "Identity", "Statement", "Rewards", "Settlement", "Compliance", "Partner")
+ACTORS = ("Customer", "Merchant", "Bank Admin", "Support Agent", "Auditor", "Partner Bank", "Card Network")
+DATABASES = ("PostgreSQL", "MongoDB", "Redis", "Cassandra", "Elasticsearch")
+PROTOCOLS = ("REST", "gRPC", "Kafka event", "webhook")
+VERBS = ("validates", "stores", "publishes", "reconciles", "aggregates", "notifies", "authorises", "archives")
+ACTOR_VERBS = ("validate", "store", "publish", "reconcile", "review", "export", "authorise", "archive")
+OBJECTS = ("transactions", "customer profiles", "payment instructions", "risk scores", "audit records",
+           "settlement batches", "statements", "consent records", "limits", "exchange rates")
+QUALIFIERS = ("in real time", "within 200 ms", "at least once", "idempotently", "for 7 years",
+              "across regions", "with PCI-DSS controls", "under peak load of 5k TPS")
+
+SECTION_WORDS = 600  # approximate words per numbered section
+
+
+def _sentence(rng: random.Random, service: str) -> str:
+    return (f"The {service} Service {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)} "
+            f"and calls the {rng.choice(DOMAINS)} Service over {rng.choice(PROTOCOLS)}.")
+
+
+def iter_brd_lines(words: int, seed: int = 0):
+    """
+    Yield BRD lines until roughly `words` words have been produced.
+    """
+    rng = random.Random(seed)
+    yield "# Business Requirement Document (BRD)"
+    yield ""
+    yield f"Project Name: Synthetic Platform {seed} – {words} words"
+    yield ""
+    written = 10
+    section = 0
+    while written < words:
+        section += 1
+        service = f"{rng.choice(DOMAINS)}{'' if section <= len(DOMAINS) else section // len(DOMAINS)}"
+        header = f"{section}. {service} Service Requirements"
+        yield header
+        yield ""
+        section_written = len(header.split())
+        while section_written < SECTION_WORDS and written + section_written < words:
+            kind = rng.random()
+            if kind < 0.55:
+                lines = [" ".join(_sentence(rng, service) for _ in range(rng.randint(3, 6)))]
+            elif kind < 0.85:
+                lines = [f"* {rng.choice(ACTORS)} can {rng.choice(ACTOR_VERBS)} {rng.choice(OBJECTS)} "
+                         f"{rng.choice(QUALIFIERS)}" for _ in range(rng.randint(3, 7))]
+            else:
+                lines = ["| Interface | Consumer | Protocol | Store |", "|---|---|---|---|"]
+                lines += [f"| {service}.{rng.choice(OBJECTS).replace(' ', '_')} | {rng.choice(ACTORS)} | "
+                          f"{rng.choice(PROTOCOLS)} | {rng.choice(DATABASES)} |" for _ in range(rng.randint(3, 8))]
+            for line in lines:
+                section_written += len(line.split())
+                yield line
+            yield ""
+        written += section_written
+
+
+def write_brd(path: str, words: int, seed: int = 0) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        for line in iter_brd_lines(words, seed):
+            f.write(line + "\n")
+    return path
+
+
+if __name__ == "__main__":
+    write_brd(sys.argv[2], int(sys.argv[1]))
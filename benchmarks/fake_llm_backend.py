@@ -0,0 +1,277 @@
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import types
+
+EXTRACTION_SECTIONS = ("actors", "microservices", "databases", "events")
+COMPACT_ARCHITECTURE = re.compile(r'^\s*(\{"[ASDE]":.*\})\s*$', re.M)
+EDGES_LINE = re.compile(r"Edges:\s*\n\s*(\[.*\])\s*$", re.M)
+SERVICE_MENTION = re.compile(r"\b([A-Z][a-z]+\d*) Service\b")
+ACTOR_MENTION = re.compile(r"^\* ([A-Z][\w ]+?) can ", re.M)
+
+
+class FakeRateLimitError(Exception):
+    """
+    Mimics groq.RateLimitError: carries status_code 429 and a Retry-After header.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = types.SimpleNamespace(headers={"retry-after": str(retry_after)})
+
+
+def make_response(content: str, prompt: str = ""):
+    """
+    Build an object shaped like a Groq chat completion response.
+    """
+    prompt_tokens = len(prompt) // 4 + 1
+    completion_tokens = len(content) // 4 + 1
+    return types.SimpleNamespace(
+        choices=[types.SimpleNamespace(
+            message=types.SimpleNamespace(content=content),
+            finish_reason="stop"
+        )],
+        usage=types.SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+    )
+
+
+def fake_extraction(prompt: str) -> str:
+    """
+    Deterministic extraction JSON derived from the prompt text.
+    """
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    services = [f"Service{rng.randint(1, 40)}" for _ in range(3)]
+    return json.dumps({
+        "actors": [{"name": f"Actor{rng.randint(1, 10)}", "type": "External"}],
+        "microservices": [
+            {"name": name, "db": f"{name}DB", "exposes": ["REST"], "consumes": ["Event"],
+             "scaling": "AutoScale", "criticality": "High"}
+            for name in services
+        ],
+        "databases": [{"name": f"{services[0]}DB", "type": "SQL", "used_by": [services[0]]}],
+        "events": [
+            {"from": services[0], "to": services[1], "type": "REST", "description": f"call {seed % 97}"},
+            {"from": services[1], "to": services[2], "type": "Event", "description": f"publish {seed % 89}"}
+        ]
+    })
+
+
+def _seeded_rng(prompt: str) -> random.Random:
+    return random.Random(int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16))
+
+
+def _prompt_architecture(prompt: str) -> dict:
+    """
+    The compact architecture JSON embedded in layout/design-doc prompts ({} if absent).
+    """
+    match = COMPACT_ARCHITECTURE.search(prompt)
+    return json.loads(match.group(1)) if match else {}
+
+
+def procedural_extraction(prompt: str) -> str:
+    """
+    Extraction JSON built from the services and actors actually named in the chunk,
+    so the merged architecture grows with the BRD like a real run.
+    """
+    rng = _seeded_rng(prompt)
+    services = list(dict.fromkeys(SERVICE_MENTION.findall(prompt)))[:12] or ["Core"]
+    actors = list(dict.fromkeys(ACTOR_MENTION.findall(prompt)))[:4]
+    events = [
+        {"from": services[i], "to": services[(i + 1) % len(services)], "type": rng.choice(("REST", "Event", "gRPC")),
+         "description": f"{services[i]} calls {services[(i + 1) % len(services)]}"}
+        for i in range(len(services) - 1)
+    ]
+    events += [{"from": actor, "to": services[0], "type": "REST", "description": f"{actor} uses the platform"}
+               for actor in actors]
+    return json.dumps({
+        "actors": [{"name": actor, "type": "External"} for actor in actors],
+        "microservices": [
+            {"name": f"{name} Service", "db": f"{name}DB", "exposes": ["REST"], "consumes": ["Event"],
+             "scaling": "AutoScale", "criticality": rng.choice(("High", "Medium"))}
+            for name in services
+        ],
+        "databases": [{"name": f"{name}DB", "type": "SQL", "used_by": [f"{name} Service"]} for name in services],
+        "events": [dict(e, **{"from": _service_name(e["from"], services), "to": _service_name(e["to"], services)})
+                   for e in events]
+    })
+
+
+def _service_name(name: str, services: list) -> str:
+    return f"{name} Service" if name in services else name
+
+
+def fake_layout(prompt: str) -> str:
+    """
+    Layout JSON (nodes on a grid, one edge per event) for the architecture in the prompt.
+    """
+    arch = _prompt_architecture(prompt)
+    nodes = []
+    for y, (section, node_type) in enumerate((("A", "actor"), ("S", "service"), ("D", "database"))):
+        for x, item in enumerate(arch.get(section, [])):
+            nodes.append({"name": item["n"], "type": node_type, "x": x * 2, "y": y * 3, "color": "lightblue"})
+    edges = [{"from": e.get("f"), "to": e.get("t"), "label": "REST API"} for e in arch.get("E", [])]
+    edges += [{"from": s["n"], "to": s["db"], "label": "DB Query"} for s in arch.get("S", []) if s.get("db")]
+    return json.dumps({"nodes": nodes, "edges": edges, "microservice_interactions": []})
+
+
+def fake_edge_labels(prompt: str) -> str:
+    rng = _seeded_rng(prompt)
+    match = EDGES_LINE.search(prompt)
+    edges = json.loads(match.group(1)) if match else []
+    labels = ("REST API", "gRPC Call", "Message Queue", "Event Stream")
+    return json.dumps({"edges": [{"from": e["from"], "to": e["to"], "label": rng.choice(labels)} for e in edges]})
+
+
+def fake_design_doc(prompt: str) -> str:
+    """
+    Markdown section: prose, a bullet list and a component table for the prompt's architecture.
+    """
+    rng = _seeded_rng(prompt)
+    services = [s["n"] for s in _prompt_architecture(prompt).get("S", [])]
+    lines = [" ".join(f"The **{name}** owns its data and scales independently." for name in services[:5])
+             or "The platform is composed of independently deployable services.", ""]
+    lines += [f"- {name} uses `{rng.choice(('REST', 'gRPC', 'Kafka'))}` for *inbound* traffic" for name in services[:8]]
+    lines += ["", "| Component | Type | Criticality |", "|---|---|---|"]
+    lines += [f"| {name} | Service | {rng.choice(('High', 'Medium'))} |" for name in services]
+    return "\n".join(lines)
+
+
+def fake_reply(prompt: str) -> str:
+    """
+    Dispatch on the prompt template: extraction, edge labels, layout or design document.
+    """
+    if "business requirement chunk" in prompt:
+        return procedural_extraction(prompt)
+    if "Choose the most accurate label" in prompt:
+        return fake_edge_labels(prompt)
+    if "C4 diagram expert" in prompt:
+        return fake_layout(prompt)
+    return fake_design_doc(prompt)
+
+
+def corrupt_json(content: str, rng: random.Random) -> str:
+    """
+    Damage a JSON reply the way models do: prose and fences, single quotes, trailing commas or truncation.
+    """
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"Here is the JSON:\n```json\n{content}\n```\nLet me know if you need more."
+    if kind == 1:
+        return content.replace('"', "'")
+    if kind == 2:
+        return content.replace("}", ",}").replace("]", ",]")
+    return content[:rng.randint(len(content) // 3, len(content) - 1)]
+
+
+class FakeLLMBackend:
+    """
+    Local stand-in for ai_repsonse_utility.ai_response with injected latency and 429s.
+    """
+
+    def __init__(self, latency: float = 0.05, rate_limit_rate: float = 0.0, retry_after: float = 0.01,
+                 responder=fake_extraction, seed: int = 0, stream_piece_chars: int = 16,
+                 latency_jitter: float = 0.0, corruption_rate: float = 0.0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter  # mean extra latency, as a fraction of `latency` (exponential tail)
+        self.corruption_rate = corruption_rate  # share of JSON replies damaged by corrupt_json
+        self.corrupted = 0
+        self.latencies = []
+        self.stream_piece_chars = stream_piece_chars
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.responder = responder
+        self.calls = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _begin(self) -> tuple:
+        """
+        Count one call and draw its fate: (delay, throttled, corruption rng or None).
+        """
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            throttled = self._rng.random() < self.rate_limit_rate
+            delay = self.latency * (1 + self._rng.expovariate(1 / self.latency_jitter)) if self.latency_jitter else self.latency
+            corrupted = self._rng.random() < self.corruption_rate
+            corruption_rng = random.Random(self._rng.random())
+        return delay, throttled, corruption_rng if corrupted else None
+
+    def _content(self, prompt, throttled, corruption_rng) -> str:
+        if throttled:
+            with self._lock:
+                self.rate_limited += 1
+            raise FakeRateLimitError(self.retry_after)
+        content = self.responder(prompt)
+        if corruption_rng is not None and content.startswith("{"):
+            content = corrupt_json(content, corruption_rng)
+            with self._lock:
+                self.corrupted += 1
+        return content
+
+    def _end(self, start: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.latencies.append(time.perf_counter() - start)
+
+    def ai_response(self, prompt, system_role):
+        delay, throttled, corruption_rng = self._begin()
+        start = time.perf_counter()
+        try:
+            time.sleep(delay)
+            return make_response(self._content(prompt, throttled, corruption_rng), prompt)
+        finally:
+            self._end(start)
+
+    def ai_response_stream(self, prompt, system_role):
+        """
+        Same reply as ai_response, yielded in small pieces with the latency spread across
+        them, so a consumer sees the first piece long before the last.
+        """
+        delay, throttled, corruption_rng = self._begin()
+        start = time.perf_counter()
+        try:
+            if throttled:
+                time.sleep(delay)  # the 429 arrives after the full latency, as in ai_response
+            content = self._content(prompt, throttled, corruption_rng)
+            step = self.stream_piece_chars
+            pieces = max(1, -(-len(content) // step))
+            for n, i in enumerate(range(0, len(content), step), start=1):
+                # Paced against the start, so sleep overshoot on tiny pauses does not add up
+                pause = start + delay * n / pieces - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+                yield content[i:i + step]
+        finally:
+            self._end(start)
+
+
+def install(backend: FakeLLMBackend):
+    """
+    Route every ai_response call through `backend`. Registers a stand-in
+    ai_repsonse_utility module so the handlers import without groq or an API key.
+    """
+    module = types.ModuleType("ai_uitls.ai_repsonse_utility")
+    module.MODEL_NAME = "fake-llm"
+    module.ai_response = backend.ai_response
+    module.ai_response_stream = backend.ai_response_stream
+    sys.modules["ai_uitls.ai_repsonse_utility"] = module
+    handler = sys.modules.get("handler_pack.json_file_handler")
+    if handler is not None:
+        handler.ai_response = backend.ai_response
+        handler.ai_response_stream = backend.ai_response_stream
+    return backend
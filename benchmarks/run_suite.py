@@ -0,0 +1,235 @@
+"""
+Offline benchmark suite: synthetic BRDs from 10k to 1M words run through every stage
+(chunking, JSON repair, extraction + merge, layout, Graphviz, design doc, DOCX, PDF)
+against the fake LLM backend. Writes throughput, p50/p95 per-item latency and peak
+traced memory per stage as JSON, and can diff against a previous run.
+
+    python -m benchmarks.run_suite
+    python -m benchmarks.run_suite --words 10000 100000 --output before.json
+    python -m benchmarks.run_suite --words 10000 100000 --compare before.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import brd_generator, fake_llm_backend
+
+DEFAULT_WORDS = (10_000, 100_000, 1_000_000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+JSON_REPAIR_SAMPLES = 2000
+REGRESSION_THRESHOLD = 0.10  # flag stages more than 10% slower than the baseline
+MIN_COMPARABLE_SECONDS = 0.1  # shorter stages are too noisy to flag
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(func, unit: str, memory: bool = True, repeat: int = 1) -> tuple:
+    """
+    Run `func()` -> (result, items, per_item_seconds) `repeat` times, keeping the median run,
+    and with `memory` once more under tracemalloc for peak memory (tracing would distort timing).
+    """
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result, items, samples = func()
+        seconds = time.perf_counter() - start
+        runs.append((seconds, samples or [seconds]))
+    seconds, samples = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+    stats = {
+        "items": items,
+        "unit": unit,
+        "seconds": round(seconds, 4),
+        "throughput_per_s": round(items / seconds, 2) if seconds else None,
+        "runs": repeat,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+            stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        finally:
+            tracemalloc.stop()
+    return result, stats
+
+
+def run_size(words: int, workdir: str, backend, memory: bool, repeat: int) -> dict:
+    from handler_pack import (chunk_handler, doc_generation_handler, docx_render_handler, image_generation_handler,
+                              json_file_handler, pdf_render_handler)
+
+    brd_file = brd_generator.write_brd(os.path.join(workdir, f"brd_{words}.txt"), words)
+    results = {}
+
+    def chunk():
+        chunks, samples = [], []
+        last = time.perf_counter()
+        for text in chunk_handler.stream_file_chunks(brd_file):
+            chunks.append(text)
+            now = time.perf_counter()
+            samples.append(now - last)
+            last = now
+        return chunks, words, samples
+
+    chunks, results["chunk"] = measure(chunk, "words", memory, repeat)
+
+    def json_repair():
+        rng = random.Random(words)
+        replies = [fake_llm_backend.corrupt_json(fake_llm_backend.procedural_extraction(text), rng)
+                   for text in (rng.choice(chunks) for _ in range(min(JSON_REPAIR_SAMPLES, 20 * len(chunks))))]
+        samples, repaired = [], 0
+        for reply in replies:
+            start = time.perf_counter()
+            repaired += json_file_handler.fix_ai_json(reply) is not None
+            samples.append(time.perf_counter() - start)
+        return repaired / len(replies), len(replies), samples
+
+    success_rate, results["json_repair"] = measure(json_repair, "replies", memory, repeat)
+    results["json_repair"]["success_rate"] = round(success_rate, 4)
+
+    def extract():
+        backend.latencies.clear()
+        out = tempfile.mkdtemp(dir=workdir)
+        architecture = json_file_handler.create_json_file_from_brd(chunks, incremental=False, output_dir=out)
+        return architecture, len(chunks), list(backend.latencies)
+
+    architecture, results["extract"] = measure(extract, "chunks", memory, repeat)
+    results["extract"]["services"] = len(architecture.get("microservices", []))
+
+    def layout():
+        layout_json = image_generation_handler.build_layout(architecture, "local")
+        return layout_json, len(layout_json["nodes"]), []
+
+    layout_json, results["layout"] = measure(layout, "nodes", memory, repeat)
+
+    if shutil.which("dot"):
+        def render_png():
+            png = image_generation_handler.render_layout_to_png(layout_json, os.path.join(workdir, f"c4_{words}"))
+            return png, len(layout_json["nodes"]), []
+
+        png_file, results["render_png"] = measure(render_png, "nodes", memory, repeat)
+    else:
+        png_file, results["render_png"] = None, {"skipped": "Graphviz 'dot' executable not found"}
+
+    md_file = os.path.join(workdir, f"Design_Document_{words}.md")
+
+    def design_doc():
+        backend.latencies.clear()
+        doc_generation_handler.write_design_markdown(architecture, md_file)
+        return md_file, len(backend.latencies), list(backend.latencies)
+
+    _, results["design_doc"] = measure(design_doc, "llm_calls", memory, repeat)
+    md_lines = sum(1 for _ in open(md_file, encoding="utf-8"))
+
+    def docx():
+        return docx_render_handler.md_to_docx(md_file, png_file, md_file.replace(".md", ".docx")), md_lines, []
+
+    _, results["docx"] = measure(docx, "md_lines", memory, repeat)
+
+    def pdf():
+        return pdf_render_handler.md_to_pdf(md_file, png_file, md_file.replace(".md", ".pdf")), md_lines, []
+
+    _, results["pdf"] = measure(pdf, "md_lines", memory, repeat)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    Print throughput and p95 changes per size and stage; returns the regressed (size, stage) pairs.
+    """
+    regressions = []
+    print(f"\n📈 vs {baseline.get('commit', '?')}: throughput / p95 change")
+    for size, stages in current["results"].items():
+        for stage, stats in stages.items():
+            before = baseline.get("results", {}).get(size, {}).get(stage)
+            if not before or "throughput_per_s" not in stats or "throughput_per_s" not in before:
+                continue
+            speed = stats["throughput_per_s"] / before["throughput_per_s"] - 1
+            p95 = stats["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+            noisy = min(stats["seconds"], before["seconds"]) < MIN_COMPARABLE_SECONDS
+            flag = "  ⚠️ regression" if speed < -threshold and not noisy else ""
+            if flag:
+                regressions.append((size, stage))
+            print(f"   {size:>9} {stage:<12} {speed:+8.1%} {p95:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with a fake LLM backend.")
+    parser.add_argument("--words", type=int, nargs="+", default=list(DEFAULT_WORDS), help="BRD sizes in words")
+    parser.add_argument("--latency", type=float, default=0.005, help="fake LLM latency per call (seconds)")
+    parser.add_argument("--latency-jitter", type=float, default=1.0, help="mean extra latency as a fraction")
+    parser.add_argument("--corruption-rate", type=float, default=0.1, help="share of JSON replies corrupted")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per stage (median kept)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output", help="results JSON (default: benchmarks/results/suite_<commit>.json)")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    backend = fake_llm_backend.install(fake_llm_backend.FakeLLMBackend(
+        latency=args.latency, latency_jitter=args.latency_jitter, corruption_rate=args.corruption_rate,
+        responder=fake_llm_backend.fake_reply
+    ))
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"latency": args.latency, "latency_jitter": args.latency_jitter,
+                   "corruption_rate": args.corruption_rate, "memory": not args.no_memory,
+                   "repeat": args.repeat},
+        "results": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        for words in args.words:
+            print(f"\n📄 {words:,} words")
+            report["results"][str(words)] = stages = run_size(words, workdir, backend, not args.no_memory, args.repeat)
+            for stage, stats in stages.items():
+                if "skipped" in stats:
+                    print(f"   {stage:<12} skipped: {stats['skipped']}")
+                    continue
+                print(f"   {stage:<12} {stats['seconds']:8.3f}s {stats['throughput_per_s']:>12,.1f} "
+                      f"{stats['unit']}/s  p50 {stats['p50_ms']:9.3f}ms  p95 {stats['p95_ms']:9.3f}ms"
+                      + (f"  peak {stats['peak_mb']:8.2f}MB" if "peak_mb" in stats else ""))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite_{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fake_llm_backend import fake_extraction
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (deadline tests) are expected
+        pass
+
+
+class StubLLMServer:
+    """
+    Local OpenAI-compatible chat completions endpoint standing in for Groq:
+    configurable latency with an optional long tail of stalled requests, injected 429s
+    with Retry-After, and SSE streaming.
+
+        with StubLLMServer(latency=0.05) as server:
+            llm_client.set_backend(llm_client.HttpBackend(server.base_url, api_key="stub"))
+    """
+
+    def __init__(self, latency: float = 0.05, rate_limit_rate: float = 0.0, retry_after: float = 0.05,
+                 responder=fake_extraction, seed: int = 0, stall_rate: float = 0.0, stall_latency: float = 1.0):
+        self.latency = latency
+        self.stall_rate = stall_rate  # share of requests that take `stall_latency` instead
+        self.stall_latency = stall_latency
+        self.stalled = 0
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.responder = responder
+        self.requests = 0
+        self.rate_limited = 0
+        self.connections = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _QuietServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/openai/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict, headers: dict = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                with stub._lock:
+                    stub.requests += 1
+                    throttled = stub._rng.random() < stub.rate_limit_rate
+                    if throttled:
+                        stub.rate_limited += 1
+                    stalled = stub._rng.random() < stub.stall_rate
+                    if stalled:
+                        stub.stalled += 1
+                time.sleep(stub.stall_latency if stalled else stub.latency)
+                if throttled:
+                    self._send_json(429, {"error": {"message": "Rate limit reached"}},
+                                    {"Retry-After": str(stub.retry_after)})
+                    return
+
+                prompt = request["messages"][-1]["content"]
+                content = stub.responder(prompt)
+                usage = {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": len(content) // 4 + 1}
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+                if not request.get("stream"):
+                    self._send_json(200, {
+                        "model": request.get("model"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+                for i, piece in enumerate(pieces):
+                    last = i == len(pieces) - 1
+                    event = {"choices": [{"index": 0, "delta": {"content": piece},
+                                          "finish_reason": "stop" if last else None}]}
+                    if last:
+                        event["x_groq"] = {"usage": usage}
+                    self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+        return Handler
@@ -0,0 +1,406 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.managers import SyncManager
+from urllib.parse import parse_qs, urlsplit
+
+from handler_pack.job_queue_handler import JobQueue, new_job_id
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+SERVICE_HOST = "127.0.0.1"  # local only: the API has no authentication
+SERVICE_PORT = 8765
+SERVICE_DIR = "service_data"  # job queue, uploaded BRDs, per-job outputs and the response cache
+SERVICE_WORKERS = 2  # warm worker processes, each running one job at a time
+MAX_LLM_REQUESTS = 8  # in-flight LLM requests across all workers
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+QUEUE_POLL_SECONDS = 0.5  # how often an idle worker checks the queue; submissions wake one at once
+WORKER_STOP_SECONDS = 10  # grace period for workers on shutdown; running jobs resume on the next start
+BRD_EXTENSIONS = (".txt", ".text", ".md", ".markdown", ".pdf", ".docx")  # what ingest_handler reads
+JOB_LOG_FILE = "job.log"
+ARTIFACT_TYPES = {
+    "architecture": "application/json",
+    "diagram": "image/png",
+    "markdown": "text/markdown; charset=utf-8",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+    "log": "text/plain; charset=utf-8",
+}
+
+
+def queue_file(service_dir: str) -> str:
+    return os.path.join(service_dir, "jobs.sqlite3")
+
+
+# ---------------------
+# WORKERS
+# ---------------------
+
+def warm_up(service_dir: str, llm_base_url: str = None, request_slots=None, llm_options: dict = None):
+    """
+    Load what every job needs once per worker process instead of once per job: the
+    pipeline handlers with python-docx, reportlab and Graphviz behind them, the pooled
+    LLM client and the response cache, kept under `service_dir`. With `llm_base_url`,
+    the client talks to that endpoint; `llm_options` go to its LLMClient (e.g.
+    requests_per_minute=None for a local model without rate limits).
+    """
+    from ai_uitls import ai_repsonse_utility, llm_client, response_cache
+    import tech_design_bot  # noqa: F401 - the handlers its stages import lazily follow below
+    from handler_pack import (architecture_model, doc_generation_handler, image_generation_handler,  # noqa: F401
+                              json_file_handler)
+
+    for optional in ("handler_pack.docx_render_handler", "handler_pack.pdf_render_handler", "graphviz"):
+        try:
+            __import__(optional)
+        except ImportError:
+            pass  # the stage that needs it reports the error
+
+    ai_repsonse_utility.set_request_slots(request_slots)
+    response_cache.CACHE_DIR = os.path.join(service_dir, os.path.basename(response_cache.CACHE_DIR))
+    response_cache.cache_stats()  # creates the cache schema before the first job
+    if llm_base_url or llm_options:
+        backend = llm_client.HttpBackend(llm_base_url) if llm_base_url else llm_client.make_backend()
+        llm_client.set_backend(backend, **(llm_options or {}))
+    else:
+        llm_client.get_client()
+
+
+def stage_artifacts(stage: str, result, output_dir: str) -> dict:
+    """
+    Downloadable files a finished stage produced.
+    """
+    import tech_design_bot
+    from handler_pack import json_file_handler
+
+    if stage == "extract":
+        paths = {"architecture": os.path.join(output_dir, json_file_handler.MERGED_ARCHITECTURE_FILE)}
+    elif stage == "diagram":
+        paths = {"diagram": result}
+    elif stage == "design_doc":
+        paths = {"markdown": result}
+    elif stage == "assemble":
+        docx_name = os.path.splitext(tech_design_bot.DESIGN_DOC_FILE)[0] + ".docx"
+        paths = {"docx": os.path.join(output_dir, docx_name), "pdf": result}
+    else:
+        return {}
+    return {kind: path for kind, path in paths.items() if isinstance(path, str) and os.path.isfile(path)}
+
+
+def run_job(queue: JobQueue, job: dict):
+    """
+    Run one claimed job: console output goes to the job's log, stage progress and
+    artifacts into the queue as each stage ends. Never raises; failures are recorded.
+    """
+    import tech_design_bot
+
+    output_dir = job["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    log_file = os.path.join(output_dir, JOB_LOG_FILE)
+    queue.add_artifacts(job["id"], {"log": log_file})
+
+    def on_stage(name, status, seconds, result):
+        detail = {}
+        if status == "done" and name == "chunk":
+            detail["chunks"] = len(result)
+        elif status == "failed":
+            detail["error"] = f"{type(result).__name__}: {result}"
+        queue.update_stage(job["id"], name, status, seconds, **detail)
+        if status == "done":
+            artifacts = stage_artifacts(name, result, output_dir)
+            if artifacts:
+                queue.add_artifacts(job["id"], artifacts)
+
+    start = time.perf_counter()
+    error = None
+    # A worker runs one job at a time, so swapping the process-wide stdout is safe
+    with open(log_file, "a", encoding="utf-8", buffering=1) as log, contextlib.redirect_stdout(log):
+        try:
+            tech_design_bot.run_design_pipeline(job["brd_file"], output_dir, resume=job["attempts"] > 1,
+                                                on_stage=on_stage)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=log)
+    queue.finish(job["id"], error)
+    mark = "❌" if error else "✅"
+    print(f"{mark} Job {job['id']} ({job['name']}) {'failed' if error else 'done'} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+def ignore_sigint():
+    # Ctrl+C reaches the whole process group; the parent stops workers and the manager itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def worker_main(worker_name: str, service_dir: str, request_slots, llm_base_url: str, llm_options: dict, stop,
+                wakeups):
+    ignore_sigint()
+    warm_up(service_dir, llm_base_url, request_slots, llm_options)
+    queue = JobQueue(queue_file(service_dir))
+    while not stop.is_set():
+        job = queue.claim(worker_name)
+        if job is None:
+            wakeups.acquire(timeout=QUEUE_POLL_SECONDS)
+            continue
+        run_job(queue, job)
+
+
+# ---------------------
+# HTTP API
+# ---------------------
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/artifacts(?:/(\w+))?)?/?$")
+
+
+def job_view(job: dict) -> dict:
+    """
+    A job as the API returns it: status, per-stage progress and artifact download URLs.
+    """
+    view = {key: job[key] for key in ("id", "name", "status", "error", "attempts", "created", "started", "finished")}
+    stages = job["stages"]
+    view["stage"] = next((name for name, stage in stages.items() if stage["status"] == "running"), None)
+    view["stages"] = stages
+    progress = {"stages_done": sum(1 for stage in stages.values() if stage["status"] == "done")}
+    if "chunks" in stages.get("chunk", {}):
+        progress["chunks"] = stages["chunk"]["chunks"]
+        if stages.get("extract", {}).get("status") == "running":
+            progress["chunks_extracted"] = min(extracted_chunks(job["output_dir"]), progress["chunks"])
+    view["progress"] = progress
+    view["artifacts"] = {kind: f"/jobs/{job['id']}/artifacts/{kind}" for kind in job["artifacts"]}
+    return view
+
+
+def extracted_chunks(output_dir: str) -> int:
+    """
+    Chunks extracted so far: one line each in the job's checkpoint journal.
+    """
+    from handler_pack import json_file_handler
+
+    try:
+        with open(os.path.join(output_dir, json_file_handler.CHECKPOINT_JOURNAL_FILE), "rb") as f:
+            return sum(1 for _ in f)
+    except FileNotFoundError:
+        return 0
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs?name=brd.pdf   (BRD bytes as the body)  -> 202 + job
+    GET  /jobs[?status=running]                       -> recent jobs
+    GET  /jobs/<id>                                   -> status and stage progress
+    GET  /jobs/<id>/artifacts                         -> artifact download URLs
+    GET  /jobs/<id>/artifacts/<kind>                  -> the file (architecture, diagram, markdown, docx, pdf, log)
+    GET  /health                                      -> queue counts and live workers
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: dict = None):
+        body = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send_json(status, {"error": message})
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            return self._send_json(200, service.health())
+        if url.path.rstrip("/") == "/jobs":
+            status = parse_qs(url.query).get("status", [None])[0]
+            return self._send_json(200, [job_view(job) for job in service.queue.list_jobs(status)])
+        match = JOB_PATH.match(url.path)
+        job = service.queue.get(match.group(1)) if match else None
+        if job is None:
+            return self._error(404, "no such job")
+        if not match.group(2):
+            return self._send_json(200, job_view(job))
+        if not match.group(3):
+            return self._send_json(200, job_view(job)["artifacts"])
+        self._send_artifact(job, match.group(3))
+
+    def _send_artifact(self, job: dict, kind: str):
+        path = job["artifacts"].get(kind)
+        if path is None or not os.path.isfile(path):
+            return self._error(404, f"no {kind} artifact (yet) for job {job['id']}")
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.send_response(200)
+            self.send_header("Content-Type", ARTIFACT_TYPES.get(kind, "application/octet-stream"))
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._error(404, "not found")
+        if self.headers.get("Content-Length") is None:
+            return self._error(411, "Content-Length required")
+        try:
+            length = int(self.headers["Content-Length"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # the body cannot be delimited
+            return self._error(400, "invalid Content-Length")
+        if length > MAX_UPLOAD_BYTES:
+            self.close_connection = True  # the body is not read
+            return self._error(413, f"BRD larger than {MAX_UPLOAD_BYTES} bytes")
+        name = os.path.basename(parse_qs(url.query).get("name", ["business_requirements.txt"])[0])
+        if not name.lower().endswith(BRD_EXTENSIONS):
+            self.close_connection = True
+            return self._error(415, f"BRD must be one of: {', '.join(BRD_EXTENSIONS)}")
+        job = self.server.service.submit(name, self.rfile, length)
+        self._send_json(202, job_view(job), {"Location": f"/jobs/{job['id']}"})
+
+
+class DesignService:
+    """
+    Local pipeline service: an HTTP API over a persistent job queue, drained by a pool
+    of warm worker processes that keep the LLM client, response cache and rendering
+    libraries loaded between jobs.
+
+        with DesignService(port=0) as service:
+            print(service.url)
+    """
+
+    def __init__(self, service_dir: str = SERVICE_DIR, host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+                 workers: int = SERVICE_WORKERS, max_llm_requests: int = MAX_LLM_REQUESTS,
+                 llm_base_url: str = None, llm_options: dict = None):
+        self.service_dir = service_dir
+        self.jobs_dir = os.path.join(service_dir, "jobs")
+        self.workers = workers
+        self.max_llm_requests = max_llm_requests
+        self.llm_base_url = llm_base_url
+        self.llm_options = llm_options
+        self.queue = JobQueue(queue_file(service_dir))
+        self._server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self._processes = []
+        self._manager = None
+        self._request_slots = None
+        self._stop = None
+        self._wakeups = None  # released once per submitted job
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def submit(self, name: str, body, length: int) -> dict:
+        """
+        Save an uploaded BRD into a fresh job folder and queue the job.
+        """
+        job_id = new_job_id()
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(job_dir)
+        brd_file = os.path.join(job_dir, name)
+        try:
+            with open(brd_file + ".tmp", "wb") as f:
+                remaining = length
+                while remaining:
+                    block = body.read(min(remaining, 1024 * 1024))
+                    if not block:
+                        raise ConnectionError("upload ended early")
+                    f.write(block)
+                    remaining -= len(block)
+            os.replace(brd_file + ".tmp", brd_file)
+        except Exception:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        job = self.queue.submit(job_id, name, brd_file, os.path.join(job_dir, "output"))
+        if self._wakeups is not None:
+            self._wakeups.release()
+        return job
+
+    def health(self) -> dict:
+        return {"jobs": self.queue.counts(),
+                "workers": sum(1 for process in self._processes if process.is_alive())}
+
+    def start(self):
+        requeued = self.queue.requeue_interrupted()
+        if requeued:
+            print(f"⚠️ {requeued} interrupted jobs requeued; they resume from their checkpoints")
+        # Workers are forked before the server thread exists
+        self._manager = SyncManager()
+        self._manager.start(ignore_sigint)
+        # Held here: the manager drops the semaphore once the last proxy in this process goes
+        self._request_slots = self._manager.BoundedSemaphore(self.max_llm_requests)
+        self._stop = multiprocessing.Event()
+        self._wakeups = multiprocessing.Semaphore(0)
+        for i in range(self.workers):
+            process = multiprocessing.Process(
+                target=worker_main, name=f"design-worker-{i + 1}",
+                args=(f"worker-{i + 1}", self.service_dir, self._request_slots, self.llm_base_url, self.llm_options,
+                      self._stop, self._wakeups))
+            process.start()
+            self._processes.append(process)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"✅ Design service on {self.url} with {self.workers} workers (data in {self.service_dir})")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._stop.set()
+        deadline = time.monotonic() + WORKER_STOP_SECONDS
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()  # its job stays running and is requeued on the next start
+                process.join()
+        self._manager.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the design pipeline as a local service with a job queue.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--service-dir", default=SERVICE_DIR, help="job queue, uploads and per-job outputs")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="warm worker processes")
+    parser.add_argument("--max-llm-requests", type=int, default=MAX_LLM_REQUESTS,
+                        help="global cap on in-flight LLM requests across all workers")
+    parser.add_argument("--llm-base-url", help="OpenAI-compatible endpoint to use instead of Groq")
+    args = parser.parse_args()
+    service = DesignService(args.service_dir, args.host, args.port, args.workers, args.max_llm_requests,
+                            args.llm_base_url)
+    service.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"⚠️ Stopping: running jobs get {WORKER_STOP_SECONDS}s to finish, the rest resume on the next start")
+    finally:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
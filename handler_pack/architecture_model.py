@@ -0,0 +1,383 @@
+import json
+import sys
+
+from ai_uitls import metrics_utility
+from ai_uitls.token_utility import estimate_tokens
+from handler_pack.merge_handler import normalize_key
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+# What validate() does with an event endpoint that matches no actor, service or database:
+# "external" registers it as an external-system actor, "drop" drops the event
+DANGLING_ENDPOINTS = "external"
+EXTERNAL_SYSTEM_TYPE = "External System"
+NULL_NAMES = {"", "null", "none", "n a", "unknown", "undefined"}  # normalized names that mean "no value"
+
+
+class Node:
+    """
+    One actor, service or database. `data` holds the element's other fields.
+    """
+    __slots__ = ("name", "kind", "data")
+
+    def __init__(self, name: str, kind: str, data: dict):
+        self.name = name
+        self.kind = kind  # actor | service | db
+        self.data = data
+
+    def __repr__(self):
+        return f"Node({self.name!r}, {self.kind!r})"
+
+
+class Event:
+    __slots__ = ("src", "dst", "type", "description")
+
+    def __init__(self, src: str, dst: str, event_type: str, description: str):
+        self.src = src
+        self.dst = dst
+        self.type = event_type
+        self.description = description
+
+    def key(self) -> tuple:
+        return self.src, self.dst, normalize_key(self.type), normalize_key(self.description)
+
+    def to_json(self) -> dict:
+        return {"from": self.src, "to": self.dst, "type": self.type, "description": self.description}
+
+
+def _name(element) -> str:
+    name = element.get("name") if isinstance(element, dict) else element
+    return sys.intern(str(name).strip()) if name is not None else ""
+
+
+def is_null_name(name) -> bool:
+    return normalize_key(name) in NULL_NAMES
+
+
+class ArchitectureModel:
+    """
+    Indexed form of merged_architecture.json: nodes by (interned) name, events with
+    adjacency lists, and reverse indexes service -> db, db -> services using it and
+    caller -> callee between services. Node and event order is first-seen order, so
+    to_json() round-trips the file.
+    """
+
+    def __init__(self):
+        self.nodes = {}  # name -> Node
+        self.keys = {}  # normalize_key(name) -> name, for repairing near-miss references
+        self.events = []
+        self.event_keys = set()
+        self.out_edges = {}  # name -> [Event]
+        self.in_edges = {}  # name -> [Event]
+        self.db_of = {}  # service -> db
+        self.used_by = {}  # db -> {service: None}, in first-seen order
+        self.callees = {}  # service -> {service: None}
+        self.callers = {}  # service -> {service: None}
+
+    # ---------------- Building ----------------
+
+    def add_node(self, name: str, kind: str, data: dict = None) -> Node:
+        node = self.nodes.get(name)
+        if node is None:
+            node = self.nodes[name] = Node(name, kind, data or {})
+            self.keys.setdefault(normalize_key(name), name)
+        return node
+
+    def link_db(self, service: str, db: str):
+        self.db_of.setdefault(service, db)
+        self.used_by.setdefault(db, {})[service] = None
+
+    def add_event(self, src: str, dst: str, event_type: str = "Unknown", description: str = "") -> bool:
+        event = Event(src, dst, event_type or "Unknown", description or "")
+        key = event.key()
+        if key in self.event_keys:
+            return False
+        self.event_keys.add(key)
+        self.events.append(event)
+        self.out_edges.setdefault(src, []).append(event)
+        self.in_edges.setdefault(dst, []).append(event)
+        if self.kind(src) == "service" and self.kind(dst) == "service":
+            self.callees.setdefault(src, {})[dst] = None
+            self.callers.setdefault(dst, {})[src] = None
+        return True
+
+    # ---------------- Lookups ----------------
+
+    def __contains__(self, name) -> bool:
+        return name in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def node(self, name: str) -> Node:
+        return self.nodes.get(name)
+
+    def kind(self, name: str) -> str:
+        node = self.nodes.get(name)
+        return node.kind if node else None
+
+    def resolve(self, name) -> str:
+        """
+        The known node `name` refers to, exactly or case-/punctuation-insensitively; None if unknown.
+        """
+        name = _name(name)
+        if name in self.nodes:
+            return name
+        return self.keys.get(normalize_key(name))
+
+    def of_kind(self, kind: str) -> list:
+        return [node for node in self.nodes.values() if node.kind == kind]
+
+    def neighbors(self, name: str) -> list:
+        """
+        Nodes linked to `name` by an event in either direction or by a database link.
+        """
+        linked = {}
+        for event in self.out_edges.get(name, ()):
+            linked[event.dst] = None
+        for event in self.in_edges.get(name, ()):
+            linked[event.src] = None
+        if name in self.db_of:
+            linked[self.db_of[name]] = None
+        for service in self.used_by.get(name, ()):
+            linked[service] = None
+        linked.pop(name, None)
+        return list(linked)
+
+    def neighborhood(self, names, depth: int = 1) -> list:
+        """
+        `names` plus every node within `depth` links of them.
+        """
+        seen = dict.fromkeys(name for name in names if name in self.nodes)
+        frontier = list(seen)
+        for _ in range(depth):
+            frontier = [n for name in frontier for n in self.neighbors(name) if n not in seen]
+            seen.update(dict.fromkeys(frontier))
+        return list(seen)
+
+    def connected_components(self) -> list:
+        """
+        Node names grouped into connected components, in order of first appearance.
+        """
+        position = {name: i for i, name in enumerate(self.nodes)}
+        component_of = {}
+        components = []
+        for start in self.nodes:
+            if start in component_of:
+                continue
+            component = [start]
+            component_of[start] = component
+            for name in component:  # grows while iterating: breadth-first
+                for neighbor in self.neighbors(name):
+                    # A sub-architecture's events may point at nodes outside it
+                    if neighbor in self.nodes and neighbor not in component_of:
+                        component_of[neighbor] = component
+                        component.append(neighbor)
+            components.append(sorted(component, key=position.get))
+        return components
+
+    def subgraph(self, names) -> "ArchitectureModel":
+        """
+        The nodes in `names`. Their database links are kept and an event belongs to the
+        subgraph of its source, even where the other end lies outside.
+        """
+        names = set(names)
+        sub = ArchitectureModel()
+        for name, node in self.nodes.items():
+            if name in names:
+                sub.nodes[name] = node
+                sub.keys.setdefault(normalize_key(name), name)
+        for service, db in self.db_of.items():
+            if service in names:
+                sub.db_of[service] = db
+        for db, services in self.used_by.items():
+            if db in names:
+                sub.used_by[db] = dict(services)
+        for event in self.events:
+            if event.src in names:
+                sub.events.append(event)
+                sub.event_keys.add(event.key())
+                sub.out_edges.setdefault(event.src, []).append(event)
+                sub.in_edges.setdefault(event.dst, []).append(event)
+                if event.src in self.callees and event.dst in self.callees[event.src]:
+                    sub.callees.setdefault(event.src, {})[event.dst] = None
+                    sub.callers.setdefault(event.dst, {})[event.src] = None
+        return sub
+
+    # ---------------- Serialization ----------------
+
+    def to_json(self) -> dict:
+        return {
+            "actors": [{"name": node.name, **node.data} for node in self.of_kind("actor")],
+            "microservices": [{"name": node.name, "db": self.db_of.get(node.name), **node.data}
+                              for node in self.of_kind("service")],
+            "databases": [{"name": node.name, **node.data, "used_by": list(self.used_by.get(node.name, ()))}
+                          for node in self.of_kind("db")],
+            "events": [event.to_json() for event in self.events],
+        }
+
+    # ---------------- Validation ----------------
+
+    def validate(self, dangling: str = DANGLING_ENDPOINTS) -> list:
+        """
+        Repair or drop references to unknown nodes, in place: database links and event
+        endpoints that only differ in case/punctuation are pointed at the known node,
+        null-like ones are dropped, and other unknown event endpoints become external
+        systems (or drop the event, with `dangling="drop"`). Returns the issues found.
+        """
+        issues = []
+
+        for db, services in list(self.used_by.items()):
+            for service in list(services):
+                resolved = self.resolve(service)
+                if resolved == service:
+                    continue
+                del services[service]
+                if resolved and self.kind(resolved) == "service":
+                    services[resolved] = None
+                    issues.append(("repaired", f"database {db!r} user {service!r} -> {resolved!r}"))
+                else:
+                    issues.append(("dropped", f"database {db!r} user {service!r}: unknown service"))
+
+        if all(event.src in self.nodes and event.dst in self.nodes for event in self.events):
+            return self._report(issues)
+        events, self.events = self.events, []
+        self.event_keys = set()
+        self.out_edges, self.in_edges, self.callees, self.callers = {}, {}, {}, {}
+        for event in events:
+            ends = []
+            for end in (event.src, event.dst):
+                resolved = self.resolve(end)
+                if resolved is None and not is_null_name(end) and dangling == "external":
+                    resolved = self.add_node(end, "actor", {"type": EXTERNAL_SYSTEM_TYPE}).name
+                    issues.append(("repaired", f"unknown event endpoint {end!r} added as an external system"))
+                elif resolved is not None and resolved != end:
+                    issues.append(("repaired", f"event endpoint {end!r} -> {resolved!r}"))
+                ends.append(resolved)
+            if None in ends:
+                issues.append(("dropped", f"event {event.src!r} -> {event.dst!r}: unknown endpoint"))
+                continue
+            self.add_event(ends[0], ends[1], event.type, event.description)
+        return self._report(issues)
+
+    @staticmethod
+    def _report(issues: list) -> list:
+        repaired = sum(1 for action, _ in issues if action == "repaired")
+        metrics_utility.increment("model.references_repaired", repaired)
+        metrics_utility.increment("model.references_dropped", len(issues) - repaired)
+        if issues:
+            print(f"⚠️ Architecture validation: {repaired} references repaired, {len(issues) - repaired} dropped")
+        return issues
+
+
+def _fields(element, skip: tuple, default_type: str = None) -> dict:
+    """
+    An element's fields other than `skip`, with a default "type" for actors and databases.
+    """
+    fields = {"type": default_type} if default_type else {}
+    if isinstance(element, dict):
+        fields.update((key, value) for key, value in element.items() if key not in skip)
+    return fields
+
+
+def from_json(architecture: dict) -> ArchitectureModel:
+    """
+    Index an architecture JSON as is; databases a service names but the databases section
+    misses are added. Call validate() to deal with dangling references.
+    """
+    model = ArchitectureModel()
+    for actor in architecture.get("actors") or []:
+        name = _name(actor)
+        if not is_null_name(name):
+            model.add_node(name, "actor", _fields(actor, ("name",), "External"))
+    services = []
+    for svc in architecture.get("microservices") or []:
+        name = _name(svc)
+        if not isinstance(svc, dict) or is_null_name(name):
+            continue
+        model.add_node(name, "service", _fields(svc, ("name", "db")))
+        services.append((name, svc.get("db")))
+    for db in architecture.get("databases") or []:
+        name = _name(db)
+        if not is_null_name(name):
+            model.add_node(name, "db", _fields(db, ("name", "used_by"), "Unknown"))
+    for name, db in services:
+        if db and not is_null_name(db):
+            model.link_db(name, model.add_node(model.resolve(db) or _name(db), "db", {"type": "Unknown"}).name)
+    for db in architecture.get("databases") or []:
+        if isinstance(db, dict) and not is_null_name(_name(db)):
+            users = model.used_by.setdefault(_name(db), {})
+            users.update(dict.fromkeys(_name(user) for user in db.get("used_by") or []))
+    for event in architecture.get("events", architecture.get("interactions")) or []:
+        if isinstance(event, dict):
+            model.add_event(_name(event.get("from")), _name(event.get("to")),
+                            event.get("type", "Unknown"), event.get("description", ""))
+    return model
+
+
+def build_model(architecture) -> ArchitectureModel:
+    """
+    Validated model of an architecture JSON; a model is returned as is.
+    """
+    if isinstance(architecture, ArchitectureModel):
+        return architecture
+    model = from_json(architecture or {})
+    model.validate()
+    return model
+
+
+# ---------------------
+# Splitting into connected sub-graphs
+# ---------------------
+
+def _node_costs(architecture: dict) -> dict:
+    """
+    Estimated prompt tokens each node contributes (its element plus its outgoing events).
+    """
+    costs = {}
+    for section in ("actors", "microservices", "databases"):
+        for item in architecture.get(section) or []:
+            name = item.get("name") if isinstance(item, dict) else str(item)
+            if name:
+                costs[name] = costs.get(name, 0) + estimate_tokens(json.dumps(item, separators=(",", ":")))
+    for event in architecture.get("events") or []:
+        if event.get("from"):
+            costs[event["from"]] = costs.get(event["from"], 0) + estimate_tokens(
+                json.dumps(event, separators=(",", ":")))
+    return costs
+
+
+def split_architecture(architecture: dict, max_tokens: int) -> list:
+    """
+    Split into sub-architectures of at most ~`max_tokens` serialized tokens each.
+    Whole connected components are packed together; a component that is too big
+    on its own is cut into consecutive node groups.
+    """
+    costs = _node_costs(architecture)
+    model = from_json(architecture)
+    groups = []
+    current, current_tokens = [], 0
+    for component in model.connected_components():
+        component_tokens = sum(costs.get(name, 1) for name in component)
+        pieces = [component]
+        if component_tokens > max_tokens:
+            pieces, piece, piece_tokens = [], [], 0
+            for name in component:
+                if piece and piece_tokens + costs.get(name, 1) > max_tokens:
+                    pieces.append(piece)
+                    piece, piece_tokens = [], 0
+                piece.append(name)
+                piece_tokens += costs.get(name, 1)
+            pieces.append(piece)
+        for piece in pieces:
+            piece_tokens = sum(costs.get(name, 1) for name in piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current += piece
+            current_tokens += piece_tokens
+    if current:
+        groups.append(current)
+    return [model.subgraph(group).to_json() for group in groups]
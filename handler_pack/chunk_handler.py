@@ -0,0 +1,178 @@
+import re
+
+from ai_uitls.token_utility import estimate_tokens
+from handler_pack import ingest_handler
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+# llama3-8b-8192: ~450 prompt-template tokens + chunk + room for the JSON completion
+CHUNK_TOKENS = 2500
+CHUNK_OVERLAP_TOKENS = 100  # trailing context repeated at the start of the next chunk
+HEADING_FLUSH_RATIO = 0.8  # start a new chunk at a heading once the current one is this full
+SPLIT_BLOCK_RATIO = 0.75  # oversized blocks are cut to this share of the budget
+
+HEADING = "heading"
+PARAGRAPH = "paragraph"
+LIST = "list"
+TABLE = "table"
+
+NUMBERED_HEADING = re.compile(r"^\s*\d+(\.\d+)*\.?\s+[A-Z][^.:;]{0,80}$")
+LIST_ITEM = re.compile(r"^\s*([*\-•]|\d+[.)])\s*\S")
+TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{3,}")
+
+
+def iter_file_lines(file_path: str):
+    """
+    Stream a BRD line by line (text, Markdown, PDF or DOCX; nothing held in memory).
+    """
+    return ingest_handler.iter_document_lines(file_path)
+
+
+def _classify(lines: list):
+    if len(lines) == 1 and NUMBERED_HEADING.match(lines[0]):
+        return HEADING, lines[0].strip()
+    text = "\n".join(lines)
+    if all("|" in line for line in lines):
+        return TABLE, text
+    if LIST_ITEM.match(lines[0]):
+        return LIST, text
+    return PARAGRAPH, text
+
+
+def iter_blocks(lines):
+    """
+    Group lines into structural blocks: (kind, text) for headings, paragraphs,
+    bullet/numbered lists and tables. Blank lines separate blocks; newlines
+    inside a block are kept.
+    """
+    pending = []
+    for line in lines:
+        line = line.rstrip()
+        if not line.strip():
+            if pending:
+                yield _classify(pending)
+                pending = []
+            continue
+        if line.lstrip().startswith("#"):
+            if pending:
+                yield _classify(pending)
+                pending = []
+            yield HEADING, line.strip()
+            continue
+        pending.append(line)
+    if pending:
+        yield _classify(pending)
+
+
+def _split_words(text: str, max_tokens: int):
+    words = []
+    used = 0
+    for word in text.split(" "):
+        tokens = estimate_tokens(word)
+        if words and used + tokens > max_tokens:
+            yield " ".join(words)
+            words = []
+            used = 0
+        words.append(word)
+        used += tokens
+    if words:
+        yield " ".join(words)
+
+
+def split_block(kind: str, text: str, max_tokens: int):
+    """
+    Cut an oversized block at line boundaries (list items, table rows), falling
+    back to word boundaries for a single huge line. Table pieces repeat the header.
+    """
+    lines = text.split("\n")
+    header = []
+    if kind == TABLE and len(lines) > 2 and TABLE_SEPARATOR.match(lines[1]):
+        header = lines[:2]
+        lines = lines[2:]
+    header_tokens = estimate_tokens("\n".join(header)) if header else 0
+
+    piece = list(header)
+    used = header_tokens
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if tokens > max_tokens - header_tokens:
+            if len(piece) > len(header):
+                yield kind, "\n".join(piece)
+            for part in _split_words(line, max_tokens - header_tokens):
+                yield kind, "\n".join(header + [part])
+            piece = list(header)
+            used = header_tokens
+            continue
+        if len(piece) > len(header) and used + tokens > max_tokens:
+            yield kind, "\n".join(piece)
+            piece = list(header)
+            used = header_tokens
+        piece.append(line)
+        used += tokens
+    if len(piece) > len(header):
+        yield kind, "\n".join(piece)
+
+
+def _overlap_tail(blocks: list, overlap_tokens: int) -> list:
+    tail = []
+    used = 0
+    for block in reversed(blocks):
+        if used + block[2] > overlap_tokens:
+            break
+        tail.insert(0, block)
+        used += block[2]
+    return tail
+
+
+def stream_chunks(blocks, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+    """
+    Pack structural blocks into chunks of at most `max_tokens` estimated tokens.
+    Chunks break at headings once mostly full, never end on a dangling heading,
+    and start with up to `overlap_tokens` of the previous chunk's trailing blocks.
+    """
+    current = []  # (kind, text, tokens)
+    current_tokens = 0
+    fresh = 0  # blocks in `current` that are not overlap from the previous chunk
+    piece_tokens = int(max_tokens * SPLIT_BLOCK_RATIO)
+
+    for kind, text in blocks:
+        tokens = estimate_tokens(text)
+        pieces = split_block(kind, text, piece_tokens) if tokens > piece_tokens else [(kind, text)]
+        for kind, text in pieces:
+            tokens = estimate_tokens(text)
+            overflow = current_tokens + tokens > max_tokens
+            at_section = kind == HEADING and current_tokens >= max_tokens * HEADING_FLUSH_RATIO
+            if fresh and (overflow or at_section):
+                carry = []
+                if current[-1][0] == HEADING and fresh > 1:
+                    carry = [current.pop()]
+                yield "\n\n".join(block[1] for block in current)
+                current = _overlap_tail(current, overlap_tokens)
+                current_tokens = sum(block[2] for block in current)
+                if current_tokens + sum(block[2] for block in carry) + tokens > max_tokens:
+                    current, current_tokens = [], 0
+                current += carry
+                current_tokens += sum(block[2] for block in carry)
+                fresh = len(carry)
+            current.append((kind, text, tokens))
+            current_tokens += tokens
+            fresh += 1
+
+    if fresh:
+        yield "\n\n".join(block[1] for block in current)
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+    """
+    Chunk an in-memory BRD string.
+    """
+    return stream_chunks(iter_blocks(text.splitlines()), max_tokens, overlap_tokens)
+
+
+def stream_file_chunks(file_path: str, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS):
+    """
+    Chunk a BRD file (any format ingest_handler reads) without reading it into memory.
+    """
+    return stream_chunks(iter_blocks(iter_file_lines(file_path)), max_tokens, overlap_tokens)
@@ -0,0 +1,123 @@
+import hashlib
+import re
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+SIMILARITY_THRESHOLD = 0.9  # estimated Jaccard similarity above which a chunk reuses an earlier extraction
+SHINGLE_WORDS = 5  # words per shingle
+SIGNATURE_SIZE = 128  # MinHash values per chunk
+LSH_BANDS = 16  # SIGNATURE_SIZE / LSH_BANDS rows per band: candidates from ~0.7 similarity up
+MAX_CANDIDATES = 16  # signatures compared per chunk, keeps the worst case linear
+
+WORD = re.compile(r"\w+")
+EMPTY_SLOT = 1 << 64
+HASH_MASK = (1 << 64) - 1
+
+
+def _word_hash(word: str) -> int:
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def shingle_hashes(text: str, shingle_words: int = SHINGLE_WORDS):
+    """
+    64-bit hashes of the overlapping word shingles of `text` (case and punctuation ignored).
+    Each distinct word is hashed once with blake2b; a shingle is the tuple hash of its word
+    hashes, which CPython computes deterministically (integers are not hash-randomised).
+    """
+    words = WORD.findall(text.lower())
+    if len(words) < shingle_words:
+        words = words + [""] * (shingle_words - len(words))
+    cache = {}
+    hashes = [cache.get(word) or cache.setdefault(word, _word_hash(word)) for word in words]
+    for shingle in zip(*(hashes[i:] for i in range(shingle_words))):
+        yield hash(shingle) & HASH_MASK
+
+
+def minhash_signature(text: str, size: int = SIGNATURE_SIZE) -> tuple:
+    """
+    One-permutation MinHash: every shingle hash is binned by its low bits and each bin
+    keeps its minimum, so the signature costs one hash per shingle instead of `size`.
+    Empty bins borrow from the next non-empty bin (densification) so similarity stays
+    comparable across chunks of different lengths.
+    """
+    mins = [EMPTY_SLOT] * size
+    for h in shingle_hashes(text):
+        slot = h % size
+        value = h // size
+        if value < mins[slot]:
+            mins[slot] = value
+    if EMPTY_SLOT in mins:
+        filled = [i for i, value in enumerate(mins) if value != EMPTY_SLOT]
+        if not filled:
+            return tuple(mins)
+        for i in range(size):
+            if mins[i] == EMPTY_SLOT:
+                donor = next((j for j in filled if j > i), filled[0])
+                mins[i] = mins[donor] + (i - donor) % size * (EMPTY_SLOT // size)
+    return tuple(mins)
+
+
+def estimated_similarity(a: tuple, b: tuple) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures of the chunks seen so far. Only chunks that are
+    not themselves duplicates are indexed, so every duplicate points at an original.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, bands: int = LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.buckets = {}  # (band, band values) -> [chunk idx, ...]
+        self.signatures = {}  # chunk idx -> signature
+
+    def _band_keys(self, signature: tuple):
+        rows = len(signature) // self.bands
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def find(self, signature: tuple):
+        """
+        Index of the most similar earlier original at or above the threshold, or None.
+        """
+        candidates = []
+        seen = set()
+        for key in self._band_keys(signature):
+            for idx in self.buckets.get(key, ()):
+                if idx not in seen:
+                    seen.add(idx)
+                    candidates.append(idx)
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+        best, best_similarity = None, self.threshold
+        for idx in candidates[:MAX_CANDIDATES]:
+            similarity = estimated_similarity(signature, self.signatures[idx])
+            if similarity >= best_similarity:
+                best, best_similarity = idx, similarity
+        return best
+
+    def add(self, idx: int, signature: tuple):
+        self.signatures[idx] = signature
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(idx)
+
+
+def find_near_duplicates(chunks, threshold: float = SIMILARITY_THRESHOLD) -> dict:
+    """
+    Map chunk index -> index of an earlier chunk it near-duplicates. Linear in the total
+    text size: one pass of shingling plus a bounded number of bucket lookups per chunk.
+    """
+    index = NearDuplicateIndex(threshold)
+    duplicate_of = {}
+    for idx, chunk in enumerate(chunks):
+        signature = minhash_signature(chunk)
+        original = index.find(signature)
+        if original is None:
+            index.add(idx, signature)
+        else:
+            duplicate_of[idx] = original
+    return duplicate_of
@@ -0,0 +1,313 @@
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_uitls import metrics_utility
+from handler_pack import layout_engine
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+LARGE_LAYOUT_NODES = 120  # above this, render per-partition diagrams plus an overview
+PARTITION_MAX_NODES = 60  # small components are packed together up to this many nodes
+PARTITION_FORMATS = ("png", "svg")
+HUB_TYPES = ("actor", "external", "gateway")  # connect everything, so they never join partitions
+RENDER_MANIFEST_SUFFIX = ".render.json"  # part name -> DOT hash of its last render
+OVERVIEW_NAME = "overview"
+UNSAFE_FILE_CHARS = re.compile(r"[^\w-]+")
+
+
+def edge_style(label: str) -> tuple:
+    """
+    (color, style) of an edge from its label.
+    """
+    label = label.lower()
+    if "db" in label:
+        return "brown", "dashed"
+    if "rest" in label or "api" in label:
+        return "black", "solid"
+    if "queue" in label or "event" in label:
+        return "black", "dashed"
+    if "grpc" in label:
+        return "cyan", "solid"
+    return "black", "solid"
+
+
+def build_digraph(layout_json: dict, cluster_label: str = "Microservices Layer"):
+    """
+    Graphviz Digraph of a layout; microservices sit in a dotted-line cluster.
+    """
+    import graphviz  # only rendering needs it
+
+    dot = graphviz.Digraph()
+    dot.attr(rankdir='TB', splines='ortho', fontname='Helvetica')
+
+    microservices = []
+    for node in layout_json.get("nodes", []):
+        node_name = node.get("name", "").strip()
+        node_type = node.get("type", "").lower()
+        if not node_name or node_name.lower() == "null":
+            continue
+        if node_type == "service":
+            microservices.append((node_name, node))
+            continue
+
+        # Professional color & shape mapping
+        shape = "ellipse" if node_type == "actor" else "box"
+        style = "filled"
+        if node_type == "db":
+            shape = "cylinder"
+        elif node_type == "external":
+            style = "dashed,filled"
+        dot.node(node_name, shape=shape, style=style, fillcolor=node.get("color", "white"), fontsize="12",
+                 fontcolor="black", width="1.2", height="0.8", pos=f'{node.get("x", 0)},{node.get("y", 0)}!')
+
+    if microservices:
+        with dot.subgraph(name="cluster_microservices") as c:
+            c.attr(label=cluster_label, color="gray", style="dotted", fontsize="14", fontname="Helvetica-Bold")
+            for node_name, node in microservices:
+                c.node(node_name, shape="box3d", style="filled", fillcolor=node.get("color", "lightblue"),
+                       fontsize="12", fontcolor="black", width="1.2", height="0.8",
+                       pos=f'{node.get("x", 0)},{node.get("y", 0)}!')
+
+    for edge in layout_json.get("edges", []):
+        src = edge.get("from")
+        dst = edge.get("to")
+        if not src or not dst:
+            continue
+        label = edge.get("label", "").strip()
+        edge_color, edge_style_name = edge_style(label)
+        dot.edge(src, dst, xlabel=label, color=edge_color, fontcolor=edge_color, fontsize="10",
+                 style=edge_style_name, arrowsize="0.7")
+    return dot
+
+
+# ---------------------
+# PARTITIONING
+# ---------------------
+
+def _find(parents: dict, name: str) -> str:
+    while parents[name] != name:
+        parents[name] = parents[parents[name]]
+        name = parents[name]
+    return name
+
+
+def _union(parents: dict, a: str, b: str):
+    root_a, root_b = _find(parents, a), _find(parents, b)
+    if root_a != root_b:
+        parents[root_b] = root_a
+
+
+def _bfs_split(members: list, adjacency: dict, max_nodes: int) -> list:
+    """
+    Cut an oversized component into pieces of at most `max_nodes` in breadth-first order,
+    so neighbours (a service and its database, callers and callees) mostly stay together.
+    """
+    pieces = [[]]
+    remaining = dict.fromkeys(members)
+    queue = deque()
+    while remaining or queue:
+        if not queue:
+            start = next(iter(remaining))
+            del remaining[start]
+            queue.append(start)
+        name = queue.popleft()
+        if len(pieces[-1]) >= max_nodes:
+            pieces.append([])
+        pieces[-1].append(name)
+        for neighbour in adjacency.get(name, ()):
+            if neighbour in remaining:
+                del remaining[neighbour]
+                queue.append(neighbour)
+    return pieces
+
+
+def partition_layout(layout_json: dict, max_nodes: int = PARTITION_MAX_NODES) -> tuple:
+    """
+    Split a layout into sub-layouts -> ([(part name, sub-layout)], edges between partitions or hubs).
+    Nodes are grouped into connected components over service/DB edges; larger ones are cut
+    breadth-first and small ones packed together, so no partition has more than `max_nodes`
+    nodes besides the hubs.
+    Actors, external systems and gateways are copied into every partition they touch.
+    """
+    nodes = {}
+    for node in layout_json.get("nodes", []):
+        name = node.get("name", "").strip()
+        if name and name.lower() != "null" and name not in nodes:
+            nodes[name] = node
+    hubs = {name for name, node in nodes.items() if node.get("type", "").lower() in HUB_TYPES}
+    edges = [edge for edge in layout_json.get("edges", []) if edge.get("from") and edge.get("to")]
+
+    parents = {}
+    for edge in edges:
+        for end in (edge["from"], edge["to"]):
+            if end not in hubs:
+                parents.setdefault(end, end)
+    for name in nodes:
+        if name not in hubs:
+            parents.setdefault(name, name)
+    adjacency = {}
+    for edge in edges:
+        src, dst = edge["from"], edge["to"]
+        if src in hubs or dst in hubs:
+            continue
+        _union(parents, src, dst)
+        adjacency.setdefault(src, {})[dst] = None
+        adjacency.setdefault(dst, {})[src] = None
+
+    # Components in first-seen order, packed into partitions
+    components = {}
+    for name in parents:
+        components.setdefault(_find(parents, name), []).append(name)
+    packed = []
+    for members in components.values():
+        if len(members) > max_nodes:
+            packed += _bfs_split(members, adjacency, max_nodes)
+        elif packed and len(packed[-1]) + len(members) <= max_nodes:
+            packed[-1].extend(members)
+        else:
+            packed.append(list(members))
+    groups = [(f"part_{i + 1:03d}", members) for i, members in enumerate(packed)]
+
+    part_of = {name: part for part, members in groups for name in members}
+    part_nodes = {part: dict.fromkeys(members) for part, members in groups}
+    part_edges = {part: [] for part, _ in groups}
+    shared_edges = []
+    for edge in edges:
+        src, dst = edge["from"], edge["to"]
+        src_part, dst_part = part_of.get(src), part_of.get(dst)
+        part = src_part or dst_part
+        if part is None or (src_part and dst_part and src_part != dst_part):  # hub to hub, or across partitions
+            shared_edges.append(edge)
+            continue
+        part_edges[part].append(edge)
+        for end in (src, dst):
+            if end in hubs:
+                part_nodes[part].setdefault(end)
+
+    parts = [
+        (part, {"nodes": [nodes[name] for name in part_nodes[part] if name in nodes], "edges": part_edges[part]})
+        for part, _ in groups
+    ]
+    return parts, shared_edges
+
+
+def overview_layout(parts: list, shared_edges: list, layout_json: dict) -> dict:
+    """
+    One node per partition plus the actors/external systems/gateways, with one edge per
+    (source, target, label) between them.
+    """
+    hubs = [node for node in layout_json.get("nodes", []) if node.get("type", "").lower() in HUB_TYPES]
+    hub_names = {node.get("name", "").strip() for node in hubs}
+    titles = {}
+    nodes = list(hubs)
+    part_of = {}
+    for i, (part, sub_layout) in enumerate(parts):
+        members = [node for node in sub_layout["nodes"] if node.get("name", "").strip() not in hub_names]
+        services = sum(1 for node in members if node.get("type", "").lower() == "service")
+        titles[part] = f"{part}\n{services} services, {len(members) - services} other"
+        nodes.append({"name": titles[part], "type": "service", "x": i * layout_engine.NODE_SPACING,
+                      "y": layout_engine.LAYER_Y["microservice"], "color": layout_engine.NODE_COLORS["service"]})
+        for node in members:
+            part_of[node.get("name", "").strip()] = part
+        for edge in sub_layout["edges"]:
+            for end in (edge["from"], edge["to"]):
+                if end not in hub_names:
+                    part_of.setdefault(end, part)
+
+    counts = {}
+    for edge in [edge for _, sub_layout in parts for edge in sub_layout["edges"]] + shared_edges:
+        src = titles[part_of[edge["from"]]] if edge["from"] in part_of else edge["from"]
+        dst = titles[part_of[edge["to"]]] if edge["to"] in part_of else edge["to"]
+        if src != dst:
+            key = (src, dst, edge.get("label", "").strip())
+            counts[key] = counts.get(key, 0) + 1
+    edges = [{"from": src, "to": dst, "label": f"{label} ×{count}" if count > 1 else label}
+             for (src, dst, label), count in counts.items()]
+    return {"nodes": nodes, "edges": edges}
+
+
+# ---------------------
+# RENDERING
+# ---------------------
+
+def _render_source(task) -> list:
+    source, output_base, formats = task
+    import graphviz
+
+    return [graphviz.Source(source, format=fmt).render(output_base, cleanup=True) for fmt in formats]
+
+
+def _load_render_manifest(manifest_file: str) -> dict:
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_render_manifest(manifest: dict, manifest_file: str):
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def render_graphs(graphs: list, output_file: str, max_workers: int = None) -> dict:
+    """
+    Render [(part name, output base, digraph, formats)] concurrently, skipping parts whose
+    DOT source hash matches the last render (recorded next to `output_file`) and whose
+    files still exist. Each render is its own `dot` process, so worker threads are enough
+    to keep every CPU busy. Returns part name -> output files.
+    """
+    manifest_file = output_file + RENDER_MANIFEST_SUFFIX
+    previous = _load_render_manifest(manifest_file)
+    manifest = {}
+    outputs = {}
+    tasks = []
+    for part, output_base, dot, formats in graphs:
+        digest = hashlib.sha256(dot.source.encode("utf-8")).hexdigest()
+        files = [f"{output_base}.{fmt}" for fmt in formats]
+        manifest[part] = {"hash": digest, "files": files}
+        outputs[part] = files
+        if previous.get(part) == manifest[part] and all(os.path.exists(file) for file in files):
+            metrics_utility.increment("render.parts_skipped")
+            continue
+        tasks.append((part, (dot.source, output_base, formats)))
+
+    if tasks:
+        with metrics_utility.stage_timer("render.graphviz"):
+            with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+                for (part, _), files in zip(tasks, executor.map(_render_source, [task for _, task in tasks])):
+                    outputs[part] = files
+        metrics_utility.increment("render.parts_rendered", len(tasks))
+    _save_render_manifest(manifest, manifest_file)
+    print(f"✅ Diagrams rendered: {len(tasks)}, unchanged: {len(graphs) - len(tasks)}")
+    return outputs
+
+
+def render_layout(layout_json: dict, output_file: str = "c4_ai_layout", large_nodes: int = LARGE_LAYOUT_NODES,
+                  formats: tuple = PARTITION_FORMATS, max_workers: int = None) -> str:
+    """
+    Render a layout; returns the PNG to embed (`formats` must include "png"). Up to `large_nodes` nodes this is one diagram
+    (`output_file`.png). Larger layouts get one diagram per partition
+    (`output_file`_<part>.png/.svg) plus `output_file`_overview.png/.svg, which is returned.
+    """
+    if len(layout_json.get("nodes", [])) <= large_nodes:
+        outputs = render_graphs([(OVERVIEW_NAME, output_file, build_digraph(layout_json), ("png",))], output_file)
+        return outputs[OVERVIEW_NAME][0]
+
+    parts, shared_edges = partition_layout(layout_json)
+    graphs = [(OVERVIEW_NAME, f"{output_file}_{OVERVIEW_NAME}",
+               build_digraph(overview_layout(parts, shared_edges, layout_json), "Partitions"), formats)]
+    for part, sub_layout in parts:
+        graphs.append((part, f"{output_file}_{UNSAFE_FILE_CHARS.sub('_', part)}",
+                       build_digraph(sub_layout, f"Microservices: {part}"), formats))
+    print(f"✅ Large architecture: {len(layout_json['nodes'])} nodes in {len(parts)} partitions")
+    outputs = render_graphs(graphs, output_file, max_workers)
+    return outputs[OVERVIEW_NAME][formats.index("png")]
@@ -1,43 +1,228 @@
-import os
-
-from bs4 import BeautifulSoup
-from docx import Document
-from docx.shared import Inches
-from docx2pdf import convert
-from markdown import markdown
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ai_prompts import ai_for_design_doc_prompt
-from ai_uitls import ai_repsonse_utility
+from ai_uitls import ai_repsonse_utility, metrics_utility, prompt_budget_utility
+from handler_pack import architecture_model
+
+# "sectioned": one concurrent request per section, streamed to disk in order; "single": one request
+DESIGN_DOC_MODE = "sectioned"
+# "reportlab": render the PDF in-process from the Markdown; "docx2pdf": convert the DOCX with MS Word
+PDF_BACKEND = "reportlab"
+SECTION_COMPLETION_TOKENS = 1500
 
 
 def ask_ai_for_design_doc(input_json: dict) -> str:
     """
     Ask AI to generate a professional system design document in Markdown format.
+    Architectures too large for one prompt are documented per connected sub-system
+    and the parts stitched under one title.
+    """
+    plans = prompt_budget_utility.plan_prompts(
+        input_json, ai_for_design_doc_prompt.ask_ai_for_design_doc,
+        prompt_budget_utility.DESIGN_DOC_COMPLETION_TOKENS, architecture_model.split_architecture
+    )
+    parts = []
+    for part, prompt in plans:
+        response = ai_repsonse_utility.ai_response(prompt, "You are a helpful assistant that outputs JSON only.")
+        parts.append((part, response.choices[0].message.content.strip()))
+    if len(parts) == 1:
+        return parts[0][1]
+    return stitch_design_docs(parts)
+
+
+def stitch_design_docs(parts: list) -> str:
+    """
+    Combine per-sub-system documents: drop each part's title and nest its headings
+    one level under a "Subsystem N" heading.
+    """
+    lines = ["# System Design Document", ""]
+    for number, (part, markdown_doc) in enumerate(parts, start=1):
+        names = [svc.get("name") for svc in part.get("microservices", []) if svc.get("name")]
+        names = names or [actor.get("name") for actor in part.get("actors", []) if isinstance(actor, dict)]
+        lines.append(f"## Subsystem {number}: {', '.join(names[:3]) or 'Components'}")
+        lines.append("")
+        for line in markdown_doc.splitlines():
+            if re.match(r"^#\s+System Design Document", line, re.IGNORECASE):
+                continue
+            heading = re.match(r"^(#{1,5})(\s)", line)
+            lines.append("#" + line if heading else line)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def section_slice(title: str, input_json: dict) -> dict:
+    """
+    The part of the architecture a section needs, so each prompt stays small.
     """
-    prompt = ai_for_design_doc_prompt.ask_ai_for_design_doc(input_json)
-    response = ai_repsonse_utility.ai_response(prompt, "You are a helpful assistant that outputs JSON only.")
-    return response.choices[0].message.content.strip()
+    name_stubs = lambda items: [{"name": i.get("name")} for i in items if isinstance(i, dict)]
+    actors = input_json.get("actors", [])
+    services = input_json.get("microservices", [])
+    databases = input_json.get("databases", [])
+    events = input_json.get("events", [])
+    if title == "System Overview":
+        return {"actors": actors, "microservices": name_stubs(services), "databases": name_stubs(databases)}
+    if title == "Component Responsibilities":
+        return {"actors": actors, "microservices": services, "databases": databases}
+    if title == "Data Flow & Security Considerations":
+        return {
+            "actors": actors,
+            "microservices": [{"name": s.get("name"), "db": s.get("db"), "criticality": s.get("criticality")}
+                              for s in services],
+            "events": events,
+        }
+    if title == "Future Enhancements":
+        return {
+            "microservices": [{"name": s.get("name"), "scaling": s.get("scaling"),
+                               "criticality": s.get("criticality")} for s in services],
+            "databases": databases,
+        }
+    return input_json
+
+
+def names_only(architecture: dict) -> dict:
+    """
+    Components by name only; events keep their endpoints and type.
+    """
+    trimmed = {key: [{"name": i.get("name")} for i in items if isinstance(i, dict)]
+               for key, items in architecture.items() if key != "events"}
+    if architecture.get("events"):
+        trimmed["events"] = [{"from": e.get("from"), "to": e.get("to"), "type": e.get("type")}
+                             for e in architecture["events"] if isinstance(e, dict)]
+    return trimmed
 
 
-def generate_design_doc(input_json: dict):
+def section_prompts(number: int, title: str, instructions: str, input_json: dict) -> list:
     """
-        Generate only a professional design document from JSON.
-        """
+    [(sub_architecture, prompt)] for one section: its slice of the architecture, split
+    into sub-systems if over budget. Every prompt is checked against the budget again: a
+    part still over it is trimmed to names and planned again, and a hub node whose events
+    alone overflow has them spread over several prompts.
+    """
+    build = lambda part: ai_for_design_doc_prompt.ask_ai_for_design_doc_section(number, title, instructions, part)
+    fits = lambda prompt: prompt_budget_utility.fits(prompt, SECTION_COMPLETION_TOKENS)
+    plans = []
+    for part, prompt in prompt_budget_utility.plan_prompts(
+            section_slice(title, input_json), build, SECTION_COMPLETION_TOKENS, architecture_model.split_architecture):
+        if fits(prompt):
+            plans.append((part, prompt))
+            continue
+        for trimmed, trimmed_prompt in prompt_budget_utility.plan_prompts(
+                names_only(part), build, SECTION_COMPLETION_TOKENS, architecture_model.split_architecture):
+            if fits(trimmed_prompt):
+                plans.append((trimmed, trimmed_prompt))
+            else:
+                plans += prompt_budget_utility.split_events(trimmed, build, SECTION_COMPLETION_TOKENS)
+    return plans
+
+
+def stitch_section_parts(parts: list) -> str:
+    """
+    Combine per-sub-system bodies of one section under "### Subsystem N" headings,
+    nesting their own sub-headings one level deeper.
+    """
+    lines = []
+    for number, (part, body) in enumerate(parts, start=1):
+        names = [svc.get("name") for svc in part.get("microservices", []) if svc.get("name")]
+        names = names or [item.get("name") for key in ("actors", "databases") for item in part.get(key, [])
+                          if isinstance(item, dict) and item.get("name")]
+        lines += [f"### Subsystem {number}: {', '.join(names[:3]) or 'Components'}", ""]
+        lines += ["#" + line if re.match(r"^#{3,5}\s", line) else line for line in body.splitlines()]
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+def ask_ai_for_design_doc_section(number: int, title: str, instructions: str, input_json: dict) -> str:
+    """
+    Generate one section's body from its slice of the architecture; a slice too large
+    for one prompt is written per sub-system and the parts stitched together.
+    """
+    parts = []
+    for part, prompt in section_prompts(number, title, instructions, input_json):
+        response = ai_repsonse_utility.ai_response(prompt, "You are a helpful assistant that outputs JSON only.")
+        body = response.choices[0].message.content.strip()
+        # Drop a repeated section heading if the model added one anyway
+        first_line, _, rest = body.partition("\n")
+        if first_line.startswith("#") and title.lower() in first_line.lower():
+            body = rest.strip()
+        parts.append((part, body))
+    if len(parts) == 1:
+        return parts[0][1]
+    return stitch_section_parts(parts)
+
+
+def write_design_markdown_sectioned(input_json: dict, md_file: str = "Design_Document.md") -> str:
+    """
+    Generate every section as its own concurrent request and append sections to
+    the Markdown file in document order as soon as they (and all before them) finish.
+    """
+    sections = ai_for_design_doc_prompt.DESIGN_DOC_SECTIONS
+    print(f"✅ Generating AI Design Document ({len(sections)} sections in parallel)...")
+    bodies = {}
+    next_section = 0
+    with open(md_file, "w", encoding="utf-8") as f, ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        f.write("# System Design Document\n\n")
+        f.flush()
+        futures = {
+            executor.submit(ask_ai_for_design_doc_section, number, title, instructions, input_json): number - 1
+            for number, (title, instructions) in enumerate(sections, start=1)
+        }
+        for future in as_completed(futures):
+            bodies[futures[future]] = future.result()
+            while next_section in bodies:
+                title = sections[next_section][0]
+                f.write(f"## {next_section + 1}. {title}\n\n{bodies.pop(next_section)}\n\n")
+                f.flush()
+                print(f"✅ Section written: {title}")
+                next_section += 1
+    print(f"✅ Design document generated: {md_file}")
+    return md_file
+
+
+def write_design_markdown(input_json, md_file: str = "Design_Document.md", mode: str = None) -> str:
+    """
+    Generate the design document Markdown with the AI and save it. Needs only the architecture
+    (JSON or ArchitectureModel); dangling references are fixed before any prompt is built.
+    """
+    input_json = architecture_model.build_model(input_json).to_json()
+    if (mode or DESIGN_DOC_MODE) == "sectioned":
+        return write_design_markdown_sectioned(input_json, md_file)
+
     print("✅ Generating AI Design Document...")
     markdown_doc = ask_ai_for_design_doc(input_json)
 
     # Save Markdown
-    md_file = "Design_Document.md"
     with open(md_file, "w", encoding="utf-8") as f:
         f.write(markdown_doc)
     print(f"✅ Design document generated: {md_file}")
+    return md_file
+
+
+def assemble_design_doc(md_file: str, png_file: str = "c4_ai_full.png") -> str:
+    """
+    Build the DOCX (with the diagram embedded) and the PDF from the saved Markdown.
+    """
+    with metrics_utility.stage_timer("render.docx"):
+        docx_file = md_to_docx(md_file, png_file)
+
+    # Step 2: Convert DOCX -> PDF (or render the PDF straight from the Markdown)
+    with metrics_utility.stage_timer("render.pdf"):
+        if PDF_BACKEND == "reportlab":
+            from handler_pack import pdf_render_handler  # reportlab loads only when a PDF is rendered
+
+            return pdf_render_handler.md_to_pdf(md_file, png_file)
+        return docx_to_pdf(docx_file)
+
+
+def generate_design_doc(input_json: dict):
+    """
+        Generate only a professional design document from JSON.
+        """
+    md_file = write_design_markdown(input_json)
     png_file = "c4_ai_full.png"
 
     # Generate PDF
-    docx_file = md_to_docx(md_file, png_file)
-
-    # Step 2: Convert DOCX -> PDF
-    docx_to_pdf(docx_file)
+    return assemble_design_doc(md_file, png_file)
 
 
 def md_to_docx(md_file: str, png_file: str = None) -> str:
@@ -45,72 +230,17 @@ def md_to_docx(md_file: str, png_file: str = None) -> str:
     Convert a Markdown file to Word (DOCX) and embed PNG if provided.
     Returns the path to the generated DOCX file.
     """
-    # Read Markdown
-    with open(md_file, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    # Convert Markdown to HTML
-    html_content = markdown(md_content, extensions=["tables", "fenced_code"])
-    soup = BeautifulSoup(html_content, "html.parser")
+    from handler_pack import docx_render_handler  # python-docx loads only when a DOCX is written
 
-    # Create Word Document
-    doc = Document()
-
-    def add_list_items(parent_element, list_type="ul"):
-        """Recursively add list items to the DOCX document."""
-        for li in parent_element.find_all("li", recursive=False):
-            # Add the current list item
-            if list_type == "ul":
-                doc.add_paragraph(li.text, style='List Bullet')
-            else:
-                doc.add_paragraph(li.text, style='List Number')
-
-            # Check if the list item contains nested lists
-            for nested_list in li.find_all(["ul", "ol"], recursive=False):
-                add_list_items(nested_list, list_type=nested_list.name)
-
-    for element in soup.children:
-        if element.name in ["h1", "h2", "h3"]:
-            level = int(element.name[1])
-            doc.add_heading(element.text, level=level)
-
-        elif element.name == "p":
-            doc.add_paragraph(element.text)
-
-        elif element.name == "ul":
-            add_list_items(element, "ul")
-
-        elif element.name == "ol":
-            add_list_items(element, "ol")
-
-        elif element.name == "table":
-            rows = element.find_all("tr")
-            if rows:
-                cols = rows[0].find_all(["td", "th"])
-                table = doc.add_table(rows=len(rows), cols=len(cols))
-                table.style = "Table Grid"
-                for i, row in enumerate(rows):
-                    cells = row.find_all(["td", "th"])
-                    for j, cell in enumerate(cells):
-                        table.rows[i].cells[j].text = cell.text
-
-    # Embed PNG if available
-    if png_file and os.path.exists(png_file):
-        doc.add_page_break()
-        doc.add_heading("System Diagram", level=2)
-        doc.add_picture(png_file, width=Inches(6))
-
-    # Save DOCX
-    docx_file = md_file.replace(".md", ".docx")
-    doc.save(docx_file)
-    print(f"✅ Word document generated: {docx_file}")
-    return docx_file
+    return docx_render_handler.md_to_docx(md_file, png_file)
 
 
 def docx_to_pdf(docx_file: str):
     """
-    Convert DOCX to PDF using docx2pdf.
+    Convert DOCX to PDF using docx2pdf (needs Microsoft Word, so Windows/macOS only).
     """
+    from docx2pdf import convert
+
     pdf_file = docx_file.replace(".docx", ".pdf")
     convert(docx_file, pdf_file)
     print(f"✅ Final PDF generated: {pdf_file}")
@@ -0,0 +1,104 @@
+import os
+
+from docx import Document
+from docx.shared import Inches, Pt
+
+from handler_pack import markdown_handler
+
+CODE_FONT = "Courier New"
+CODE_FONT_SIZE = Pt(9)
+TABLE_STYLE = "Table Grid"
+DIAGRAM_WIDTH = Inches(6)
+MAX_LIST_DEPTH = 3  # the default template ships "List Bullet" .. "List Bullet 3"
+
+
+class DocxWriter:
+    """
+    Writes Markdown blocks straight into a python-docx Document, one block at a time.
+    Styles are resolved once per document instead of on every paragraph.
+    """
+
+    def __init__(self, doc=None):
+        self.doc = doc or Document()
+        styles = self.doc.styles
+        self.styles = {"code": styles["No Spacing"], "table": styles[TABLE_STYLE]}
+        for depth in range(MAX_LIST_DEPTH):
+            suffix = f" {depth + 1}" if depth else ""
+            self.styles[(False, depth)] = styles["List Bullet" + suffix]
+            self.styles[(True, depth)] = styles["List Number" + suffix]
+
+    def add_inline(self, paragraph, text: str):
+        for run_text, bold, italic, code in markdown_handler.iter_inline(text):
+            run = paragraph.add_run(run_text)
+            if bold:
+                run.bold = True
+            if italic:
+                run.italic = True
+            if code:
+                run.font.name = CODE_FONT
+
+    def add_block(self, block):
+        kind = block[0]
+        doc = self.doc
+        if kind == markdown_handler.HEADING:
+            self.add_inline(doc.add_heading("", level=block[1]), block[2])
+        elif kind == markdown_handler.PARAGRAPH:
+            self.add_inline(doc.add_paragraph(), block[1])
+        elif kind == markdown_handler.LIST_ITEM:
+            _, ordered, depth, text = block
+            style = self.styles[(ordered, min(depth, MAX_LIST_DEPTH - 1))]
+            self.add_inline(doc.add_paragraph(style=style), text)
+        elif kind == markdown_handler.CODE:
+            run = doc.add_paragraph(style=self.styles["code"]).add_run(block[2])
+            run.font.name = CODE_FONT
+            run.font.size = CODE_FONT_SIZE
+        elif kind == markdown_handler.TABLE:
+            self.add_table(block[1], block[2])
+        elif kind == markdown_handler.RULE:
+            doc.add_paragraph("_" * 40)
+
+    def add_table(self, header: list, rows: list):
+        """
+        Append rows one at a time and fill each from its own cell list; indexing
+        table.rows[i].cells[j] rebuilds the whole cell grid and goes quadratic.
+        """
+        columns = max([len(header)] + [len(row) for row in rows])
+        table = self.doc.add_table(rows=0, cols=columns)
+        table.style = self.styles["table"]
+        for row_index, values in enumerate([header] + rows):
+            for cell, value in zip(table.add_row().cells, values):
+                paragraph = cell.paragraphs[0]
+                if "*" in value or "`" in value:
+                    self.add_inline(paragraph, value)
+                else:
+                    paragraph.add_run(value)
+                if row_index == 0:
+                    for run in paragraph.runs:
+                        run.bold = True
+        return table
+
+    def add_diagram(self, png_file: str):
+        self.doc.add_page_break()
+        self.doc.add_heading("System Diagram", level=2)
+        self.doc.add_picture(png_file, width=DIAGRAM_WIDTH)
+
+
+def md_to_docx(md_file: str, png_file: str = None, docx_file: str = None) -> str:
+    """
+    Convert a Markdown file to Word (DOCX) and embed PNG if provided.
+    Returns the path to the generated DOCX file.
+    """
+    writer = DocxWriter()
+    with open(md_file, "r", encoding="utf-8") as f:
+        for block in markdown_handler.iter_markdown_blocks(f):
+            writer.add_block(block)
+
+    # Embed PNG if available
+    if png_file and os.path.exists(png_file):
+        writer.add_diagram(png_file)
+
+    # Save DOCX
+    docx_file = docx_file or md_file.replace(".md", ".docx")
+    writer.doc.save(docx_file)
+    print(f"✅ Word document generated: {docx_file}")
+    return docx_file
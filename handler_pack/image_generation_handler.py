@@ -1,11 +1,13 @@
-import graphviz
-
 from ai_prompts import ai_layout_prompt
-from ai_uitls import ai_repsonse_utility
-from handler_pack import json_file_handler
+from ai_uitls import ai_repsonse_utility, prompt_budget_utility
+from handler_pack import architecture_model, diagram_render_handler, json_file_handler, layout_engine
 
 graphviz_path = r"C:\Graphviz-13.1.1\Graphviz-13.1.1-win64\bin"
 
+# "local": deterministic layout engine, "local+labels": local layout with LLM-chosen
+# edge labels, "ai": the full LLM layout round trip
+LAYOUT_MODE = "local"
+
 def generate_ai_layout(input_json: dict):
 
     prompt = ai_layout_prompt.get_ai_layout_prompt(input_json)
@@ -15,119 +17,115 @@ def generate_ai_layout(input_json: dict):
     return raw_output
 
 
-def generate_architecture_png(input_json: dict, output_file="c4_ai_diagram"):
-    print("✅ Generating AI layout plan...")
-    layout_json_str = generate_ai_layout(input_json)
-    cleaned_layout_json = json_file_handler.fix_ai_json(layout_json_str)
-    print("✅ Rendering PNG...")
-    render_layout_to_png(cleaned_layout_json, output_file)
-    print(f"✅ C4 Container Diagram generated: {output_file}.png")
+def generate_ai_layout_json(input_json: dict) -> dict:
+    """
+    AI layout within the model's context window: architectures too large for one
+    prompt are split into connected sub-graphs whose layouts are stitched side by side.
+    """
+    plans = prompt_budget_utility.plan_prompts(
+        input_json, ai_layout_prompt.get_ai_layout_prompt, prompt_budget_utility.LAYOUT_COMPLETION_TOKENS,
+        architecture_model.split_architecture
+    )
+    if len(plans) == 1:
+        return json_file_handler.fix_ai_json(generate_ai_layout(input_json))
+
+    stitched = {"nodes": [], "edges": [], "microservice_interactions": []}
+    seen_nodes = set()
+    seen_edges = set()
+    seen_interactions = set()
+    x_offset = 0
+    for part, prompt in plans:
+        response = ai_repsonse_utility.ai_response(prompt, "You are a helpful assistant that outputs JSON only.")
+        layout = json_file_handler.fix_ai_json(response.choices[0].message.content.strip())
+        if not isinstance(layout, dict):
+            print("⚠️ Sub-graph layout unreadable, skipping it")
+            continue
+        part_width = 0
+        for node in layout.get("nodes", []):
+            if not isinstance(node, dict) or node.get("name") in seen_nodes:
+                continue
+            seen_nodes.add(node.get("name"))
+            x = node.get("x", 0) if isinstance(node.get("x"), (int, float)) else 0
+            part_width = max(part_width, x)
+            stitched["nodes"].append(dict(node, x=x + x_offset))
+        x_offset += part_width + layout_engine.NODE_SPACING
+        for edge in layout.get("edges", []):
+            key = (edge.get("from"), edge.get("to"), edge.get("label")) if isinstance(edge, dict) else None
+            if key and key not in seen_edges:
+                seen_edges.add(key)
+                stitched["edges"].append(edge)
+        for inter in layout.get("microservice_interactions", []):
+            key = (inter.get("caller"), inter.get("callee"), inter.get("protocol")) if isinstance(inter, dict) else None
+            if key and key not in seen_interactions:
+                seen_interactions.add(key)
+                stitched["microservice_interactions"].append(inter)
+    return stitched
+
+
+def enrich_edge_labels(layout_json: dict, input_json: dict) -> dict:
+    """
+    Ask the model only for better edge labels; node positions and edges stay local.
+    Edges go in batches that fit the context window, each with the interactions
+    between its endpoints.
+    """
+    # DB edges are structural; only interaction labels are up for revision
+    edges = [{"from": e["from"], "to": e["to"], "label": e["label"]}
+             for e in layout_json.get("edges", []) if e["label"] != "DB Query"]
+    if not edges:
+        return layout_json
+    allowed = set(layout_engine.EDGE_LABELS.values())
+    labels = {}
+    for batch, prompt in prompt_budget_utility.plan_edge_batches(
+            edges, input_json.get("events", []), ai_layout_prompt.get_edge_label_prompt,
+            prompt_budget_utility.EDGE_LABEL_COMPLETION_TOKENS):
+        response = ai_repsonse_utility.ai_response(prompt, "You are a helpful assistant that outputs JSON only.")
+        suggested = json_file_handler.fix_ai_json(response.choices[0].message.content.strip())
+        if not isinstance(suggested, dict):
+            print(f"⚠️ Edge label suggestions unreadable, keeping local labels for {len(batch)} edges")
+            continue
+        labels.update(
+            ((e.get("from"), e.get("to")), e.get("label"))
+            for e in suggested.get("edges", [])
+            if isinstance(e, dict) and e.get("label") in allowed
+        )
+    for edge in layout_json.get("edges", []):
+        if edge["label"] != "DB Query":
+            edge["label"] = labels.get((edge["from"], edge["to"]), edge["label"])
+    return layout_json
 
 
-def render_layout_to_png(layout_json: dict, output_file="c4_ai_layout"):
+def build_layout(input_json, layout_mode: str = LAYOUT_MODE) -> dict:
     """
-    Renders the AI-generated layout JSON to a professional HLD diagram (PNG) using Graphviz.
-    Surrounds all microservices with a dotted-line cluster.
+    Produce the nodes/edges/microservice_interactions layout for `layout_mode` from an
+    architecture JSON or ArchitectureModel; dangling references are fixed first.
     """
-    dot = graphviz.Digraph(format='png')
-    dot.attr(rankdir='TB', splines='ortho', fontname='Helvetica')
-
-    # ----------------------
-    # Step 1: Identify Microservices
-    # ----------------------
-    microservices = [node for node in layout_json.get("nodes", []) if node.get("type", "").lower() == "service"]
-    other_nodes = [node for node in layout_json.get("nodes", []) if node.get("type", "").lower() != "service"]
-
-    # ----------------------
-    # Step 2: Render Non-Microservice Nodes
-    # ----------------------
-    for node in other_nodes:
-        node_name = node.get("name", "").strip()
-        node_type = node.get("type", "").lower()
-        if not node_name or node_name.lower() == "null":
-            continue
+    model = architecture_model.build_model(input_json)
+    if layout_mode == "ai":
+        print("✅ Generating AI layout plan...")
+        layout_json = generate_ai_layout_json(model.to_json())
+        return layout_engine.drop_dangling_edges(layout_json) if isinstance(layout_json, dict) else layout_json
 
-        # Professional color & shape mapping
-        shape = "ellipse" if node_type == "actor" else "box"
-        style = "filled"
-        fillcolor = node.get("color", "white")
-
-        if node_type == "db":
-            shape = "cylinder"
-        elif node_type == "external":
-            style = "dashed,filled"
-
-        dot.node(
-            node_name,
-            shape=shape,
-            style=style,
-            fillcolor=fillcolor,
-            fontsize="12",
-            fontcolor="black",
-            width="1.2",
-            height="0.8",
-            pos=f'{node.get("x", 0)},{node.get("y", 0)}!'
-        )
+    print("✅ Building local layout...")
+    layout_json = layout_engine.build_local_layout(model)
+    if layout_mode == "local+labels":
+        layout_json = enrich_edge_labels(layout_json, model.to_json())
+    return layout_json
 
-    # ----------------------
-    # Step 3: Render Microservices in a Cluster
-    # ----------------------
-    if microservices:
-        with dot.subgraph(name="cluster_microservices") as c:
-            c.attr(label="Microservices Layer", color="gray", style="dotted", fontsize="14", fontname="Helvetica-Bold")
-            for node in microservices:
-                node_name = node.get("name", "").strip()
-                if not node_name:
-                    continue
-                c.node(
-                    node_name,
-                    shape="box3d",
-                    style="filled",
-                    fillcolor=node.get("color", "lightblue"),
-                    fontsize="12",
-                    fontcolor="black",
-                    width="1.2",
-                    height="0.8",
-                    pos=f'{node.get("x", 0)},{node.get("y", 0)}!'
-                )
-
-    # ----------------------
-    # Step 4: Render Edges
-    # ----------------------
-    for edge in layout_json.get("edges", []):
-        src = edge.get("from")
-        dst = edge.get("to")
-        label = edge.get("label", "").strip()
 
-        if not src or not dst:
-            continue
+def generate_architecture_png(input_json, output_file="c4_ai_diagram", layout_mode: str = LAYOUT_MODE):
+    cleaned_layout_json = build_layout(input_json, layout_mode)
+    print("✅ Rendering PNG...")
+    output_path = render_layout_to_png(cleaned_layout_json, output_file)
+    print(f"✅ C4 Container Diagram generated: {output_path}")
+    return output_path
 
-        # Determine color/style based on label
-        edge_color = "black"
-        edge_style = "solid"
-        if "db" in label.lower():
-            edge_color = "brown"; edge_style = "dashed"
-        elif "rest" in label.lower() or "api" in label.lower():
-            edge_color = "black"
-        elif "queue" in label.lower() or "event" in label.lower():
-            edge_color = "black"; edge_style = "dashed"
-        elif "grpc" in label.lower():
-            edge_color = "cyan"
-
-        dot.edge(
-            src,
-            dst,
-            xlabel=label,
-            color=edge_color,
-            fontcolor=edge_color,
-            fontsize="10",
-            style=edge_style,
-            arrowsize="0.7"
-        )
 
-    # ----------------------
-    # Step 5: Render PNG
-    # ----------------------
-    output_path = dot.render(output_file, cleanup=True)
+def render_layout_to_png(layout_json: dict, output_file="c4_ai_layout"):
+    """
+    Renders the AI-generated layout JSON to a professional HLD diagram (PNG) using Graphviz.
+    Surrounds all microservices with a dotted-line cluster. Large architectures are split
+    into per-partition PNG/SVG diagrams plus an overview, whose PNG is returned.
+    """
+    output_path = diagram_render_handler.render_layout(layout_json, output_file)
     print(f"✅ Professional HLD PNG generated with microservices cluster: {output_path}")
     return output_path
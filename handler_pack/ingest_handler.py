@@ -0,0 +1,276 @@
+import mmap
+import os
+import re
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+TEXT_EXTENSIONS = (".txt", ".text")
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+PDF_EXTENSIONS = (".pdf",)
+DOCX_EXTENSIONS = (".docx",)
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS + MARKDOWN_EXTENSIONS + PDF_EXTENSIONS + DOCX_EXTENSIONS
+
+# Plain text at least this large is read through a memory map; None reads every file buffered.
+# Off by default: CPython's buffered line iteration measured ~2.5x faster (bench_ingest)
+MMAP_MIN_BYTES = None
+MMAP_BLOCK_BYTES = 2 ** 20  # decoded per step, cut at the last newline
+PDF_EXTRACTION_MODE = "layout"  # keeps table columns apart; "plain" is pypdf's default reading order
+TABLE_MIN_COLUMNS = 2
+
+# Every BRD is turned into the Markdown-ish lines chunk_handler understands:
+# "#" headings, "- " / "1. " list items, "| a | b |" tables, blank lines between blocks
+COLUMN_CELL = re.compile(r"\S+(?: {1,2}\S+)*")  # text runs; 3+ spaces separate PDF table columns
+NUMBERED_HEADING = re.compile(r"^\d+(\.\d+)*\.?\s+[A-Z][^.:;]{0,80}$")
+PAGE_NUMBER = re.compile(r"^(page\s+)?\d+(\s+of\s+\d+)?$", re.IGNORECASE)
+SETEXT_UNDERLINE = re.compile(r"^(=+|-+)\s*$")
+HEADING_STYLE = re.compile(r"^(Heading|Title)\s*(\d*)$", re.IGNORECASE)
+
+
+# ---------------------
+# PLAIN TEXT / MARKDOWN
+# ---------------------
+
+def iter_text_lines(file_path: str, mmap_min_bytes: int = MMAP_MIN_BYTES):
+    """
+    Stream a UTF-8 text file line by line. Files of `mmap_min_bytes` or more are
+    memory-mapped and decoded a block at a time instead of read through a file buffer.
+    """
+    if mmap_min_bytes is None or os.path.getsize(file_path) < max(mmap_min_bytes, 1):  # mmap cannot map an empty file
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield from f
+        return
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise"):  # read-ahead for a front-to-back scan (POSIX only)
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        size = len(mapped)
+        pos = 0
+        while pos < size:
+            end = size
+            if pos + MMAP_BLOCK_BYTES < size:
+                # Cut after a newline: it never falls inside a multi-byte UTF-8 character
+                end = mapped.rfind(b"\n", pos, pos + MMAP_BLOCK_BYTES) + 1 or mapped.find(b"\n", pos) + 1 or size
+            yield from mapped[pos:end].decode("utf-8").splitlines()
+            pos = end
+
+
+def iter_markdown_lines(file_path: str):
+    """
+    Markdown BRD lines; setext headings ("Title" over "=====") become "#" headings.
+    """
+    previous = None
+    for line in iter_text_lines(file_path):
+        line = line.rstrip("\r\n")
+        if previous is not None and previous.strip() and SETEXT_UNDERLINE.match(line):
+            yield ("# " if line.lstrip().startswith("=") else "## ") + previous.strip()
+            previous = None
+            continue
+        if previous is not None:
+            yield previous
+        previous = line
+    if previous is not None:
+        yield previous
+
+
+# ---------------------
+# PDF
+# ---------------------
+
+def _table_lines(rows: list) -> list:
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    return ([""] + ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * width]
+            + ["| " + " | ".join(row) + " |" for row in rows[1:]] + [""])
+
+
+def _wrapped_columns(cells: list, starts: list):
+    """
+    Column of each text run if the line only continues cells of the row above (every
+    run starts at a column and ends before the next one); None otherwise.
+    """
+    columns = []
+    for start, cell in cells:
+        column = next((i for i in range(len(starts) - 1, -1, -1) if starts[i] <= start + 2), None)
+        if column is None or (column + 1 < len(starts) and start + len(cell) > starts[column + 1]):
+            return None
+        columns.append(column)
+    return columns
+
+
+def _plain_line(stripped: str, outlined: bool):
+    if not outlined and NUMBERED_HEADING.match(stripped):
+        return ["", "## " + " ".join(stripped.split()), ""]
+    return [stripped]
+
+
+def pdf_page_lines(text: str, headings: list = ()):
+    """
+    Chunker lines for one page of extracted PDF text. Outline `headings` (level, title)
+    open the page; without an outline, numbered lines ("2.1 Payments") become headings.
+    Two or more column-aligned rows become a Markdown table, with the lines of a wrapped
+    cell appended to the cell above. Bare page numbers are dropped.
+    """
+    titles = set()
+    for level, title in headings:
+        titles.add(title)
+        yield from ("", "#" * min(level + 1, 6) + " " + title, "")
+
+    rows, raw, starts = [], [], []
+
+    def flush():
+        lines = _table_lines(rows) if len(rows) > 1 else [
+            part for line in raw for part in _plain_line(line.strip(), bool(headings))]
+        rows.clear()
+        raw.clear()
+        return lines
+
+    for line in text.splitlines():
+        cells = [(match.start(), match.group()) for match in COLUMN_CELL.finditer(line)]
+        if rows and cells and len(cells) < len(starts):
+            columns = _wrapped_columns(cells, starts)
+            if columns is not None:
+                for column, (_, cell) in zip(columns, cells):
+                    rows[-1][column] = f"{rows[-1][column]} {cell}"
+                raw.append(line)
+                continue
+        if len(cells) >= TABLE_MIN_COLUMNS:
+            if rows and len(cells) != len(starts):
+                yield from flush()
+            if not rows:
+                starts = [start for start, _ in cells]
+            rows.append([cell for _, cell in cells])
+            raw.append(line)
+            continue
+        if rows:
+            yield from flush()
+
+        stripped = line.strip()
+        if not stripped:
+            yield ""
+        elif stripped not in titles and not PAGE_NUMBER.match(stripped):
+            yield from _plain_line(stripped, bool(headings))
+    if rows:
+        yield from flush()
+    yield ""
+
+
+def _pdf_outline(reader) -> dict:
+    """
+    Page index -> [(level, title)] from the PDF's bookmarks.
+    """
+    headings = {}
+
+    def walk(entries, level):
+        for entry in entries:
+            if isinstance(entry, list):
+                walk(entry, level + 1)
+                continue
+            try:
+                page = reader.get_destination_page_number(entry)
+            except Exception:  # broken or external destination
+                continue
+            if page is not None and entry.title:
+                headings.setdefault(page, []).append((level, " ".join(str(entry.title).split())))
+
+    try:
+        walk(reader.outline, 0)
+    except Exception:  # a damaged outline should not stop the text
+        return {}
+    return headings
+
+
+def iter_pdf_lines(file_path: str, extraction_mode: str = PDF_EXTRACTION_MODE):
+    """
+    Stream a PDF page by page: pypdf reads objects from the open file on demand, and only
+    the current page's text is held at a time.
+    """
+    from pypdf import PdfReader  # only PDF ingestion needs it
+
+    with open(file_path, "rb") as f:
+        reader = PdfReader(f)
+        outline = _pdf_outline(reader)
+        for number, page in enumerate(reader.pages):
+            text = page.extract_text(extraction_mode=extraction_mode) or ""
+            yield from pdf_page_lines(text, outline.get(number, ()))
+
+
+# ---------------------
+# DOCX
+# ---------------------
+
+def _docx_paragraph_line(paragraph, style_names: dict) -> str:
+    text = " ".join(paragraph.text.split())
+    if not text:
+        return ""
+    # paragraph.style resolves the style part on every access; look the id up once
+    style = style_names.get(paragraph._p.style, "")
+    heading = HEADING_STYLE.match(style)
+    if heading:
+        level = int(heading.group(2) or 0) if heading.group(1).lower() == "heading" else 0
+        return "#" * min(max(level, 1), 6) + " " + text
+    if style.startswith("List Number"):
+        return "1. " + text
+    if style.startswith("List"):
+        return "- " + text
+    return text
+
+
+def _docx_table_lines(table) -> list:
+    rows = []
+    for row in table.rows:
+        cells = []
+        previous = None
+        for cell in row.cells:
+            if cell._tc is previous:  # a merged cell repeats across the columns it spans
+                continue
+            previous = cell._tc
+            cells.append(" ".join(cell.text.split()).replace("|", "\\|"))
+        rows.append(cells)
+    return _table_lines(rows) if rows else []
+
+
+def iter_docx_lines(file_path: str):
+    """
+    Walk a DOCX body in document order, one paragraph or table at a time: heading styles
+    become "#" headings, list styles list items, tables Markdown tables.
+    """
+    from docx import Document  # only DOCX ingestion needs it
+
+    doc = Document(file_path)
+    style_names = {style.style_id: style.name for style in doc.styles}
+    in_list = False
+    for block in doc.iter_inner_content():
+        if hasattr(block, "rows"):
+            yield from _docx_table_lines(block)
+            in_list = False
+            continue
+        line = _docx_paragraph_line(block, style_names)
+        if not line:
+            continue
+        is_item = line.startswith(("- ", "1. "))
+        if not (is_item and in_list):  # consecutive list items stay one block
+            yield ""
+        yield line
+        in_list = is_item
+    yield ""
+
+
+# ---------------------
+# DISPATCH
+# ---------------------
+
+def iter_document_lines(file_path: str):
+    """
+    Chunker-ready lines of a BRD in any supported format, chosen by file extension
+    (anything unknown is read as UTF-8 text).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in PDF_EXTENSIONS:
+        return iter_pdf_lines(file_path)
+    if extension in DOCX_EXTENSIONS:
+        return iter_docx_lines(file_path)
+    if extension in MARKDOWN_EXTENSIONS:
+        return iter_markdown_lines(file_path)
+    return iter_text_lines(file_path)
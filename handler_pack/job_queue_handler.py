@@ -0,0 +1,179 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+QUEUE_FILE = "jobs.sqlite3"
+MAX_JOB_ATTEMPTS = 3  # a job interrupted this many times (service stopped mid-run) is failed, not retried
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class JobQueue:
+    """
+    Persistent FIFO of pipeline jobs in SQLite, shared by the service's HTTP threads and
+    its worker processes. One connection per thread and WAL mode, as in response_cache;
+    claim() takes a job inside BEGIN IMMEDIATE, so every job runs on exactly one worker.
+    """
+
+    def __init__(self, db_file: str = QUEUE_FILE):
+        self.db_file = db_file
+        self._local = threading.local()
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                brd_file TEXT NOT NULL,
+                output_dir TEXT NOT NULL,
+                status TEXT NOT NULL,
+                stages TEXT NOT NULL DEFAULT '{}',
+                artifacts TEXT NOT NULL DEFAULT '{}',
+                error TEXT,
+                worker TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                started REAL,
+                finished REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, seq)")
+        self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _job(row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job["stages"] = json.loads(job["stages"])
+        job["artifacts"] = json.loads(job["artifacts"])
+        del job["seq"]
+        return job
+
+    def _update_json(self, job_id: str, column: str, changes: dict):
+        """
+        Merge `changes` into a JSON column. Stages of one job finish on different threads,
+        so the read-modify-write runs under the write lock.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(f"SELECT {column} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                value.update(changes)
+                conn.execute(f"UPDATE jobs SET {column} = ? WHERE id = ?", (json.dumps(value), job_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---------------- Producers ----------------
+
+    def submit(self, job_id: str, name: str, brd_file: str, output_dir: str) -> dict:
+        self._connection().execute(
+            "INSERT INTO jobs (id, name, brd_file, output_dir, status, created) VALUES (?, ?, ?, ?, 'queued', ?)",
+            (job_id, name, brd_file, output_dir, time.time())
+        )
+        return self.get(job_id)
+
+    def requeue_interrupted(self, max_attempts: int = MAX_JOB_ATTEMPTS) -> int:
+        """
+        Put jobs left running by a stopped service back in the queue (they resume from their
+        checkpoint journals); ones interrupted `max_attempts` times are failed instead.
+        Only call this while no worker is running. Returns the number requeued.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, error = 'interrupted ' || attempts || ' times' "
+                "WHERE status = 'running' AND attempts >= ?", (time.time(), max_attempts)
+            )
+            requeued = conn.execute("UPDATE jobs SET status = 'queued', worker = NULL "
+                                    "WHERE status = 'running'").rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return requeued
+
+    # ---------------- Workers ----------------
+
+    def claim(self, worker: str) -> dict:
+        """
+        Oldest queued job, marked running on `worker`; None if the queue is empty.
+        """
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+            return None  # idle polls stay off the write lock
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY seq LIMIT 1").fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started = ?, attempts = attempts + 1 "
+                    "WHERE id = ?", (worker, time.time(), row["id"])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"]) if row is not None else None
+
+    def update_stage(self, job_id: str, stage: str, status: str, seconds: float = None, **detail):
+        entry = {"status": status, **detail}
+        if seconds is not None:
+            entry["seconds"] = round(seconds, 3)
+        self._update_json(job_id, "stages", {stage: entry})
+
+    def add_artifacts(self, job_id: str, artifacts: dict):
+        self._update_json(job_id, "artifacts", artifacts)
+
+    def finish(self, job_id: str, error: str = None):
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ?",
+            ("failed" if error else "done", error, time.time(), job_id)
+        )
+
+    # ---------------- Queries ----------------
+
+    def get(self, job_id: str) -> dict:
+        return self._job(self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list_jobs(self, status: str = None, limit: int = 100) -> list:
+        """
+        Most recent jobs first.
+        """
+        if status:
+            rows = self._connection().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY seq DESC LIMIT ?", (status, limit))
+        else:
+            rows = self._connection().execute("SELECT * FROM jobs ORDER BY seq DESC LIMIT ?", (limit,))
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> dict:
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return counts
@@ -1,139 +1,661 @@
+import hashlib
 import json
+import os
 import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from ai_prompts import extract_architecture_ai_prompt
-from ai_uitls.ai_repsonse_utility import ai_response
+from ai_uitls import llm_client, metrics_utility, response_cache
+from ai_uitls.ai_repsonse_utility import ai_response, ai_response_stream, MODEL_NAME
+from ai_uitls.token_utility import estimate_tokens
+from handler_pack import architecture_model, chunk_handler, dedup_handler, json_stream_handler
+from handler_pack.merge_handler import PartialArchitecture, iter_data_elements
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+MAX_CONCURRENT_REQUESTS = 4  # extraction calls in flight at once (1 = sequential)
+STREAM_EXTRACTION = True  # merge actors/services/events as the model streams them
+DEDUP_NEAR_DUPLICATES = True  # near-identical chunks reuse the earlier chunk's extraction (see dedup_handler)
+EXPECTED_COMPLETION_TOKENS = 1024
+MERGED_ARCHITECTURE_FILE = "merged_architecture.json"
+EXTRACTION_MANIFEST_FILE = "merged_architecture.manifest.json"  # per-chunk extractions for incremental runs
+CHECKPOINT_JOURNAL_FILE = "merged_architecture.journal.jsonl"  # one line per finished chunk, for --resume
+MAX_CHUNK_ATTEMPTS = 3  # attempts per chunk before it is recorded as failed
+CHUNK_RETRY_RATIO = 0.25  # retries allowed for the whole run, as a share of the chunks sent
+MIN_CHUNK_RETRIES = 3
+CHUNK_RETRY_DELAY_SECONDS = 1.0
+ADAPTIVE_CHUNK_SIZE = True  # re-split chunks whose reply is cut off or unparseable (see ChunkSizeController)
+MIN_CHUNK_TOKENS = 300  # adaptive re-splits stop here
+CHUNK_SHRINK_RATIO = 0.5
+CHUNK_GROW_RATIO = 1.25
+GROW_AFTER_REPLIES = 4  # consecutive small, fast replies before the chunk size grows
+SMALL_REPLY_RATIO = 0.5  # replies under this share of EXPECTED_COMPLETION_TOKENS count as small
+UNPARSEABLE = "unparseable response"
+EXTRACTION_SYSTEM_ROLE = "You are a helpful assistant that outputs JSON only."
+
+
+JSON_TOKEN = re.compile(r"""
+    (?P<ws>\s*)
+    (?:
+        (?P<dq>"[^"\\]*(?:\\.[^"\\]*)*(?P<dq_end>"|\\?\Z))
+      | (?P<sq>'[^'\\]*(?:\\.[^'\\]*)*(?P<sq_end>'|\\?\Z))
+      | (?P<punct>[{}\[\],:])
+      | (?P<lit>[^\s{}\[\],:"']+)
+    )
+""", re.VERBOSE)
+JSON_START = re.compile(r"[{\[]")
+JSON_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?\Z")
+JSON_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+CONTROL_CHARS = re.compile(r"[\x00-\x1f]")
+UNESCAPED_DOUBLE_QUOTE = re.compile(r'(?<!\\)"')
+CLOSERS = {"{": "}", "[": "]"}
+JSON_DECODER = json.JSONDecoder()
+
+# Container states while walking: object "key" -> "colon" -> "value" -> "next", array "value" -> "next"
+KEY, COLON, VALUE, NEXT = "key", "colon", "value", "next"
+
+
+def _escape_control(match):
+    return json.dumps(match.group(0))[1:-1]
+
+
+def _prepare_slot(stack: list, out: list) -> str:
+    """
+    Insert a missing ',' or ':' before the next key/value; return which one it is.
+    """
+    frame = stack[-1]
+    state = frame[1]
+    if state == NEXT:
+        out.append(",")
+        state = KEY if frame[0] == "}" else VALUE
+    elif state == COLON:
+        out.append(":")
+        state = VALUE
+    frame[1] = state
+    return state
+
+
+def _close_frame(stack: list, out: list):
+    """
+    Close the innermost container, completing a dangling key or value with null.
+    """
+    closer, state = stack.pop()
+    if state == COLON:
+        out.append(":null")
+    elif state == VALUE and closer == "}":
+        out.append("null")
+    out.append(closer)
+    if stack:
+        stack[-1][1] = NEXT
+
+
+def repair_json_text(raw_output: str):
+    """
+    Repair model output into JSON text in one tokenizer walk with a bracket stack.
+    Strips prose around the first JSON container, drops trailing/duplicate commas,
+    inserts missing commas and colons, converts single-quoted strings and Python
+    literals, escapes raw control characters, and closes truncated strings and
+    containers in nesting order. Returns None when no '{' or '[' is present.
+    """
+    start = JSON_START.search(raw_output)
+    if not start:
+        return None
+
+    out = []
+    stack = []
+    whitespace = ""  # held back so inserted separators land right after the previous token
+    for match in JSON_TOKEN.finditer(raw_output, start.start()):
+        kind = match.lastgroup
+        if kind == "dq_end" or kind == "sq_end":
+            kind = "dq" if match.group("dq") is not None else "sq"
+        whitespace += match.group("ws")
+        text = match.group(kind)
+
+        if kind == "punct":
+            if text in CLOSERS:
+                if stack and _prepare_slot(stack, out) == KEY:
+                    out.append('"":')
+                    stack[-1][1] = VALUE
+                out.append(whitespace)
+                out.append(text)
+                stack.append([CLOSERS[text], KEY if text == "{" else VALUE])
+            elif text == ":":
+                if stack[-1][1] == COLON:
+                    out.append(":")
+                    stack[-1][1] = VALUE
+                out.append(whitespace)
+            elif text != ",":
+                # Any closer ends the innermost container, so a mismatched '}' / ']' still nests correctly
+                out.append(whitespace)
+                _close_frame(stack, out)
+                if not stack:
+                    break
+            whitespace = "" if text != "," else whitespace
+            continue
+
+        # Strings and bare literals
+        if kind == "dq":
+            if match.group("dq_end") != '"':
+                text = text.rstrip("\\") + '"'
+            if CONTROL_CHARS.search(text):
+                text = CONTROL_CHARS.sub(_escape_control, text)
+        elif kind == "sq":
+            body = text[1:-1] if match.group("sq_end") == "'" else text[1:].rstrip("\\")
+            body = UNESCAPED_DOUBLE_QUOTE.sub('\\"', body.replace("\\'", "'"))
+            text = '"' + CONTROL_CHARS.sub(_escape_control, body) + '"'
+        role = _prepare_slot(stack, out)
+        if kind == "lit":
+            if role == VALUE and (text in JSON_LITERALS or JSON_NUMBER.match(text)):
+                text = JSON_LITERALS.get(text, text)
+            else:
+                text = json.dumps(text)
+        out.append(whitespace)
+        out.append(text)
+        whitespace = ""
+        stack[-1][1] = COLON if role == KEY else NEXT
+
+    while stack:
+        _close_frame(stack, out)
+    return "".join(out)
 
 
 def fix_ai_json(raw_output: str):
     """
     Cleans and repairs AI JSON output to handle:
-    1. Missing {} or []
-    2. Missing last closing bracket/brace
+    1. Prose or markdown fences before/after the JSON
+    2. Truncated strings and missing closing brackets/braces (closed in nesting order)
     3. Single → double quote conversion (safe)
     4. Trailing commas
     """
     if not raw_output:
         return None
 
-    # 1️⃣ Extract first JSON block: { ... } or [ ... ]
-    match = re.search(r'(\{.*|\[.*)', raw_output, re.DOTALL)
-    json_str = match.group(0).strip() if match else raw_output.strip()
-
-    # 2️⃣ Remove trailing commas before } or ]
-    json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-
-    # 3️⃣ Safely convert Python-like dict to JSON
-    # Convert only keys/values in single quotes to double quotes without touching already double-quoted strings
-    def safe_quote_replace(match):
-        return '"' + match.group(1) + '"'
-
-    # Replace single-quoted keys
-    json_str = re.sub(r"(?<!\")'([A-Za-z0-9_ ]+)'(?=\s*:)", safe_quote_replace, json_str)
-    # Replace single-quoted string values
-    json_str = re.sub(r":\s*'([^']*)'", lambda m: ':"{}"'.format(m.group(1)), json_str)
-
-    # 4️⃣ Auto-complete missing closing braces/brackets
-    open_curly = json_str.count("{")
-    close_curly = json_str.count("}")
-    if close_curly < open_curly:
-        json_str += "}" * (open_curly - close_curly)
+    # Fast path: valid JSON surrounded by prose parses in C without any repair
+    start = JSON_START.search(raw_output)
+    if start:
+        try:
+            data = JSON_DECODER.raw_decode(raw_output, start.start())[0]
+            metrics_utility.increment("json.parsed")
+            return data
+        except json.JSONDecodeError:
+            pass
 
-    open_square = json_str.count("[")
-    close_square = json_str.count("]")
-    if close_square < open_square:
-        json_str += "]" * (open_square - close_square)
+    json_str = repair_json_text(raw_output)
+    if json_str is None:
+        json_str = raw_output.strip()
 
-    # 5️⃣ Attempt JSON parsing
     try:
-        return json.loads(json_str)
+        data = json.loads(json_str)
+        metrics_utility.increment("json.repaired")
+        return data
     except json.JSONDecodeError:
+        metrics_utility.increment("json.failed")
         return None
 
 
 def extract_architecture_from_chunk(chunk_text):
     prompt = extract_architecture_ai_prompt.extract_architecture_prompt(chunk_text)
 
-    response = ai_response(prompt, "You are a helpful assistant that outputs JSON only.")
+    response = ai_response(prompt, EXTRACTION_SYSTEM_ROLE)
 
     raw_output = response.choices[0].message.content.strip()
     data_parsed = fix_ai_json(raw_output)
     if not data_parsed:
         print("⚠️ JSON parse error, skipping chunk...")
-    return data_parsed
-
-def create_json_file_from_brd(chunks):
-    global actor, svc, inter, architecture
-    all_actors = {}  # key: actor name, value: actor dict
-    all_services = {}  # key: service name, value: full service dict
-    all_databases = {}  # key: db name, value: db dict
-    all_events = set()  # tuple (from, to, type, description)
-    for idx, chunk in enumerate(chunks):
-        print(f"Processing chunk {idx + 1}/{len(chunks)} ...")
-        data = extract_architecture_from_chunk(chunk)  # AI JSON output
-
-        # ---------------- Actors ----------------
-        for actor in data.get("actors", []):
-            if isinstance(actor, dict):
-                name = actor.get("name", str(actor))
-                actor_type = actor.get("type", "External")
+        metrics_utility.increment("extract.chunks_skipped")
+        # A retry must reach the model, not replay the cached bad reply
+        response_cache.discard(MODEL_NAME, EXTRACTION_SYSTEM_ROLE, prompt)
+    # The model hit its completion limit: whatever parsed is only part of the chunk
+    truncated = getattr(response.choices[0], "finish_reason", None) == "length"
+    return data_parsed, truncated
+
+
+def extract_architecture_streaming(chunk_text, on_element=None):
+    """
+    Stream the extraction and hand every completed actor/service/database/event
+    to `on_element(section, element)` while the model is still generating.
+    A cut-off or failed stream keeps every element completed before the cut.
+    Returns (data, truncated): `truncated` when the reply ended before the JSON did.
+    """
+    prompt = extract_architecture_ai_prompt.extract_architecture_prompt(chunk_text)
+    parser = json_stream_handler.ArchitectureStreamParser()
+    data = {}
+    parts = []
+    try:
+        for delta in ai_response_stream(prompt, EXTRACTION_SYSTEM_ROLE):
+            parts.append(delta)
+            for section, element_text in parser.feed(delta):
+                element = fix_ai_json(element_text)
+                if element is None:
+                    continue
+                data.setdefault(section, []).append(element)
+                if on_element:
+                    on_element(section, element)
+    except Exception as e:
+        if not data:
+            raise
+        print(f"⚠️ Stream failed ({e}), keeping {parser.elements} completed elements")
+        metrics_utility.increment("extract.chunks_partial")
+        return data, False
+
+    truncated = False
+    if not data:
+        # No element streamed: a well-formed reply with empty sections, or not the expected
+        # shape for incremental parsing. Either way, parse the whole reply instead
+        data = fix_ai_json("".join(parts))
+        if data and on_element:
+            for section, element in iter_data_elements(data):
+                on_element(section, element)
+    elif not parser.complete:
+        print(f"⚠️ Response cut off, keeping {parser.elements} completed elements")
+        metrics_utility.increment("extract.chunks_partial")
+        truncated = True
+    if not data:
+        print("⚠️ JSON parse error, skipping chunk...")
+        metrics_utility.increment("extract.chunks_skipped")
+        response_cache.discard(MODEL_NAME, EXTRACTION_SYSTEM_ROLE, prompt)
+    return data if parser.complete else data or None, truncated
+
+
+def extract_chunk(chunk_text, on_element=None):
+    """
+    Extract one chunk. With `on_element` the response is streamed and parsed incrementally.
+    RPM/TPM throttling and 429 retries are llm_client's. Returns (data, truncated).
+    """
+    if on_element is not None:
+        return extract_architecture_streaming(chunk_text, on_element)
+    return extract_architecture_from_chunk(chunk_text)
+
+
+class RetryBudget:
+    """
+    Retries shared by every chunk of a run, so a bad BRD or a failing API cannot retry forever.
+    """
+
+    def __init__(self, retries: int):
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class ChunkSizeController:
+    """
+    Adaptive extraction chunk size shared by the workers of a run. A cut-off or
+    unparseable reply shrinks it and the chunk is re-split at the new size; a run of
+    small, fast replies grows it back, up to `max_tokens` (the size the BRD was chunked
+    at, which the manifest and journal fingerprints depend on). Chunks larger than the
+    current size are split before they are sent.
+    """
+
+    def __init__(self, max_tokens: int, min_tokens: int = MIN_CHUNK_TOKENS):
+        self.min_tokens = min_tokens
+        self.max_tokens = max(max_tokens, min_tokens)
+        self.tokens = self.max_tokens
+        self.latency = llm_client.LatencyTracker()
+        self._streak = 0
+        self._lock = threading.Lock()
+
+    def split(self, text: str) -> list:
+        """
+        `text` in pieces of at most the current size ([text] if it fits).
+        """
+        if estimate_tokens(text) <= self.tokens:
+            return [text]
+        return list(chunk_handler.chunk_text(text, self.tokens, 0))
+
+    def shrink(self, text: str) -> bool:
+        """
+        Record a cut-off or unparseable reply to `text`; False if it is already minimal.
+        """
+        tokens = estimate_tokens(text)
+        if tokens <= self.min_tokens:
+            return False
+        with self._lock:
+            self.tokens = max(self.min_tokens, min(self.tokens, int(tokens * CHUNK_SHRINK_RATIO)))
+            self._streak = 0
+        metrics_utility.increment("extract.chunk_size_shrinks")
+        return True
+
+    def observe(self, data: dict, seconds: float):
+        """
+        Record a complete reply; small ones at or under the median latency grow the size.
+        """
+        median = self.latency.percentile(0.5)
+        self.latency.record(seconds)
+        small = estimate_tokens(json.dumps(data)) < EXPECTED_COMPLETION_TOKENS * SMALL_REPLY_RATIO
+        with self._lock:
+            self._streak = self._streak + 1 if small and median is not None and seconds <= median else 0
+            if self._streak < GROW_AFTER_REPLIES or self.tokens >= self.max_tokens:
+                return
+            self.tokens = min(self.max_tokens, int(self.tokens * CHUNK_GROW_RATIO))
+            self._streak = 0
+        metrics_utility.increment("extract.chunk_size_grows")
+
+
+def combine_extractions(parts: list):
+    """
+    One chunk extraction from the extractions of its pieces (None if there are none).
+    """
+    if len(parts) == 1:
+        return parts[0]
+    combined = {}
+    for part in parts:
+        for section, element in iter_data_elements(part):
+            combined.setdefault(section, []).append(element)
+    return combined or None
+
+
+def extract_chunks(chunks, max_concurrency=MAX_CONCURRENT_REQUESTS, on_element=None, retry_budget: RetryBudget = None,
+                   on_result=None, controller: ChunkSizeController = None):
+    """
+    Yield (idx, extracted data) for every chunk, in chunk order.
+    Up to `max_concurrency` requests are in flight at once; results are still
+    yielded in order so the merge matches a sequential run exactly.
+    `on_element(idx, section, element)` enables streaming extraction.
+    A chunk that errors or comes back unparseable is retried while `retry_budget`
+    allows, then yielded as None instead of aborting the run. `on_result(idx, data, error)`
+    is called from the worker as soon as each chunk is settled. With a `controller`,
+    a chunk whose reply is cut off or unparseable is re-split and its pieces extracted
+    one after another instead; their extractions are combined into the chunk's.
+    """
+    def extract_piece(idx, text, callback, is_piece=False):
+        """
+        (data, truncated, error) for one chunk or piece of it. A piece of a re-split chunk
+        may well hold nothing architectural, so an empty reply to it is not an error.
+        """
+        resplittable = controller is not None and estimate_tokens(text) > controller.min_tokens
+        for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+            start = time.monotonic()
+            try:
+                data, truncated = extract_chunk(text, callback)
+                error = None if data else UNPARSEABLE
+            except Exception as e:
+                data, truncated, error = None, False, f"{type(e).__name__}: {e}"
+            if controller is not None and data is not None and not truncated:
+                controller.observe(data, time.monotonic() - start)
+            if is_piece and data is not None and not data:
+                return None, False, None
+            # A failed attempt merged nothing (partial streams count as success), so retrying is safe
+            if (data or (error == UNPARSEABLE and resplittable) or attempt == MAX_CHUNK_ATTEMPTS
+                    or retry_budget is None or not retry_budget.take()):
+                break
+            print(f"⚠️ Chunk {idx + 1} failed ({error}), retrying ({attempt}/{MAX_CHUNK_ATTEMPTS - 1})...")
+            metrics_utility.increment("extract.chunk_retries")
+            time.sleep(CHUNK_RETRY_DELAY_SECONDS * attempt)
+        return data, truncated, error
+
+    def extract(idx):
+        callback = None
+        if on_element is not None:
+            callback = lambda section, element: on_element(idx, section, element)
+        pieces = deque(controller.split(chunks[idx]) if controller is not None else [chunks[idx]])
+        is_piece = len(pieces) > 1
+        if is_piece:
+            metrics_utility.increment("extract.chunks_presplit")
+        parts = []
+        error = None
+        while pieces:
+            text = pieces.popleft()
+            data, truncated, piece_error = extract_piece(idx, text, callback, is_piece)
+            if (truncated or piece_error == UNPARSEABLE) and controller is not None and controller.shrink(text):
+                smaller = controller.split(text)
+                if len(smaller) > 1:
+                    print(f"⚠️ Chunk {idx + 1}: reply {'cut off' if truncated else 'unparseable'}, "
+                          f"re-splitting into {len(smaller)} pieces of ≤{controller.tokens} tokens")
+                    metrics_utility.increment("extract.chunks_resplit")
+                    if data:
+                        parts.append(data)  # elements completed before the cut
+                    pieces.extendleft(reversed(smaller))
+                    is_piece = True
+                    continue
+            if data:
+                parts.append(data)
             else:
-                name = str(actor)
-                actor_type = "External"
-            all_actors[name] = {"name": name, "type": actor_type}
-
-        # ---------------- Microservices ----------------
-        for svc in data.get("microservices", data.get("services", [])):
-            name = svc.get("name")
-            if not name:
+                error = error or piece_error
+        data = combine_extractions(parts)
+        if error and not data:
+            print(f"❌ Chunk {idx + 1} failed: {error}")
+        elif error:
+            print(f"⚠️ Chunk {idx + 1}: some pieces failed ({error}), keeping the rest")
+        if on_result is not None:
+            on_result(idx, data, error)
+        return data
+
+    if max_concurrency <= 1:
+        for idx in range(len(chunks)):
+            print(f"Processing chunk {idx + 1}/{len(chunks)} ...")
+            yield idx, extract(idx)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        for idx, data in enumerate(executor.map(extract, range(len(chunks)))):
+            print(f"Processed chunk {idx + 1}/{len(chunks)} ...")
+            yield idx, data
+
+
+class ChunkMerger:
+    """
+    Merges chunk extractions, whole or element by element as the model streams them,
+    into an indexed PartialArchitecture. Every element is ranked by (chunk idx, position),
+    so chunks can finish in any order and the output still matches a sequential run.
+    """
+
+    def __init__(self):
+        self.partial = PartialArchitecture()
+        self._positions = {}  # chunk idx -> elements seen so far
+        self._lock = threading.Lock()
+
+    def add_element(self, idx: int, section: str, element):
+        with self._lock:
+            position = self._positions.get(idx, 0)
+            self._positions[idx] = position + 1
+            self.partial.add_element((idx, position), section, element)
+
+    def finish_chunk(self, idx: int):
+        with self._lock:
+            self._positions.pop(idx, None)
+
+    def add_chunk(self, idx: int, data: dict):
+        """
+        Merge a whole (non-streamed or reused) chunk extraction.
+        """
+        for section, element in iter_data_elements(data or {}):
+            self.add_element(idx, section, element)
+        self.finish_chunk(idx)
+
+    def architecture(self) -> dict:
+        with self._lock:
+            return self.partial.architecture()
+
+
+def chunk_fingerprint(chunk_text: str) -> str:
+    """
+    Fingerprint of everything that determines a chunk's extraction: model, prompt template and text.
+    """
+    prompt = extract_architecture_ai_prompt.extract_architecture_prompt(chunk_text)
+    return hashlib.sha256(f"{MODEL_NAME}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def load_extraction_manifest(manifest_file: str = EXTRACTION_MANIFEST_FILE) -> dict:
+    """
+    Previous run's extractions keyed by chunk fingerprint ({} if missing or unreadable).
+    """
+    if not os.path.exists(manifest_file):
+        return {}
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"⚠️ Ignoring unreadable manifest: {manifest_file}")
+        return {}
+    return {entry["fingerprint"]: entry["extraction"] for entry in manifest.get("chunks", [])}
+
+
+def save_extraction_manifest(fingerprints: list, extractions: list, manifest_file: str = EXTRACTION_MANIFEST_FILE):
+    """
+    Record the current chunks' extractions in chunk order. Failed chunks are left
+    out so the next run retries them; chunks no longer in the BRD drop out.
+    """
+    manifest = {
+        "model": MODEL_NAME,
+        "chunks": [
+            {"index": idx, "fingerprint": fingerprint, "extraction": data}
+            for idx, (fingerprint, data) in enumerate(zip(fingerprints, extractions))
+            if data
+        ]
+    }
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_file, manifest_file)
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal: one line per settled chunk, flushed and fsynced
+    before the next one is written, so a crash loses at most the chunks in flight.
+    """
+
+    def __init__(self, journal_file: str = CHECKPOINT_JOURNAL_FILE, append: bool = False):
+        self.journal_file = journal_file
+        self._file = open(journal_file, "a" if append else "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, idx: int, fingerprint: str, data, error: str = None):
+        entry = {"index": idx, "fingerprint": fingerprint, "status": "ok" if data else "failed",
+                 "extraction": data or None, "error": error}
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def load_checkpoint_journal(journal_file: str = CHECKPOINT_JOURNAL_FILE) -> dict:
+    """
+    Extractions of the chunks a previous (possibly crashed) run completed, keyed by
+    fingerprint. Failed entries and a torn last line are ignored.
+    """
+    if not os.path.exists(journal_file):
+        return {}
+    journaled = {}
+    with open(journal_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
                 continue
-            # Merge or create service entry
-            if name not in all_services:
-                all_services[name] = {
-                    "name": name,
-                    "db": svc.get("db"),
-                    "exposes": svc.get("exposes", []),
-                    "consumes": svc.get("consumes", []),
-                    "scaling": svc.get("scaling", "Unknown"),
-                    "criticality": svc.get("criticality", "Medium")
-                }
-
-            # Register DB in all_databases if exists
-            db_name = svc.get("db")
-            if db_name:
-                if db_name not in all_databases:
-                    all_databases[db_name] = {
-                        "name": db_name,
-                        "type": "Unknown",
-                        "used_by": [name]
-                    }
-                else:
-                    if name not in all_databases[db_name]["used_by"]:
-                        all_databases[db_name]["used_by"].append(name)
-
-        # ---------------- Events / Interactions ----------------
-        for inter in data.get("events", data.get("interactions", [])):
-            src = inter.get("from")
-            dst = inter.get("to")
-            typ = inter.get("type", "Unknown")
-            desc = inter.get("description", "")
-            if src and dst:
-                tup = (src, dst, typ, desc)
-                all_events.add(tup)
-    print("✅ Architecture extracted from all chunks!")
+            if entry.get("status") == "ok" and entry.get("extraction"):
+                journaled[entry["fingerprint"]] = entry["extraction"]
+    return journaled
+
+
+def create_json_file_from_brd(chunks, max_concurrency=MAX_CONCURRENT_REQUESTS, incremental=True,
+                              streaming=STREAM_EXTRACTION, output_dir=".", resume=False, dedup=DEDUP_NEAR_DUPLICATES,
+                              adaptive=ADAPTIVE_CHUNK_SIZE):
+    """
+    Extract and merge the architecture of every chunk. With `incremental`, chunks
+    whose fingerprint is in the saved manifest reuse their stored extraction and
+    only new or changed chunks are sent to the model. With `streaming`, elements
+    are merged as the model generates them. Output files go to `output_dir`.
+    Every settled chunk is journaled as it finishes; with `resume`, chunks the
+    journal recorded as done are reused and only missing or failed ones are sent.
+    With `dedup`, a chunk that near-duplicates an earlier one reuses its extraction.
+    With `adaptive`, chunks whose reply is cut off or unparseable are re-split (see ChunkSizeController).
+    """
+    global architecture
+    merged_file = os.path.join(output_dir, MERGED_ARCHITECTURE_FILE)
+    manifest_file = os.path.join(output_dir, EXTRACTION_MANIFEST_FILE)
+    journal_file = os.path.join(output_dir, CHECKPOINT_JOURNAL_FILE)
+    fingerprints = [chunk_fingerprint(chunk) for chunk in chunks]
+    previous = load_extraction_manifest(manifest_file) if incremental else {}
+    if resume:
+        journaled = load_checkpoint_journal(journal_file)
+        previous.update(journaled)
+        print(f"✅ Resuming: {len(journaled)} completed chunks found in {journal_file}")
+    extractions = [previous.get(fingerprint) for fingerprint in fingerprints]
+    pending = [idx for idx, data in enumerate(extractions) if not data]
+    reused = len(chunks) - len(pending)
+    duplicates = {}  # chunk idx -> earlier chunk whose extraction it reuses
+    if dedup and pending:
+        duplicate_of = dedup_handler.find_near_duplicates(chunks)
+        duplicates = {idx: duplicate_of[idx] for idx in pending if idx in duplicate_of}
+        pending = [idx for idx in pending if idx not in duplicates]
+    print(f"✅ Reusing {reused} unchanged chunks, extracting {len(pending)}")
+    if duplicates:
+        print(f"✅ {len(duplicates)} near-duplicate chunks reuse an earlier extraction "
+              f"({len(duplicates)} LLM calls saved)")
+    metrics_utility.increment("extract.chunks_total", len(chunks))
+    metrics_utility.increment("extract.chunks_reused", reused)
+    metrics_utility.increment("extract.llm_calls_saved", len(duplicates))
+
+    merger = ChunkMerger()
+    for idx, data in enumerate(extractions):
+        if data:
+            merger.add_chunk(idx, data)
+    duplicates_by_original = {}
+    for idx, original in duplicates.items():
+        if extractions[original]:
+            extractions[idx] = extractions[original]
+            merger.add_chunk(idx, extractions[idx])
+        else:
+            duplicates_by_original.setdefault(original, []).append(idx)
+
+    on_element = None
+    if streaming:
+        on_element = lambda pos, section, element: merger.add_element(pending[pos], section, element)
+    journal = CheckpointJournal(journal_file, append=resume)
+    on_result = lambda pos, data, error: journal.record(pending[pos], fingerprints[pending[pos]], data, error)
+    retry_budget = RetryBudget(max(MIN_CHUNK_RETRIES, int(len(pending) * CHUNK_RETRY_RATIO)))
+    controller = None
+    if adaptive and pending:
+        controller = ChunkSizeController(max(estimate_tokens(chunks[idx]) for idx in pending))
+    try:
+        for pos, data in extract_chunks([chunks[idx] for idx in pending], max_concurrency, on_element=on_element,
+                                        retry_budget=retry_budget, on_result=on_result, controller=controller):
+            idx = pending[pos]
+            extractions[idx] = data
+            if streaming:
+                merger.finish_chunk(idx)
+            else:
+                merger.add_chunk(idx, data)
+            for duplicate in duplicates_by_original.get(idx, []):
+                extractions[duplicate] = data
+                merger.add_chunk(duplicate, data)
+    finally:
+        journal.close()
+    save_extraction_manifest(fingerprints, extractions, manifest_file)
+    if controller is not None and controller.tokens < controller.max_tokens:
+        print(f"📊 Adaptive chunk size ended at {controller.tokens} tokens (BRD chunked at {controller.max_tokens}); "
+              f"consider a smaller CHUNK_TOKENS")
+
+    failed = sorted(idx + 1 for idx in pending + list(duplicates) if not extractions[idx])
+    if failed:
+        metrics_utility.increment("extract.chunks_failed", len(failed))
+        print(f"⚠️ {len(failed)} chunks failed after retries: {failed}; rerun with --resume to retry only those")
+    else:
+        # The manifest now holds every extraction; the journal is only needed after a crash
+        os.remove(journal_file)
+        print("✅ Architecture extracted from all chunks!")
     # ---------------------
     # STEP 3: Merge into final JSON
     # ---------------------
-    architecture = {
-        "actors": list(all_actors.values()),
-        "microservices": list(all_services.values()),
-        "databases": list(all_databases.values()),
-        "events": [
-            {"from": f, "to": t, "type": typ, "description": d or ""}
-            for f, t, typ, d in all_events
-        ]
-    }
-    with open("merged_architecture.json", "w", encoding="utf-8") as f:
+    architecture = architecture_model.build_model(merger.architecture()).to_json()
+    with open(merged_file, "w", encoding="utf-8") as f:
         json.dump(architecture, f, indent=2)
-    print("✅ Merged architecture JSON saved: merged_architecture.json")
+    print(f"✅ Merged architecture JSON saved: {merged_file}")
     return architecture
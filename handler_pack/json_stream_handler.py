@@ -0,0 +1,95 @@
+# Top-level arrays whose elements are emitted as soon as they are complete (aliases → canonical name)
+STREAM_SECTIONS = {
+    "actors": "actors",
+    "microservices": "microservices",
+    "services": "microservices",
+    "databases": "databases",
+    "events": "events",
+    "interactions": "events",
+}
+
+
+class ArchitectureStreamParser:
+    """
+    Incremental scanner over a streamed extraction response. `feed` returns the
+    (section, element_text) pairs completed by the new text, so callers can merge
+    each actor/service/database/event while the model is still generating.
+    Elements cut off by a truncated stream are never emitted.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.section = None
+        self.complete = False  # top-level object closed
+        self.elements = 0
+        self._in_string = False
+        self._quote = None
+        self._escape = False
+        self._key = None
+        self._key_pending = None  # key text seen so far while inside a depth-1 string
+        self._element_pending = None  # element text carried over from earlier feeds
+
+    def feed(self, text: str) -> list:
+        completed = []
+        element_start = 0 if self._element_pending is not None else None
+        key_start = 0 if self._key_pending is not None else None
+
+        for i, ch in enumerate(text):
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._in_string = False
+                    if key_start is not None:
+                        self._key = self._key_pending + text[key_start:i]
+                        self._key_pending = None
+                        key_start = None
+                    elif element_start is not None and self.depth == 2:
+                        completed.append((self.section, self._element_pending + text[element_start:i + 1]))
+                        self._element_pending = None
+                        element_start = None
+                continue
+
+            if ch == '"' or ch == "'":
+                if self.depth == 0:
+                    continue
+                self._in_string = True
+                self._quote = ch
+                if self.depth == 1:
+                    self._key_pending = ""
+                    key_start = i + 1
+                elif self.depth == 2 and self.section and element_start is None:
+                    self._element_pending = ""
+                    element_start = i
+            elif ch == "{" or ch == "[":
+                if self.depth == 0 and ch != "{":
+                    continue
+                self.depth += 1
+                if self.depth == 2:
+                    self.section = STREAM_SECTIONS.get(self._key) if ch == "[" else None
+                elif self.depth == 3 and self.section and element_start is None:
+                    self._element_pending = ""
+                    element_start = i
+            elif ch == "}" or ch == "]":
+                if self.depth == 0:
+                    continue
+                self.depth -= 1
+                if self.depth == 2 and element_start is not None:
+                    completed.append((self.section, self._element_pending + text[element_start:i + 1]))
+                    self._element_pending = None
+                    element_start = None
+                elif self.depth == 1:
+                    self.section = None
+                elif self.depth == 0:
+                    self.complete = True
+
+        if element_start is not None:
+            self._element_pending += text[element_start:]
+        if key_start is not None:
+            self._key_pending += text[key_start:]
+        self.elements += len(completed)
+        return completed
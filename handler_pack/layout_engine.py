@@ -0,0 +1,162 @@
+import re
+
+from handler_pack import architecture_model
+
+# ---------------------
+# CONFIG (mirrors the rules in ai_prompts/ai_layout_prompt.py)
+# ---------------------
+
+NODE_SPACING = 2  # horizontal units between nodes in a layer
+LAYER_Y = {"frontend": 0, "gateway": -1, "microservice": -2, "data": -3, "external": -4}
+NODE_COLORS = {
+    "actor": "lightgreen",
+    "gateway": "lightskyblue",
+    "service": "lightblue",
+    "db": "lightyellow",
+    "external": "lightgray",
+}
+NODE_LAYERS = {
+    "actor": "frontend",
+    "gateway": "gateway",
+    "service": "microservice",
+    "db": "data",
+    "external": "external",
+}
+EDGE_LABELS = {
+    "rest": "REST API",
+    "grpc": "gRPC Call",
+    "queue": "Message Queue",
+    "event": "Event Stream",
+    "db": "DB Query",
+}
+INTERACTION_PROTOCOLS = {"REST API": "REST", "gRPC Call": "gRPC", "Message Queue": "Event", "Event Stream": "Event"}
+GATEWAY_NAME = re.compile(r"gateway|\bbff\b|backend for frontend", re.IGNORECASE)
+EXTERNAL_ACTOR_TYPE = re.compile(r"system", re.IGNORECASE)
+
+
+def edge_label(event_type: str) -> str:
+    """
+    Map an extracted interaction type (REST, Queue, Event, DB, gRPC...) to a layout edge label.
+    """
+    key = (event_type or "").lower()
+    for marker, label in EDGE_LABELS.items():
+        if marker in key:
+            return label
+    return "REST API"
+
+
+def classify_nodes(architecture) -> dict:
+    """
+    Node name → node type (actor | gateway | service | db | external), in first-seen order.
+    Actors typed as a system (including event endpoints validation registered) are external.
+    """
+    model = architecture_model.build_model(architecture)
+    types = {}
+    for node in model.nodes.values():
+        if node.kind == "actor":
+            types[node.name] = "external" if EXTERNAL_ACTOR_TYPE.search(node.data.get("type") or "") else "actor"
+        elif node.kind == "service":
+            types[node.name] = "gateway" if GATEWAY_NAME.search(node.name) else "service"
+        else:
+            types[node.name] = "db"
+    return types
+
+
+def drop_dangling_edges(layout_json: dict) -> dict:
+    """
+    Drop edges and interactions of a model-made layout that name a node the layout does not have.
+    """
+    names = {node.get("name") for node in layout_json.get("nodes", []) if isinstance(node, dict)}
+    edges = [e for e in layout_json.get("edges", [])
+             if isinstance(e, dict) and e.get("from") in names and e.get("to") in names]
+    interactions = [i for i in layout_json.get("microservice_interactions", [])
+                    if isinstance(i, dict) and i.get("caller") in names and i.get("callee") in names]
+    dropped = len(layout_json.get("edges", [])) - len(edges)
+    if dropped:
+        print(f"⚠️ Dropped {dropped} layout edges to unknown nodes")
+    return dict(layout_json, edges=edges, microservice_interactions=interactions)
+
+
+def build_local_layout(architecture) -> dict:
+    """
+    Build the C4 layout JSON (nodes / edges / microservice_interactions) that the
+    layout prompt asks the model for, deterministically and without a network call.
+    Takes an architecture JSON or an ArchitectureModel.
+    """
+    model = architecture_model.build_model(architecture)
+    types = classify_nodes(model)
+    criticality = {node.name: node.data.get("criticality") or "Medium" for node in model.of_kind("service")}
+
+    # ---------------- Nodes ----------------
+    positions = {}
+    layer_slots = {layer: 0 for layer in LAYER_Y}
+    db_users = model.used_by
+    ordered = [name for name, node_type in types.items() if node_type != "db"]
+    ordered += [name for name, node_type in types.items() if node_type == "db"]
+    used_x = {layer: set() for layer in LAYER_Y}
+    for name in ordered:
+        layer = NODE_LAYERS[types[name]]
+        x = None
+        owner = next(iter(db_users[name])) if types[name] == "db" and db_users.get(name) else None
+        if owner in positions:
+            # Databases align below their owning service when that slot is free
+            x = positions[owner][0]
+            if x in used_x[layer]:
+                x = None
+        if x is None:
+            while layer_slots[layer] * NODE_SPACING in used_x[layer]:
+                layer_slots[layer] += 1
+            x = layer_slots[layer] * NODE_SPACING
+        used_x[layer].add(x)
+        positions[name] = (x, LAYER_Y[layer])
+
+    nodes = [
+        {
+            "name": name,
+            "type": types[name],
+            "layer": NODE_LAYERS[types[name]],
+            "x": positions[name][0],
+            "y": positions[name][1],
+            "color": NODE_COLORS[types[name]],
+        }
+        for name in ordered
+    ]
+
+    # ---------------- Edges ----------------
+    edges = {}
+    interactions = {}
+    for event in model.events:
+        src, dst = event.src, event.dst
+        label = "DB Query" if types.get(dst) == "db" else edge_label(event.type)
+        edges.setdefault((src, dst, label), {
+            "from": src,
+            "to": dst,
+            "label": label,
+            "direction": "uni",
+            "criticality": criticality.get(dst, criticality.get(src, "Medium")),
+        })
+        if types.get(src) in ("service", "gateway") and types.get(dst) in ("service", "gateway"):
+            protocol = INTERACTION_PROTOCOLS.get(label, "REST")
+            interactions.setdefault((src, dst, protocol), {
+                "caller": src,
+                "callee": dst,
+                "protocol": protocol,
+                "sync": protocol != "Event",
+                "purpose": event.description,
+            })
+    for db, users in db_users.items():
+        for user in users:
+            if db in types and user in types:
+                edges.setdefault((user, db, "DB Query"), {
+                    "from": user,
+                    "to": db,
+                    "label": "DB Query",
+                    "direction": "uni",
+                    "criticality": criticality.get(user, "Medium"),
+                })
+
+    return {
+        "nodes": nodes,
+        "edges": list(edges.values()),
+        "microservice_interactions": list(interactions.values()),
+    }
@@ -0,0 +1,153 @@
+import re
+
+HEADING = "heading"
+PARAGRAPH = "paragraph"
+LIST_ITEM = "list_item"
+CODE = "code"
+TABLE = "table"
+RULE = "rule"
+
+HEADING_LINE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+LIST_LINE = re.compile(r"^(\s*)([*+-]|\d+[.)])\s+(.*)$")
+FENCE_LINE = re.compile(r"^\s*(```|~~~)\s*([\w+-]*)")
+TABLE_LINE = re.compile(r"^\s*\|.*\|\s*$")
+TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+RULE_LINE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+LIST_INDENT = 2  # spaces per nesting level
+
+INLINE_TOKEN = re.compile(
+    r"`(?P<code>[^`]+)`"
+    r"|\*\*\*(?P<bold_italic>.+?)\*\*\*"
+    r"|\*\*(?P<bold>.+?)\*\*"
+    r"|__(?P<bold_u>.+?)__"
+    r"|\*(?P<italic>[^*\s](?:.*?[^*\s])?)\*"
+    r"|(?<!\w)_(?P<italic_u>[^_\s](?:.*?[^_\s])?)_(?!\w)"
+    r"|\[(?P<link>[^\]]+)\]\([^)]*\)"
+)
+
+
+def split_table_row(line: str) -> list:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in re.split(r"(?<!\\)\|", line)]
+
+
+def iter_markdown_blocks(lines):
+    """
+    Stream Markdown lines into blocks:
+      (HEADING, level, text), (PARAGRAPH, text), (LIST_ITEM, ordered, depth, text),
+      (CODE, language, text), (TABLE, header_cells, rows), (RULE,)
+    Only the block being built is held in memory.
+    """
+    paragraph = []
+    table = None  # [header, rows]
+    code = None  # [language, lines]
+    candidate_header = None  # a "| a | b |" line waiting to see if a separator follows
+
+    def flush_paragraph():
+        if paragraph:
+            text = " ".join(paragraph)
+            paragraph.clear()
+            return [(PARAGRAPH, text)]
+        return []
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+
+        if code is not None:
+            if FENCE_LINE.match(line):
+                yield CODE, code[0], "\n".join(code[1])
+                code = None
+            else:
+                code[1].append(line)
+            continue
+
+        if table is not None:
+            if line.strip() and "|" in line:
+                table[1].append(split_table_row(line))
+                continue
+            yield TABLE, table[0], table[1]
+            table = None
+
+        if candidate_header is not None:
+            if TABLE_SEPARATOR.match(line):
+                yield from flush_paragraph()
+                table = [split_table_row(candidate_header), []]
+                candidate_header = None
+                continue
+            paragraph.append(candidate_header.strip())
+            candidate_header = None
+
+        if not line.strip():
+            yield from flush_paragraph()
+            continue
+
+        fence = FENCE_LINE.match(line)
+        if fence:
+            yield from flush_paragraph()
+            code = [fence.group(2), []]
+            continue
+
+        heading = HEADING_LINE.match(line)
+        if heading:
+            yield from flush_paragraph()
+            yield HEADING, len(heading.group(1)), heading.group(2)
+            continue
+
+        if RULE_LINE.match(line):
+            yield from flush_paragraph()
+            yield RULE,
+            continue
+
+        item = LIST_LINE.match(line)
+        if item:
+            yield from flush_paragraph()
+            depth = len(item.group(1).expandtabs(4)) // LIST_INDENT
+            yield LIST_ITEM, item.group(2)[0].isdigit(), depth, item.group(3)
+            continue
+
+        if TABLE_LINE.match(line):
+            candidate_header = line
+            continue
+
+        paragraph.append(line.strip())
+
+    if code is not None:
+        yield CODE, code[0], "\n".join(code[1])
+    if table is not None:
+        yield TABLE, table[0], table[1]
+    if candidate_header is not None:
+        paragraph.append(candidate_header.strip())
+    yield from flush_paragraph()
+
+
+def iter_inline(text: str):
+    """
+    Split inline Markdown into (text, bold, italic, code) runs; links keep their text.
+    """
+    pos = 0
+    for match in INLINE_TOKEN.finditer(text):
+        if match.start() > pos:
+            yield text[pos:match.start()], False, False, False
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "code":
+            yield value, False, False, True
+        elif kind == "bold_italic":
+            yield value, True, True, False
+        elif kind in ("bold", "bold_u"):
+            yield value, True, False, False
+        elif kind in ("italic", "italic_u"):
+            yield value, False, True, False
+        else:
+            yield value, False, False, False
+        pos = match.end()
+    if pos < len(text):
+        yield text[pos:], False, False, False
+
+
+def plain_text(text: str) -> str:
+    return "".join(run[0] for run in iter_inline(text))
@@ -0,0 +1,283 @@
+import functools
+import json
+import os
+import re
+from concurrent import futures
+
+# ---------------------
+# CONFIG
+# ---------------------
+
+MERGE_BATCH_SIZE = 64  # chunk extractions folded per task before the tree reduction
+NON_WORD = re.compile(r"[\W_]+")
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def normalize_key(text) -> str:
+    """
+    Case-, punctuation- and whitespace-insensitive key: "Payment-Service " == "payment service".
+    """
+    return NON_WORD.sub(" ", str(text or "")).strip().casefold()
+
+
+def _keep_first(target: dict, source: dict):
+    """
+    Fold (rank, value) entries: the lowest rank wins, whichever side it comes from.
+    """
+    for key, entry in source.items():
+        current = target.get(key)
+        if current is None or entry[0] < current[0]:
+            target[key] = entry
+
+
+def _keep_last(target: dict, source: dict):
+    """
+    Fold (rank, value) entries: the highest rank wins, whichever side it comes from.
+    """
+    for key, entry in source.items():
+        current = target.get(key)
+        if current is None or entry[0] > current[0]:
+            target[key] = entry
+
+
+def _wins(target: dict, key, rank: tuple) -> bool:
+    current = target.get(key)
+    return current is None or rank < current[0]
+
+
+def _wins_last(target: dict, key, rank: tuple) -> bool:
+    current = target.get(key)
+    return current is None or rank > current[0]
+
+
+class PartialArchitecture:
+    """
+    Indexed, order-free form of a (partial) merged architecture. Every entry carries the
+    rank (document, chunk, position) where it first appeared and the lowest rank wins
+    (an actor's type is the one exception: the latest mention wins, as a sequential merge
+    overwrote it), so merge() is associative and commutative and any merge order or
+    partitioning gives the same result as merging the chunks one by one in document order.
+    """
+
+    def __init__(self):
+        self.actors = {}  # actor key -> (rank, actor name)
+        self.actor_types = {}  # actor key -> (rank, actor type); the latest mention wins, as in a sequential merge
+        self.services = {}  # service key -> (rank, service dict)
+        self.databases = {}  # db key -> (rank, db name)
+        self.db_types = {}  # db key -> (rank, db type), from top-level "databases" elements only
+        self.db_users = {}  # db key -> {service key: (rank, service key)}
+        self.events = {}  # (from key, to key, type key, description key) -> (rank, event dict)
+
+    def add_element(self, rank: tuple, section: str, element):
+        # ---------------- Actors ----------------
+        if section == "actors":
+            if isinstance(element, dict):
+                name = element.get("name", str(element))
+                actor_type = element.get("type", "External")
+            else:
+                name = str(element)
+                actor_type = "External"
+            key = normalize_key(name)
+            if _wins(self.actors, key, rank):
+                self.actors[key] = (rank, name)
+            if _wins_last(self.actor_types, key, rank):
+                self.actor_types[key] = (rank, actor_type)
+
+        # ---------------- Microservices ----------------
+        elif section == "microservices" and isinstance(element, dict):
+            name = element.get("name")
+            if not name:
+                return
+            key = normalize_key(name)
+            if _wins(self.services, key, rank):
+                self.services[key] = (rank, {
+                    "name": name,
+                    "db": element.get("db"),
+                    "exposes": element.get("exposes", []),
+                    "consumes": element.get("consumes", []),
+                    "scaling": element.get("scaling", "Unknown"),
+                    "criticality": element.get("criticality", "Medium")
+                })
+
+            # Register DB and its user
+            db_name = element.get("db")
+            if db_name:
+                db_key = normalize_key(db_name)
+                if _wins(self.databases, db_key, rank):
+                    self.databases[db_key] = (rank, db_name)
+                users = self.db_users.setdefault(db_key, {})
+                if _wins(users, key, rank):
+                    users[key] = (rank, key)
+
+        # ---------------- Databases ----------------
+        elif section == "databases":
+            if isinstance(element, dict):
+                db_name = element.get("name")
+                db_type = element.get("type")
+            else:
+                db_name = str(element)
+                db_type = None
+            if not db_name:
+                return
+            db_key = normalize_key(db_name)
+            if _wins(self.databases, db_key, rank):
+                self.databases[db_key] = (rank, db_name)
+            # Ranked on its own: a service's `db` field usually registers the name first
+            if db_type and _wins(self.db_types, db_key, rank):
+                self.db_types[db_key] = (rank, db_type)
+
+        # ---------------- Events / Interactions ----------------
+        elif section == "events" and isinstance(element, dict):
+            src = element.get("from")
+            dst = element.get("to")
+            typ = element.get("type", "Unknown")
+            desc = element.get("description", "")
+            if src and dst:
+                key = (normalize_key(src), normalize_key(dst), normalize_key(typ), normalize_key(desc))
+                if _wins(self.events, key, rank):
+                    self.events[key] = (rank, {"from": src, "to": dst, "type": typ, "description": desc or ""})
+
+    def update(self, other: "PartialArchitecture") -> "PartialArchitecture":
+        """
+        Fold `other` into this partial in place.
+        """
+        _keep_first(self.actors, other.actors)
+        _keep_last(self.actor_types, other.actor_types)
+        _keep_first(self.services, other.services)
+        _keep_first(self.databases, other.databases)
+        _keep_first(self.db_types, other.db_types)
+        for db_key, users in other.db_users.items():
+            _keep_first(self.db_users.setdefault(db_key, {}), users)
+        _keep_first(self.events, other.events)
+        return self
+
+    def add_chunk(self, rank_prefix: tuple, data: dict) -> "PartialArchitecture":
+        """
+        Index one chunk extraction; `rank_prefix` locates the chunk, e.g. (chunk idx,) or (document, chunk idx).
+        """
+        for position, (section, element) in enumerate(iter_data_elements(data or {})):
+            self.add_element(rank_prefix + (position,), section, element)
+        return self
+
+    def architecture(self) -> dict:
+        """
+        The merged architecture JSON, every section in order of first appearance. References
+        to services and databases use the name they were first seen with.
+        """
+        ordered = lambda entries: [value for _, value in sorted(entries.values(), key=lambda entry: entry[0])]
+        service_names = {key: service["name"] for key, (_, service) in self.services.items()}
+        db_names = {key: name for key, (_, name) in self.databases.items()}
+        names = {**{key: name for key, (_, name) in self.actors.items()}, **db_names, **service_names}
+
+        services = []
+        for service in ordered(self.services):
+            db_key = normalize_key(service["db"]) if service["db"] else None
+            services.append(dict(service, db=db_names.get(db_key, service["db"])))
+        return {
+            "actors": [
+                {"name": name, "type": self.actor_types[actor_key][1]}
+                for actor_key, (_, name) in sorted(self.actors.items(), key=lambda item: item[1][0])
+            ],
+            "microservices": services,
+            "databases": [
+                {"name": db_names[db_key], "type": self.db_types.get(db_key, (None, "Unknown"))[1],
+                 "used_by": [service_names[key] for key in ordered(self.db_users.get(db_key, {}))]}
+                for db_key in sorted(self.databases, key=lambda db_key: self.databases[db_key][0])
+            ],
+            "events": [
+                dict(event, **{"from": names.get(normalize_key(event["from"]), event["from"]),
+                               "to": names.get(normalize_key(event["to"]), event["to"])})
+                for event in ordered(self.events)
+            ]
+        }
+
+
+def iter_data_elements(data: dict):
+    """
+    (section, element) pairs of one chunk extraction, using canonical section names.
+    """
+    for actor in data.get("actors") or []:
+        yield "actors", actor
+    for svc in data.get("microservices", data.get("services")) or []:
+        yield "microservices", svc
+    for db in data.get("databases") or []:
+        yield "databases", db
+    for inter in data.get("events", data.get("interactions")) or []:
+        yield "events", inter
+
+
+def partial_from_chunk(data: dict, rank_prefix: tuple) -> PartialArchitecture:
+    return PartialArchitecture().add_chunk(rank_prefix, data)
+
+
+def merge(partial_a: PartialArchitecture, partial_b: PartialArchitecture) -> PartialArchitecture:
+    """
+    Associative, commutative merge of two partial architectures; neither input is modified.
+    """
+    return PartialArchitecture().update(partial_a).update(partial_b)
+
+
+def merge_all(partials) -> PartialArchitecture:
+    merged = PartialArchitecture()
+    for partial in partials:
+        merged.update(partial)
+    return merged
+
+
+def _index_batch(batch):
+    partial = PartialArchitecture()
+    for rank_prefix, data in batch:
+        partial.add_chunk(rank_prefix, data)
+    return partial
+
+
+def _index_manifest(task):
+    doc, manifest_file = task
+    if not os.path.exists(manifest_file):  # failed job: nothing to merge, but it keeps its rank slot
+        return PartialArchitecture()
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return _index_batch([((doc, entry["index"]), entry["extraction"]) for entry in manifest.get("chunks", [])])
+
+
+def _tree_reduce(executor, partials: list, workers: int) -> PartialArchitecture:
+    """
+    Combine partials level by level, at most `workers` merge tasks per level.
+    """
+    while len(partials) > 1:
+        fan_in = max(2, -(-len(partials) // workers))
+        partials = list(executor.map(merge_all, [partials[i:i + fan_in] for i in range(0, len(partials), fan_in)]))
+    return partials[0] if partials else PartialArchitecture()
+
+
+def _workers(max_workers: int = None) -> int:
+    return max_workers or os.cpu_count() or 1
+
+
+def tree_merge(extractions, max_workers: int = None, batch_size: int = MERGE_BATCH_SIZE) -> PartialArchitecture:
+    """
+    Map-reduce over a process pool: `extractions` is a list of (rank_prefix, chunk data);
+    batches are indexed in parallel, then combined by a tree reduction. Shipping the
+    extractions to the workers costs more than indexing them, so this only pays off
+    for expensive inputs; with one CPU everything runs in-process.
+    """
+    batches = [extractions[i:i + batch_size] for i in range(0, len(extractions), batch_size)]
+    workers = _workers(max_workers)
+    if len(batches) <= 1 or workers <= 1:
+        return _index_batch(extractions)
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return _tree_reduce(executor, list(executor.map(_index_batch, batches)), workers)
+
+
+def merge_manifests(manifest_files: list, max_workers: int = None) -> PartialArchitecture:
+    """
+    Merge the per-chunk extraction manifests of several documents: each worker reads and
+    indexes whole manifests itself, so only the (much smaller) partials cross processes.
+    Document i's chunks rank as (i, chunk idx).
+    """
+    tasks = list(enumerate(manifest_files))
+    workers = _workers(max_workers)
+    if len(tasks) <= 1 or workers <= 1:
+        return merge_all(_index_manifest(task) for task in tasks)
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return _tree_reduce(executor, list(executor.map(_index_manifest, tasks)), workers)
@@ -0,0 +1,144 @@
+import functools
+import os
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import (HRFlowable, Image, LongTable, PageBreak, Paragraph, Preformatted,
+                                SimpleDocTemplate, Spacer, TableStyle)
+
+from handler_pack import markdown_handler
+
+PAGE_SIZE = A4
+PAGE_MARGIN = 0.8 * inch
+DIAGRAM_WIDTH = 6 * inch
+CELL_PADDING = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _styles() -> dict:
+    """
+    Paragraph styles, built once per process and reused for every document.
+    """
+    sample = getSampleStyleSheet()
+    styles = {f"h{level}": sample[f"Heading{min(level, 6)}"] for level in range(1, 7)}
+    styles["body"] = ParagraphStyle("Body", parent=sample["BodyText"], alignment=TA_LEFT, spaceAfter=6)
+    styles["cell"] = ParagraphStyle("Cell", parent=sample["BodyText"], fontSize=9, leading=11)
+    styles["header_cell"] = ParagraphStyle("HeaderCell", parent=styles["cell"], fontName="Helvetica-Bold")
+    styles["code"] = ParagraphStyle("Code", parent=sample["Code"], fontSize=8, leading=10,
+                                    backColor=colors.whitesmoke, borderPadding=4)
+    for depth in range(6):
+        styles[f"list{depth}"] = ParagraphStyle(f"List{depth}", parent=styles["body"],
+                                                leftIndent=18 * (depth + 1), bulletIndent=18 * depth + 6,
+                                                spaceAfter=2)
+    return styles
+
+
+def inline_markup(text: str) -> str:
+    """
+    Inline Markdown → reportlab paragraph markup (bold, italic, monospace), escaped.
+    """
+    parts = []
+    for run, bold, italic, code in markdown_handler.iter_inline(text):
+        run = escape(run)
+        if code:
+            run = f'<font face="Courier">{run}</font>'
+        if italic:
+            run = f"<i>{run}</i>"
+        if bold:
+            run = f"<b>{run}</b>"
+        parts.append(run)
+    return "".join(parts)
+
+
+def _cell(text: str, style: ParagraphStyle, width: float):
+    """
+    Short plain cells stay strings; only wrapping or formatted cells pay for a Paragraph.
+    """
+    if "*" in text or "`" in text or stringWidth(text, style.fontName, style.fontSize) > width - 2 * CELL_PADDING:
+        return Paragraph(inline_markup(text), style)
+    return text
+
+
+def _table(header: list, rows: list, styles: dict, width: float):
+    columns = max([len(header)] + [len(row) for row in rows])
+    col_width = width / columns
+    header = header + [""] * (columns - len(header))
+    data = [[_cell(cell, styles["header_cell"], col_width) for cell in header]]
+    data += [[_cell(cell, styles["cell"], col_width) for cell in row + [""] * (columns - len(row))]
+             for row in rows]
+    table = LongTable(data, colWidths=[col_width] * columns, repeatRows=1, hAlign="LEFT")
+    table.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("FONT", (0, 0), (-1, 0), styles["header_cell"].fontName, styles["header_cell"].fontSize),
+        ("FONT", (0, 1), (-1, -1), styles["cell"].fontName, styles["cell"].fontSize),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), CELL_PADDING),
+        ("RIGHTPADDING", (0, 0), (-1, -1), CELL_PADDING),
+    ]))
+    return table
+
+
+def _diagram(png_file: str, max_height: float):
+    width, height = ImageReader(png_file).getSize()
+    scale = min(DIAGRAM_WIDTH / width, max_height / height)
+    return Image(png_file, width=width * scale, height=height * scale)
+
+
+def markdown_flowables(lines, styles: dict = None, width: float = PAGE_SIZE[0] - 2 * PAGE_MARGIN):
+    """
+    Stream Markdown lines into reportlab flowables.
+    """
+    styles = styles or _styles()
+    numbers = {}
+    for block in markdown_handler.iter_markdown_blocks(lines):
+        kind = block[0]
+        if kind != markdown_handler.LIST_ITEM:
+            numbers.clear()
+        if kind == markdown_handler.HEADING:
+            yield Paragraph(inline_markup(block[2]), styles[f"h{block[1]}"])
+        elif kind == markdown_handler.PARAGRAPH:
+            yield Paragraph(inline_markup(block[1]), styles["body"])
+        elif kind == markdown_handler.LIST_ITEM:
+            _, ordered, depth, text = block
+            depth = min(depth, 5)
+            for deeper in [d for d in numbers if d > depth]:
+                del numbers[deeper]
+            numbers[depth] = numbers.get(depth, 0) + 1
+            bullet = f"{numbers[depth]}." if ordered else "•"
+            yield Paragraph(inline_markup(text), styles[f"list{depth}"], bulletText=bullet)
+        elif kind == markdown_handler.CODE:
+            yield Preformatted(block[2], styles["code"])
+            yield Spacer(1, 6)
+        elif kind == markdown_handler.TABLE:
+            yield _table(block[1], block[2], styles, width)
+            yield Spacer(1, 8)
+        elif kind == markdown_handler.RULE:
+            yield HRFlowable(width="100%", color=colors.grey)
+
+
+def md_to_pdf(md_file: str, png_file: str = None, pdf_file: str = None) -> str:
+    """
+    Render a Markdown design document (and the C4 PNG) straight to PDF, in-process.
+    """
+    pdf_file = pdf_file or md_file.replace(".md", ".pdf")
+    doc = SimpleDocTemplate(pdf_file, pagesize=PAGE_SIZE, leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN,
+                            topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN, title=os.path.basename(md_file))
+    with open(md_file, "r", encoding="utf-8") as f:
+        story = list(markdown_flowables(f, width=doc.width))
+
+    # Embed PNG if available
+    if png_file and os.path.exists(png_file):
+        story.append(PageBreak())
+        story.append(Paragraph("System Diagram", _styles()["h2"]))
+        story.append(_diagram(png_file, doc.height - inch))
+
+    doc.build(story)
+    print(f"✅ Final PDF generated: {pdf_file}")
+    return pdf_file
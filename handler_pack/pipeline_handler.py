@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from ai_uitls import metrics_utility
+
+
+class Stage:
+    """
+    One pipeline step: `func(results)` receives the results of its `deps` by stage name.
+    """
+
+    def __init__(self, name: str, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+
+def run_pipeline(stages: list, max_workers: int = None, on_stage=None) -> tuple:
+    """
+    Run stages as a dependency graph: every stage starts as soon as all of its
+    dependencies have finished, so independent branches run concurrently.
+    Returns (results, timings) keyed by stage name; re-raises the first stage failure
+    after letting already running stages finish. `on_stage(name, status, seconds, result)`
+    is called from the stage's thread as it starts ("running") and ends ("done" with its
+    result, or "failed" with the exception).
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+    results = {}
+    timings = {}
+    pending = list(stages)
+    running = {}
+    failure = None
+
+    def timed(stage, inputs):
+        if on_stage is not None:
+            on_stage(stage.name, "running", None, None)
+        start = time.perf_counter()
+        status, result = "failed", None
+        try:
+            with metrics_utility.stage_timer(f"stage.{stage.name}"):
+                result = stage.func(inputs)
+            status = "done"
+            return result
+        except Exception as e:
+            result = e
+            raise
+        finally:
+            timings[stage.name] = time.perf_counter() - start
+            if on_stage is not None:
+                on_stage(stage.name, status, timings[stage.name], result)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as executor:
+        while pending or running:
+            if failure is None:
+                for stage in [s for s in pending if all(dep in results for dep in s.deps)]:
+                    pending.remove(stage)
+                    inputs = {dep: results[dep] for dep in stage.deps}
+                    running[executor.submit(timed, stage, inputs)] = stage
+            if not running:
+                if failure is None:
+                    raise ValueError(f"Dependency cycle among stages: {[s.name for s in pending]}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name] = future.result()
+                except Exception as e:
+                    print(f"❌ Stage '{stage.name}' failed: {e}")
+                    failure = failure or e
+
+    if failure is not None:
+        raise failure
+    return results, timings
+
+
+def print_timings(timings: dict, total: float = None):
+    print("⏱️ Stage timings:")
+    for name, seconds in timings.items():
+        print(f"   {name:<12} {seconds:8.2f}s")
+    if total is not None:
+        print(f"   {'total':<12} {total:8.2f}s (wall clock)")
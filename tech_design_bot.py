@@ -1,52 +1,225 @@
-from handler_pack import json_file_handler, image_generation_handler, doc_generation_handler
+import argparse
+import json
+import os
+import sys
+import time
+
+from ai_uitls import metrics_utility
+from handler_pack import chunk_handler
+from handler_pack.pipeline_handler import Stage, run_pipeline, print_timings
+
+# Handlers are imported inside the subcommands that use them, so e.g. `extract` never
+# loads Graphviz or the DOCX/PDF tooling and `layout` never needs the document stack.
 
 # ---------------------
 # CONFIG
 # ---------------------
 
 BRD_FILE = "business_requirements.txt"
-CHUNK_SIZE = 3000  # words per chunk
+CHUNK_TOKENS = chunk_handler.CHUNK_TOKENS  # estimated tokens per chunk
+CHUNK_OVERLAP_TOKENS = chunk_handler.CHUNK_OVERLAP_TOKENS
+ARCHITECTURE_FILE = "merged_architecture.json"
+LAYOUT_FILE = "c4_layout.json"
+DIAGRAM_FILE = "c4_ai_full"  # Graphviz adds the .png
+DESIGN_DOC_FILE = "Design_Document.md"
+COMMANDS = ("extract", "layout", "render", "doc", "all")
 
 def load_brd(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return "\n".join(line.rstrip("\r\n") for line in chunk_handler.iter_file_lines(file_path))
 
-def split_document(text, max_words=CHUNK_SIZE):
-    words = text.split()
-    return [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+def split_document(text, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    return list(chunk_handler.chunk_text(text, max_tokens, overlap_tokens))
 
 
-def main():
-    global actor, svc, inter, architecture, graphviz_path
+def load_json(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(data, file_path):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"✅ Saved: {file_path}")
+    return file_path
+
+
+def run_stages(stages, output_dir=".", profile=False, prometheus=False, run_info=None, on_stage=None):
+    """
+    Run `stages` with run metrics: `output_dir`/run_metrics.json is always written, plus
+    a Prometheus text file with `prometheus` and a whole-run cProfile hotspot report with
+    `profile` (every thread; the per-stage timings are wall-clock only). `on_stage` is
+    passed to run_pipeline. Returns (results, timings) per stage.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    metrics_utility.reset()
+    metrics_utility.enable_profiling(profile)
+    start = time.perf_counter()
+    status = "failed"
+    try:
+        with metrics_utility.profile_run():
+            results, timings = run_pipeline(stages, on_stage=on_stage)
+        status = "ok"
+        return results, timings
+    finally:
+        run_info = dict(run_info or {}, status=status, seconds=round(time.perf_counter() - start, 3))
+        metrics_utility.write_metrics_json(os.path.join(output_dir, metrics_utility.METRICS_FILE), run_info)
+        if prometheus:
+            metrics_utility.write_prometheus(os.path.join(output_dir, metrics_utility.PROMETHEUS_FILE))
+        if profile:
+            metrics_utility.write_profile_report(os.path.join(output_dir, metrics_utility.PROFILE_REPORT_FILE))
 
-    # ---------------------
-    # STEP 1: Load and Chunk BRD
-    # ---------------------
-    brd_text = load_brd(BRD_FILE)
-    chunks = split_document(brd_text)
+
+# ---------------------
+# STAGES
+# ---------------------
+
+def load_and_chunk(brd_file):
+    chunks = list(chunk_handler.stream_file_chunks(brd_file, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS))
     print(f"✅ BRD loaded. Total chunks: {len(chunks)}")
-    # brd_text = load_brd("business_requirements.pdf")
+    return chunks
+
+
+def extract_architecture(chunks, output_dir=".", resume=False):
+    from handler_pack import architecture_model, json_file_handler
+
+    # One indexed model, shared by the diagram and the design document stages
+    return architecture_model.build_model(
+        json_file_handler.create_json_file_from_brd(chunks, output_dir=output_dir, resume=resume))
+
+
+def build_layout(architecture, layout_mode=None):
+    from handler_pack import image_generation_handler
+
+    return image_generation_handler.build_layout(architecture, layout_mode or image_generation_handler.LAYOUT_MODE)
+
+
+def render_diagram(layout_json, output_file):
+    from handler_pack import image_generation_handler
+
+    output_path = image_generation_handler.render_layout_to_png(layout_json, output_file)
+    print(f"✅ C4 Container Diagram generated: {output_path}")
+    return output_path
 
+
+def write_design_markdown(architecture, md_file):
+    from handler_pack import doc_generation_handler
+
+    return doc_generation_handler.write_design_markdown(architecture, md_file)
+
+
+def assemble_design_doc(md_file, png_file):
+    from handler_pack import doc_generation_handler
+
+    return doc_generation_handler.assemble_design_doc(md_file, png_file)
+
+
+def run_design_pipeline(brd_file=BRD_FILE, output_dir=".", profile=False, prometheus=False, resume=False,
+                        on_stage=None):
+    """
+    Run the whole BRD → architecture → diagram + design document pipeline for one BRD,
+    writing every artifact into `output_dir`. Returns (results, timings) per stage.
+    Run metrics go to `output_dir`/run_metrics.json (plus a Prometheus text file with
+    `prometheus`, and a whole-run cProfile hotspot report with `profile`). With `resume`,
+    extraction picks up from the checkpoint journal of an interrupted run. `on_stage`
+    reports stage progress (see pipeline_handler.run_pipeline).
+    """
     # ---------------------
+    # STEP 1: Load and Chunk BRD
     # STEP 2: Extract JSON from each chunk
+    # STEP 3: Generate C4 Container Diagram      } run concurrently
+    # STEP 4: Generate Design Document Markdown  }
+    # STEP 5: Assemble DOCX/PDF once both are ready
     # ---------------------
-    architecture = json_file_handler.create_json_file_from_brd(chunks)
+    stages = [
+        Stage("chunk", lambda _: load_and_chunk(brd_file)),
+        Stage("extract", lambda r: extract_architecture(r["chunk"], output_dir, resume), ["chunk"]),
+        Stage("diagram", lambda r: render_diagram(
+            build_layout(r["extract"]), os.path.join(output_dir, DIAGRAM_FILE)), ["extract"]),
+        Stage("design_doc", lambda r: write_design_markdown(
+            r["extract"], os.path.join(output_dir, DESIGN_DOC_FILE)), ["extract"]),
+        Stage("assemble", lambda r: assemble_design_doc(r["design_doc"], r["diagram"]), ["diagram", "design_doc"]),
+    ]
+    return run_stages(stages, output_dir, profile, prometheus, {"brd": brd_file}, on_stage)
 
-    # ---------------------
-    # STEP 3: Generate C4 Container Diagram
-    # ---------------------
-    image_generation_handler.generate_architecture_png(architecture, output_file="c4_ai_full")
 
-    # ---------------------
-    # STEP 4: Generate Design Document
-    # ---------------------
-    doc_generation_handler.generate_design_doc(architecture)
+# ---------------------
+# CLI
+# ---------------------
+
+def command_stages(args):
+    """
+    Stage list for one subcommand; `all` goes through run_design_pipeline instead.
+    """
+    out = lambda name: os.path.join(args.output_dir, name)
+    if args.command == "extract":
+        return [
+            Stage("chunk", lambda _: load_and_chunk(args.brd_file)),
+            Stage("extract", lambda r: extract_architecture(r["chunk"], args.output_dir, args.resume), ["chunk"]),
+        ]
+    if args.command == "layout":
+        return [Stage("layout", lambda _: save_json(
+            build_layout(load_json(args.architecture), args.layout_mode), out(LAYOUT_FILE)))]
+    if args.command == "render":
+        def render(_):
+            data = load_json(args.input)
+            # An architecture JSON is laid out first; a layout JSON (nodes/edges) renders as is
+            layout_json = data if "nodes" in data else build_layout(data, args.layout_mode)
+            return render_diagram(layout_json, out(DIAGRAM_FILE))
+        return [Stage("render", render)]
+    return [
+        Stage("design_doc", lambda _: write_design_markdown(load_json(args.architecture), out(DESIGN_DOC_FILE))),
+        Stage("assemble", lambda r: assemble_design_doc(r["design_doc"], args.png), ["design_doc"]),
+    ]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate a C4 diagram and design document from a BRD.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output-dir", default=".")
+    common.add_argument("--prometheus", action="store_true", help="also write run metrics in Prometheus text format")
+    common.add_argument("--profile", action="store_true",
+                        help="profile the whole run (every thread) under cProfile and write a hotspot report")
+    layout_mode = argparse.ArgumentParser(add_help=False)
+    layout_mode.add_argument("--layout-mode", choices=("local", "local+labels", "ai"),
+                             help="diagram layout (default: image_generation_handler.LAYOUT_MODE)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser("extract", parents=[common], help=f"BRD -> {ARCHITECTURE_FILE}")
+    extract.add_argument("brd_file", nargs="?", default=BRD_FILE, help="BRD as .txt, .md, .pdf or .docx")
+    extract.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint journal")
+
+    layout = commands.add_parser("layout", parents=[common, layout_mode], help=f"architecture JSON -> {LAYOUT_FILE}")
+    layout.add_argument("architecture", nargs="?", default=ARCHITECTURE_FILE)
+
+    render = commands.add_parser("render", parents=[common, layout_mode], help="layout or architecture JSON -> PNG")
+    render.add_argument("input", nargs="?", default=LAYOUT_FILE)
+
+    doc = commands.add_parser("doc", parents=[common], help="architecture JSON -> design document MD/DOCX/PDF")
+    doc.add_argument("architecture", nargs="?", default=ARCHITECTURE_FILE)
+    doc.add_argument("--png", help="diagram to embed")
+
+    run_all = commands.add_parser("all", parents=[common], help="the whole pipeline (default)")
+    run_all.add_argument("brd_file", nargs="?", default=BRD_FILE, help="BRD as .txt, .md, .pdf or .docx")
+    run_all.add_argument("--resume", action="store_true", help="continue an interrupted run from its checkpoint journal")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # `tech_design_bot.py [brd_file] [options]` still runs the whole pipeline
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["all"] + argv
+    args = build_parser().parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "all":
+        _, timings = run_design_pipeline(args.brd_file, args.output_dir, args.profile, args.prometheus, args.resume)
+    else:
+        _, timings = run_stages(command_stages(args), args.output_dir, args.profile, args.prometheus,
+                                {"command": args.command})
+    print_timings(timings, time.perf_counter() - start)
 
 
 if __name__ == "__main__":
    
     main()
-
-
-
-